@@ -0,0 +1,177 @@
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+# Token cost per request by route class. Heavy routes scan a game's raw
+# rows (or several at once) when their cache entry is cold.
+COST_CLASSES: Tuple[Tuple[str, "re.Pattern", int], ...] = (
+    ("stream", re.compile(r"^/stream$"), 1),
+    ("heavy", re.compile(r"^/games/\d+/(rage-words|rage-timeline|page|feed|review-stats)$"), 5),
+    ("heavy", re.compile(r"^/rage-words/global$"), 5),
+    ("heavy", re.compile(r"^/games/\d+/export/"), 10),
+    ("free", re.compile(r"^/(metrics|docs|openapi\.json|redoc)$"), 0),
+)
+DEFAULT_CLASS = ("light", 1)
+
+# Per-client token bucket: sustained tokens per second and burst size.
+BUCKET_RATE = 10.0
+BUCKET_CAPACITY = 60.0
+
+# Buckets kept in memory; the least recently seen clients are dropped first.
+MAX_TRACKED_CLIENTS = 10000
+
+# Heavy requests allowed to run at once per worker; the rest get 503.
+HEAVY_MAX_CONCURRENT = 8
+SHED_RETRY_AFTER_SECONDS = 1
+
+API_KEY_HEADER = "x-api-key"
+
+# Issued API keys, comma-separated. Any other X-API-Key value is ignored,
+# so callers can't mint fresh buckets by sending random keys.
+API_KEYS = frozenset(
+    k.strip() for k in os.getenv("RAGEQUIT_API_KEYS", "").split(",") if k.strip()
+)
+
+
+def classify(path: str) -> Tuple[str, int]:
+    for name, pattern, cost in COST_CLASSES:
+        if pattern.match(path):
+            return name, cost
+    return DEFAULT_CLASS
+
+
+def client_key(headers, client_host: Optional[str], api_keys: Iterable[str] = API_KEYS) -> str:
+    """Clients with an issued API key get their own bucket; the rest are keyed by IP."""
+    api_key = headers.get(API_KEY_HEADER)
+    if api_key and api_key in api_keys:
+        return f"key:{api_key}"
+    return f"ip:{client_host or 'unknown'}"
+
+
+class TokenBucketLimiter:
+    def __init__(
+        self,
+        rate: float = BUCKET_RATE,
+        capacity: float = BUCKET_CAPACITY,
+        max_clients: int = MAX_TRACKED_CLIENTS,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, client: str, cost: float, now: Optional[float] = None) -> float:
+        """Spend cost tokens; returns 0 if allowed, else seconds until it would be."""
+        now = time.monotonic() if now is None else now
+        tokens, updated = self._buckets.pop(client, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class AdmissionController:
+    """
+    Decides, before routing, whether a request runs: per-client token
+    buckets first (429), then a global cap on concurrent heavy requests
+    (503). Both carry Retry-After. Runs on the event loop, so the
+    counters need no locking.
+    """
+
+    def __init__(self, limiter: Optional[TokenBucketLimiter] = None, heavy_max: int = HEAVY_MAX_CONCURRENT):
+        self.limiter = limiter if limiter is not None else TokenBucketLimiter()
+        self.heavy_max = heavy_max
+        self.heavy_in_flight = 0
+        self.counters: Dict[str, int] = {"admitted": 0, "rate_limited": 0, "shed": 0}
+        self.by_class: Dict[str, int] = {}
+
+    def admit(self, path: str, client: str) -> Tuple[Optional[int], int, str]:
+        """Returns (status to reject with or None, Retry-After seconds, cost class)."""
+        cls, cost = classify(path)
+        self.by_class[cls] = self.by_class.get(cls, 0) + 1
+
+        if cost:
+            wait = self.limiter.take(client, cost)
+            if wait > 0:
+                self.counters["rate_limited"] += 1
+                return 429, max(1, math.ceil(wait)), cls
+
+        if cls == "heavy":
+            if self.heavy_in_flight >= self.heavy_max:
+                self.counters["shed"] += 1
+                return 503, SHED_RETRY_AFTER_SECONDS, cls
+            self.heavy_in_flight += 1
+
+        self.counters["admitted"] += 1
+        return None, 0, cls
+
+    def release(self, cls: str):
+        if cls == "heavy":
+            self.heavy_in_flight -= 1
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            "heavy_in_flight": self.heavy_in_flight,
+            "heavy_max": self.heavy_max,
+            "tracked_clients": len(self.limiter),
+            "bucket_rate": self.limiter.rate,
+            "bucket_capacity": self.limiter.capacity,
+            "requests_by_class": dict(self.by_class),
+        }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to HTTP requests.
+
+    Plain ASGI rather than @app.middleware("http") on purpose: call_next()
+    returns as soon as the headers are out, so a slot released there would
+    be free while a StreamingResponse (NDJSON export, SSE) is still sending
+    its body. Here the slot is held until the app has finished the
+    response, or the client has gone away.
+    """
+
+    def __init__(self, app, controller: AdmissionController, api_keys: Optional[Iterable[str]] = None):
+        self.app = app
+        self.controller = controller
+        self.api_keys = API_KEYS if api_keys is None else frozenset(api_keys)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        key = client_key(Headers(scope=scope), client[0] if client else None, self.api_keys)
+        status, retry_after, cls = self.controller.admit(scope["path"], key)
+        if status is not None:
+            detail = "Rate limit exceeded" if status == 429 else "Server busy, retry shortly"
+            response = JSONResponse(
+                status_code=status,
+                content={"detail": detail},
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(cls)
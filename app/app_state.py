@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+DATA_VERSION_KEY = "data_version"
+
+# Version of the scoring config the stored scores were computed with.
+SCORING_VERSION_KEY = "scoring_version"
+
+# Near-duplicate rule (0/1) the stored game_score_inputs were summed under;
+# -1 when per-game runs left games summed under different rules.
+SCORE_INPUTS_DUPS_KEY = "score_inputs_near_duplicates"
+
+
+def get_state(conn: Connection, key: str, default: int = 0) -> int:
+    row = conn.execute(
+        text("SELECT value FROM app_state WHERE key = :key"),
+        {"key": key},
+    ).first()
+    return row[0] if row else default
+
+
+def get_data_version(conn: Connection) -> int:
+    return get_state(conn, DATA_VERSION_KEY)
+
+
+def set_state(db: Session, key: str, value: int):
+    """Upsert one app_state value; the caller commits."""
+    db.execute(
+        text(
+            "INSERT INTO app_state (key, value, updated_at) VALUES (:key, :value, :now) "
+            "ON CONFLICT(key) DO UPDATE SET value = :value, updated_at = :now"
+        ),
+        {"key": key, "value": value, "now": datetime.utcnow()},
+    )
+
+
+def bump_data_version(db: Session):
+    """Invalidate every versioned API cache entry; the caller commits."""
+    db.execute(
+        text(
+            "INSERT INTO app_state (key, value, updated_at) VALUES (:key, 1, :now) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1, updated_at = :now"
+        ),
+        {"key": DATA_VERSION_KEY, "now": datetime.utcnow()},
+    )
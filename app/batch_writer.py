@@ -0,0 +1,289 @@
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from . import instrumentation, models
+from .database import SessionLocal
+from .heavy_hitters import feed_word_sketches
+from .near_duplicates import assign_near_duplicates
+from .spikes import update_spike_detector
+
+# Records buffered between the producers and the writer. A full queue
+# blocks put(), which is the backpressure on the HTTP side.
+WRITER_QUEUE_SIZE = 5000
+
+# A group is committed once it holds this many records...
+GROUP_SIZE = 500
+
+# ...or this long after its first record arrived, whichever comes first.
+GROUP_WINDOW_SECONDS = 1.0
+
+_STOP = object()
+
+
+def _new_counts() -> Dict[str, Dict[str, int]]:
+    return defaultdict(lambda: {"inserted": 0, "updated": 0, "duplicates": 0, "near_duplicates": 0})
+
+
+class BatchWriteError(RuntimeError):
+    """A group failed to commit; raised to the producer on flush()/close()."""
+
+
+class BatchWriter:
+    """
+    The single thread that writes ingested rows. Producers put() plain
+    records ("review" / "reddit" / "achievement" dicts) and carry on with
+    the next HTTP page; the writer drains the queue into groups, dedupes
+    each group with one query per table and commits it in one transaction.
+    Near-duplicate flags, spike detectors and word sketches are updated in
+    the same transaction.
+
+    Each record carries the producer's instrumentation.game(), and the
+    writer runs its stages per game inside that context, so run reports
+    attribute writer time to games as well as producer time.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = WRITER_QUEUE_SIZE,
+        group_size: int = GROUP_SIZE,
+        group_window: float = GROUP_WINDOW_SECONDS,
+    ):
+        self.group_size = group_size
+        self.group_window = group_window
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._error: Optional[BaseException] = None
+        self.groups = 0
+        self.counts = _new_counts()
+        self._thread = threading.Thread(target=self._run, name="batch-writer", daemon=True)
+        self._thread.start()
+
+    # ---------------------------------------------------------------
+    # producer side
+    # ---------------------------------------------------------------
+
+    def put(self, kind: str, record: Dict):
+        item = (kind, record, instrumentation.current_game())
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with instrumentation.stage("writer.backpressure"):
+                self._queue.put(item)
+
+    def flush(self):
+        """Block until everything put so far is committed (or failed)."""
+        self._queue.join()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise BatchWriteError(f"Batch write failed: {error}") from error
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+        totals = ", ".join(
+            f"{kind}: {c['inserted']} new ({c['near_duplicates']} near-duplicate), "
+            f"{c['updated']} updated, {c['duplicates']} duplicate"
+            for kind, c in sorted(self.counts.items())
+        )
+        print(f"[WRITER] {self.groups} group commits; {totals or 'nothing written'}")
+        self.flush()
+
+    # ---------------------------------------------------------------
+    # writer thread
+    # ---------------------------------------------------------------
+
+    def _next_group(self) -> Tuple[List[Tuple[str, Dict, Optional[str]]], bool]:
+        """Wait for one record, then gather more until full or the window closes."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        group = [first]
+        deadline = time.monotonic() + self.group_window
+        while len(group) < self.group_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return group, True
+            group.append(item)
+        return group, False
+
+    def _run(self):
+        db: Session = SessionLocal()
+        try:
+            stop = False
+            while not stop:
+                group, stop = self._next_group()
+                if group:
+                    self._commit_group(db, group)
+                if stop:
+                    self._queue.task_done()  # the sentinel
+        finally:
+            db.close()
+
+    def _commit_group(self, db: Session, group: List[Tuple[str, Dict, Optional[str]]]):
+        # game -> kind -> records; games keep their arrival order
+        by_game: Dict[Optional[str], Dict[str, List[Dict]]] = defaultdict(lambda: defaultdict(list))
+        for kind, record, game in group:
+            by_game[game][kind].append(record)
+        # Counted per group and added to self.counts only once it commits.
+        counts = _new_counts()
+        try:
+            for game, by_kind in by_game.items():
+                with instrumentation.game(game):
+                    _write_reviews(db, by_kind.pop("review", []), counts["review"])
+                    _write_reddit(db, by_kind.pop("reddit", []), counts["reddit"])
+                    _write_achievements(db, by_kind.pop("achievement", []), counts["achievement"])
+                if by_kind:
+                    raise ValueError(f"Unknown record kinds: {sorted(by_kind)}")
+            with instrumentation.stage("writer.commit", rows=len(group)):
+                db.commit()
+            self.groups += 1
+            for kind, c in counts.items():
+                for key, n in c.items():
+                    self.counts[kind][key] += n
+        except Exception as e:
+            db.rollback()
+            self._error = e
+            print(f"[ERROR] Batch writer dropped a group of {len(group)} records: {e}")
+        finally:
+            db.expunge_all()
+            for _ in group:
+                self._queue.task_done()
+
+
+def _insert_returning_ids(db: Session, model, rows: List[Dict]) -> List[int]:
+    """executemany INSERT; ids come back in the order of `rows`."""
+    result = db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars())
+
+
+def _write_reviews(db: Session, records: List[Dict], counts: Dict[str, int]):
+    if not records:
+        return
+    m = models.SteamReviewRaw
+    by_game: Dict[int, List[Dict]] = defaultdict(list)
+    for r in records:
+        by_game[r["game_id"]].append(r)
+
+    new_rows: List[Dict] = []
+    with instrumentation.stage("writer.dedupe", rows=len(records)):
+        for game_id, rows in by_game.items():
+            seen = {
+                review_id
+                for (review_id,) in db.query(m.steam_review_id).filter(
+                    m.game_id == game_id,
+                    m.steam_review_id.in_({r["steam_review_id"] for r in rows}),
+                )
+            }
+            for r in rows:
+                if r["steam_review_id"] in seen:
+                    counts["duplicates"] += 1
+                    continue
+                seen.add(r["steam_review_id"])
+                new_rows.append(r)
+    if not new_rows:
+        return
+
+    with instrumentation.stage("writer.insert", rows=len(new_rows)):
+        ids = _insert_returning_ids(db, m, new_rows)
+    counts["inserted"] += len(new_rows)
+
+    with instrumentation.stage("writer.near_duplicates", rows=len(new_rows)):
+        dups = {}
+        for game_id in by_game:
+            dups.update(assign_near_duplicates(
+                db, "steam", game_id,
+                [(i, r["review_text"]) for i, r in zip(ids, new_rows) if r["game_id"] == game_id],
+            ))
+    counts["near_duplicates"] += len(dups)
+
+    with instrumentation.stage("writer.detectors", rows=len(new_rows)):
+        # Review bombs are exactly what the spike detector is for, so
+        # copies still count there; the word sketches see each text once.
+        for game_id in by_game:
+            update_spike_detector(
+                db,
+                game_id,
+                [(r["created_at_steam"], r["is_positive"]) for r in new_rows if r["game_id"] == game_id],
+            )
+        feed_word_sketches(
+            db,
+            [(r["created_at_steam"], r["review_text"]) for i, r in zip(ids, new_rows) if i not in dups],
+        )
+
+
+def _write_reddit(db: Session, records: List[Dict], counts: Dict[str, int]):
+    if not records:
+        return
+    m = models.RedditPostRaw
+    with instrumentation.stage("writer.dedupe", rows=len(records)):
+        seen = {
+            reddit_id
+            for (reddit_id,) in db.query(m.reddit_id).filter(
+                m.reddit_id.in_({r["reddit_id"] for r in records})
+            )
+        }
+        new_rows = []
+        for r in records:
+            if r["reddit_id"] in seen:
+                counts["duplicates"] += 1
+                continue
+            seen.add(r["reddit_id"])
+            new_rows.append(r)
+    if not new_rows:
+        return
+
+    # "text" is the tokenizer input for the word sketches, not a column.
+    with instrumentation.stage("writer.insert", rows=len(new_rows)):
+        ids = _insert_returning_ids(db, m, [{k: v for k, v in r.items() if k != "text"} for r in new_rows])
+    counts["inserted"] += len(new_rows)
+
+    with instrumentation.stage("writer.near_duplicates", rows=len(new_rows)):
+        dups = {}
+        for game_id in {r["game_id"] for r in new_rows}:
+            dups.update(assign_near_duplicates(
+                db, "reddit", game_id,
+                [(i, r["text"]) for i, r in zip(ids, new_rows) if r["game_id"] == game_id],
+            ))
+    counts["near_duplicates"] += len(dups)
+
+    with instrumentation.stage("writer.detectors", rows=len(new_rows)):
+        feed_word_sketches(
+            db, [(r["created_utc"], r["text"]) for i, r in zip(ids, new_rows) if i not in dups]
+        )
+
+
+def _write_achievements(db: Session, records: List[Dict], counts: Dict[str, int]):
+    if not records:
+        return
+    m = models.SteamAchievementRaw
+    by_game: Dict[int, Dict[str, Dict]] = defaultdict(dict)
+    for r in records:
+        by_game[r["game_id"]][r["api_name"]] = r  # last one wins
+
+    now = datetime.utcnow()
+    with instrumentation.stage("writer.upsert", rows=len(records)):
+        for game_id, rows in by_game.items():
+            existing = (
+                db.query(m)
+                .filter(m.game_id == game_id, m.api_name.in_(list(rows)))
+                .all()
+            )
+            for row in existing:
+                row.percent = rows.pop(row.api_name)["percent"]
+                row.ingested_at = now
+            counts["updated"] += len(existing)
+            if rows:
+                db.execute(insert(m), list(rows.values()))
+                counts["inserted"] += len(rows)
@@ -0,0 +1,75 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from . import models
+from .database import SessionLocal
+
+# Rows per keyset round trip; memory use is bounded by one batch.
+EXPORT_BATCH_SIZE = 1000
+
+# source name -> (model, exported columns)
+EXPORT_SOURCES = {
+    "reviews": (
+        models.SteamReviewRaw,
+        ("id", "steam_review_id", "is_positive", "language", "review_text",
+         "created_at_steam", "ingested_at"),
+    ),
+    "reddit": (
+        models.RedditPostRaw,
+        ("id", "reddit_id", "title", "body", "upvotes", "num_comments",
+         "created_utc", "ingested_at"),
+    ),
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def iter_ndjson(
+    source: str,
+    game_id: int,
+    since: Optional[datetime] = None,
+    after_id: int = 0,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield NDJSON chunks (one per batch) of a game's raw rows in id order.
+
+    Each batch is its own short query keyed on id, so the export never pins
+    a read transaction and a client can resume with after_id=<last id>.
+    The generator owns its session because it outlives the request handler.
+    """
+    model, columns = EXPORT_SOURCES[source]
+    cols = [getattr(model, c) for c in columns]
+
+    db = SessionLocal()
+    try:
+        while True:
+            q = db.query(*cols).filter(model.game_id == game_id, model.id > after_id)
+            if since is not None:
+                q = q.filter(model.ingested_at >= since)
+            rows = q.order_by(model.id).limit(batch_size).all()
+            if not rows:
+                return
+            yield b"".join(
+                json.dumps(dict(zip(columns, row)), default=_json_default).encode("utf-8") + b"\n"
+                for row in rows
+            )
+            after_id = rows[-1][0]
+            db.expire_all()
+    finally:
+        db.close()
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,343 @@
+import asyncio
+import datetime as dt
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from sqlalchemy.exc import OperationalError
+
+from .singleflight import SingleFlight
+
+# Where cached API results live:
+#   memory://                      per-process only
+#   sqlite:///./ragequit_cache.db  shared by every worker on one host
+#   redis://host:6379/0            shared across hosts (any Redis-protocol server)
+CACHE_URL = os.getenv("RAGEQUIT_CACHE_URL", "sqlite:///./ragequit_cache.db")
+
+# Entries are keyed by data_version, so the TTL only bounds how long dead
+# versions linger.
+DEFAULT_TTL_SECONDS = 3600.0
+
+# How often a worker re-reads data_version from the main database.
+VERSION_CHECK_SECONDS = 5.0
+
+MAX_MEMORY_ENTRIES = 2048
+
+KEY_PREFIX = "rq"
+
+_MISS = object()
+
+
+def _json_default(value):
+    # Dates come back as ISO strings, which the response schemas parse.
+    if isinstance(value, (dt.datetime, dt.date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    return json.loads(data)
+
+
+# -------------------------------------------------------------------
+# BACKENDS
+# -------------------------------------------------------------------
+
+
+class CacheBackend:
+    """Byte-oriented key/value store with per-entry expiry."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Thread-safe dict; nothing is shared between worker processes."""
+
+    def __init__(self, max_entries: int = MAX_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, bytes]] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                # dicts keep insertion order: drop the oldest entry
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.time() + ttl, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    On-disk cache in its own SQLite file (WAL mode), shared by all workers
+    on the host. Kept apart from ragequit.db so cache writes never contend
+    with the ingest/scoring jobs.
+    """
+
+    # Expired rows are swept every this many writes.
+    PRUNE_EVERY = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, now + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal RESP2 client (GET / SET EX) over one socket per thread, so any
+    Redis-protocol server works without an extra dependency.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        if self.db:
+            self._command("SELECT", str(self.db))
+
+    def _command(self, *args) -> Any:
+        if getattr(self._local, "sock", None) is None:
+            self._connect()
+        parts: List[bytes] = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        try:
+            self._local.sock.sendall(b"".join(parts))
+            return self._read_reply()
+        except (OSError, ConnectionError):
+            self._local.sock = None
+            raise
+
+    def _read_reply(self) -> Any:
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RuntimeError(rest.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = self._local.reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            return [self._read_reply() for _ in range(int(rest))]
+        raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._command("SET", key, value, "EX", max(1, int(ttl)))
+
+
+def backend_from_url(url: str) -> CacheBackend:
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryBackend()
+    if parsed.scheme == "sqlite":
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if parsed.scheme == "redis":
+        db = int(parsed.path.strip("/") or 0)
+        return RedisBackend(parsed.hostname or "127.0.0.1", parsed.port or 6379, db)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+# -------------------------------------------------------------------
+# VERSIONED CACHE
+# -------------------------------------------------------------------
+
+
+class VersionedCache:
+    """
+    JSON values under keys namespaced by the database's data_version.
+    The scoring job bumps that version, so every worker moves to fresh keys
+    at once and old entries simply expire. JSON rather than pickle: anyone
+    who can write to a shared store must not be able to run code here.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = DEFAULT_TTL_SECONDS, bind=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.bind = bind
+        self._version = 0
+        self._version_checked_at = float("-inf")
+        self.flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def data_version(self) -> int:
+        now = time.monotonic()
+        if now - self._version_checked_at >= VERSION_CHECK_SECONDS:
+            from .app_state import get_data_version
+
+            bind = self.bind
+            if bind is None:
+                from .database import engine as bind
+            try:
+                with bind.connect() as conn:
+                    self._version = get_data_version(conn)
+            except OperationalError:
+                pass  # app_state not created yet (migrate.py not run)
+            self._version_checked_at = now
+        return self._version
+
+    def _key(self, key: Tuple[Hashable, ...]) -> str:
+        return ":".join([KEY_PREFIX, f"v{self.data_version()}", *map(str, key)])
+
+    def _get(self, vkey: str, default):
+        try:
+            data = self.backend.get(vkey)
+        except Exception as e:
+            # A flaky shared cache must never take the API down.
+            self.errors += 1
+            print(f"[CACHE] get failed: {e}")
+            return default
+        if data is None:
+            self.misses += 1
+            return default
+        try:
+            value = loads(data)
+        except ValueError:
+            # Not ours (e.g. an entry written by an older release): a miss.
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def _set(self, vkey: str, value: Any):
+        try:
+            self.backend.set(vkey, dumps(value), self.ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"[CACHE] set failed: {e}")
+
+    def get(self, key: Tuple[Hashable, ...], default=None):
+        return self._get(self._key(key), default)
+
+    def set(self, key: Tuple[Hashable, ...], value: Any):
+        self._set(self._key(key), value)
+
+    def get_or_set(self, key: Tuple[Hashable, ...], loader: Callable[[], Any]):
+        """
+        Cached value or loader(). Concurrent misses for the same key run the
+        loader once; the rest wait for it (see SingleFlight).
+
+        The versioned key is fixed before the loader runs: if data_version
+        is bumped meanwhile, the result is stored under the version it was
+        read from, not served as the new one.
+        """
+        vkey = self._key(key)
+        value = self._get(vkey, _MISS)
+        if value is not _MISS:
+            return value
+
+        def load():
+            value = loader()
+            self._set(vkey, value)
+            return value
+
+        return self.flights.do(vkey, load)
+
+    async def get_or_set_async(
+        self, key: Tuple[Hashable, ...], loader: Callable[[], Awaitable[Any]]
+    ):
+        """get_or_set() for async handlers; loader returns a coroutine."""
+        vkey = await asyncio.to_thread(self._key, key)
+        value = await asyncio.to_thread(self._get, vkey, _MISS)
+        if value is not _MISS:
+            return value
+
+        async def load():
+            value = await loader()
+            await asyncio.to_thread(self._set, vkey, value)
+            return value
+
+        return await self.flights.do_async(vkey, load)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "backend": type(self.backend).__name__,
+            "data_version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+# Shared by the API routes and the startup warm-up.
+api_cache = VersionedCache(backend_from_url(CACHE_URL))
@@ -0,0 +1,244 @@
+import datetime as dt
+import json
+import os
+import shutil
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import Integer, case, cast, func, literal
+from sqlalchemy.orm import Session
+
+from . import models
+from .crud import STREAM_CHUNK_SIZE
+from .features import FEATURE_COLUMNS
+from .rollups import DUP_COLUMNS, ROLLUP_COLUMNS, score_near_duplicates, window_start
+
+SNAPSHOT_ROOT = "columnar_snapshot"
+CURRENT_LINK = "current"
+KEEP_VERSIONS = 2
+
+# One fixed-width array per column, all sorted by (game, ts). Archived days
+# become weighted positive/negative rows (and the same for their
+# near-duplicates) stamped at midnight.
+COLUMNS = {
+    "ts": np.int64,        # epoch seconds, coalesce(created_at_steam, ingested_at)
+    "positive": np.uint8,
+    "weight": np.int32,    # reviews this row stands for (1 for raw rows)
+    "dup": np.uint8,       # near-duplicate (dup_of set)
+    **{c: np.int32 for c in FEATURE_COLUMNS},
+}
+
+_SECONDS_PER_DAY = 86400
+_EPOCH = dt.date(1970, 1, 1)
+
+
+# -------------------------------------------------------------------
+# WRITER (scoring job)
+# -------------------------------------------------------------------
+
+
+# Column order of the int64 matrices built while collecting.
+_MATRIX_COLUMNS = ("game_id",) + tuple(COLUMNS)
+
+
+def _collect(db: Session) -> Dict[str, np.ndarray]:
+    r = models.SteamReviewRaw
+    a = models.ArchivedDailyTotal
+    ts = cast(func.strftime("%s", func.coalesce(r.created_at_steam, r.ingested_at)), Integer)
+    parts: List[np.ndarray] = []
+
+    hot = (
+        db.query(
+            r.game_id,
+            ts,
+            r.is_positive,
+            literal(1),
+            case((r.dup_of.is_(None), 0), else_=1),
+            *[func.coalesce(getattr(r, c), 0) for c in FEATURE_COLUMNS],
+        )
+        .execution_options(yield_per=STREAM_CHUNK_SIZE)
+    )
+    batch = []
+    for row in hot:
+        batch.append(row)
+        if len(batch) >= STREAM_CHUNK_SIZE:
+            parts.append(np.array(batch, dtype=np.int64))
+            batch = []
+    if batch:
+        parts.append(np.array(batch, dtype=np.int64))
+
+    # Days whose raw reviews the retention job archived
+    archived = db.query(
+        a.game_id,
+        a.day,
+        *[getattr(a, c) for c in ROLLUP_COLUMNS],
+        *[func.coalesce(getattr(a, c), 0) for c in DUP_COLUMNS],
+    ).filter(a.source == "steam")
+    rows = []
+    no_features = [0] * len(FEATURE_COLUMNS)
+    width = len(ROLLUP_COLUMNS)
+    for game_id, day, *sums in archived:
+        midnight = (day - _EPOCH).days * _SECONDS_PER_DAY
+        for dup, (total, negatives, *features) in enumerate((sums[:width], sums[width:])):
+            if dup and not total:
+                continue
+            rows.append([game_id, midnight, 1, total - negatives, dup, *no_features])
+            rows.append([game_id, midnight, 0, negatives, dup, *features])
+    if rows:
+        parts.append(np.array(rows, dtype=np.int64))
+
+    if not parts:
+        parts.append(np.empty((0, len(_MATRIX_COLUMNS)), dtype=np.int64))
+    matrix = np.concatenate(parts)
+    return {name: matrix[:, i] for i, name in enumerate(_MATRIX_COLUMNS)}
+
+
+def _swap_current(root: str, version: str):
+    link = os.path.join(root, CURRENT_LINK)
+    tmp_link = link + ".tmp"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.join("versions", version), tmp_link)
+    os.replace(tmp_link, link)
+
+
+def write_snapshot(db: Session, root: str = SNAPSHOT_ROOT, config: Optional[Dict] = None) -> Dict:
+    """
+    Dump review metadata as sorted .npy columns plus a per-game offset
+    index into a new version directory, then swap root/current to it.
+    The config's near-duplicate rule is recorded for review_counts().
+    """
+    columns = _collect(db)
+    order = np.lexsort((columns["ts"], columns["game_id"]))
+    game_ids = columns.pop("game_id")[order]
+
+    games, starts = np.unique(game_ids, return_index=True)
+    offsets = np.append(starts, len(game_ids)).astype(np.int64)
+
+    version = dt.datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    base = os.path.join(root, "versions", version)
+    os.makedirs(base)
+    np.save(os.path.join(base, "games.npy"), games.astype(np.int64))
+    np.save(os.path.join(base, "offsets.npy"), offsets)
+    for name, dtype in COLUMNS.items():
+        np.save(os.path.join(base, f"{name}.npy"), columns[name][order].astype(dtype))
+
+    meta = {
+        "version": version,
+        "rows": int(len(game_ids)),
+        "games": int(len(games)),
+        "score_near_duplicates": score_near_duplicates(config),
+    }
+    with open(os.path.join(base, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    _swap_current(root, version)
+    versions_dir = os.path.join(root, "versions")
+    for old in sorted(os.listdir(versions_dir))[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(versions_dir, old), ignore_errors=True)
+    return meta
+
+
+# -------------------------------------------------------------------
+# READER (API)
+# -------------------------------------------------------------------
+
+
+class ColumnarSnapshot:
+    """Memory-mapped, read-only view of one snapshot version."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.games = np.load(os.path.join(path, "games.npy"))
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in COLUMNS
+        }
+
+    def _slice(self, game_id: int) -> Optional[slice]:
+        i = int(np.searchsorted(self.games, game_id))
+        if i >= len(self.games) or self.games[i] != game_id:
+            return None
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def has_game(self, game_id: int) -> bool:
+        return self._slice(game_id) is not None
+
+    def timeline(self, game_id: int) -> List[Dict]:
+        """Same points as crud.get_game_rage_timeline, from array slices."""
+        s = self._slice(game_id)
+        if s is None:
+            return []
+        days = self.columns["ts"][s] // _SECONDS_PER_DAY
+        weight = np.asarray(self.columns["weight"][s], dtype=np.int64)
+        negative = np.where(self.columns["positive"][s] == 0, weight, 0)
+
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        totals = np.add.reduceat(weight, starts)
+        negatives = np.add.reduceat(negative, starts)
+
+        points = []
+        for day, total, neg in zip(days[starts].tolist(), totals.tolist(), negatives.tolist()):
+            if total == 0:
+                continue
+            points.append(
+                {
+                    "date": _EPOCH + dt.timedelta(days=day),
+                    "rage_score": (neg / total) * 100.0,
+                    "positive": total - neg,
+                    "negative": neg,
+                    "total": total,
+                }
+            )
+        return points
+
+    def review_counts(self, game_id: int, window: str, today: Optional[dt.date] = None) -> Dict[str, int]:
+        """
+        Steam review and feature totals for one game over a score window,
+        with near-duplicates counted the way the daily rollups count them.
+        """
+        s = self._slice(game_id)
+        out = {"rows": 0, "negatives": 0, **{c: 0 for c in FEATURE_COLUMNS}}
+        if s is None:
+            return out
+        ts = self.columns["ts"][s]
+        since = window_start(window, today)
+        lo = 0
+        if since is not None:
+            lo = int(np.searchsorted(ts, (since - _EPOCH).days * _SECONDS_PER_DAY))
+        part = slice(s.start + lo, s.stop)
+
+        keep = np.ones(part.stop - part.start, dtype=bool)
+        if not self.meta.get("score_near_duplicates", False):
+            keep = self.columns["dup"][part] == 0
+        weight = np.asarray(self.columns["weight"][part], dtype=np.int64)[keep]
+        out["rows"] = int(weight.sum())
+        out["negatives"] = int(weight[self.columns["positive"][part][keep] == 0].sum())
+        for c in FEATURE_COLUMNS:
+            out[c] = int(np.asarray(self.columns[c][part], dtype=np.int64)[keep].sum())
+        return out
+
+
+_snapshot: Optional[ColumnarSnapshot] = None
+_lock = threading.Lock()
+
+
+def get_snapshot(root: str = SNAPSHOT_ROOT) -> Optional[ColumnarSnapshot]:
+    """The current snapshot, remapped whenever the scoring job swaps in a new one."""
+    global _snapshot
+    link = os.path.join(root, CURRENT_LINK)
+    try:
+        path = os.path.join(root, os.readlink(link))
+    except OSError:
+        return None
+    with _lock:
+        if _snapshot is None or _snapshot.path != path:
+            try:
+                _snapshot = ColumnarSnapshot(path)
+            except OSError:
+                return None
+        return _snapshot
@@ -0,0 +1,141 @@
+import re
+import struct
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import Text, text
+from sqlalchemy.types import TypeDecorator
+
+# Stored blob layout: 1-byte format tag, 2-byte dictionary id, zlib stream.
+# Dictionary id 0 means "no preset dictionary".
+FORMAT_ZLIB = 1
+_HEADER = struct.Struct(">BH")
+
+# Short values barely compress, so they stay plain text.
+MIN_COMPRESS_CHARS = 96
+
+# zlib only looks back 32 KiB, so a bigger preset dictionary is wasted.
+MAX_DICT_BYTES = 32 * 1024
+
+COMPRESSION_LEVEL = 9
+
+_dicts: Dict[int, bytes] = {}
+_active_dict_id: int = 0
+_loaded = False
+
+
+def register_dictionary(dict_id: int, data: bytes, active: bool = False):
+    global _active_dict_id
+    _dicts[dict_id] = data
+    if active or dict_id > _active_dict_id:
+        _active_dict_id = dict_id
+
+
+def active_dictionary_id() -> int:
+    """Dictionary new values are compressed with (0 = none)."""
+    _ensure_loaded()
+    return _active_dict_id
+
+
+def load_dictionaries(bind=None):
+    """Load every stored compression dictionary; the newest one becomes active."""
+    global _loaded
+    if bind is None:
+        from .database import engine as bind
+
+    with bind.connect() as conn:
+        exists = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type='table' AND name='compression_dicts'")
+        ).first()
+        if exists:
+            for dict_id, data in conn.execute(text("SELECT id, data FROM compression_dicts ORDER BY id")):
+                register_dictionary(dict_id, bytes(data))
+    _loaded = True
+
+
+def _ensure_loaded():
+    if not _loaded:
+        load_dictionaries()
+
+
+def compress_text(value: str) -> bytes:
+    _ensure_loaded()
+    raw = value.encode("utf-8")
+    dict_id = _active_dict_id
+    if dict_id:
+        c = zlib.compressobj(COMPRESSION_LEVEL, zdict=_dicts[dict_id])
+    else:
+        c = zlib.compressobj(COMPRESSION_LEVEL)
+    return _HEADER.pack(FORMAT_ZLIB, dict_id) + c.compress(raw) + c.flush()
+
+
+def decompress_text(blob: bytes) -> str:
+    fmt, dict_id = _HEADER.unpack_from(blob)
+    if fmt != FORMAT_ZLIB:
+        raise ValueError(f"Unknown compressed text format {fmt}")
+    if dict_id and dict_id not in _dicts:
+        # Dictionary trained by another process after we loaded ours.
+        load_dictionaries()
+    if dict_id:
+        d = zlib.decompressobj(zdict=_dicts[dict_id])
+    else:
+        d = zlib.decompressobj()
+    return (d.decompress(blob[_HEADER.size:]) + d.flush()).decode("utf-8")
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICT_BYTES) -> bytes:
+    """
+    Build a zlib preset dictionary from sample texts.
+
+    Picks the word 1-3 grams that would save the most bytes across the
+    samples, most valuable last since zlib favours nearby matches.
+    """
+    counts: Counter = Counter()
+    for sample in samples:
+        words = re.findall(r"\S+", sample or "")
+        for n in (1, 2, 3):
+            for i in range(len(words) - n + 1):
+                counts[" ".join(words[i : i + n])] += 1
+
+    scored = [
+        (freq * len(gram), gram)
+        for gram, freq in counts.items()
+        if freq > 1 and len(gram) > 3
+    ]
+    scored.sort(reverse=True)
+
+    picked = []
+    used = 0
+    for _, gram in scored:
+        chunk = (gram + " ").encode("utf-8")
+        if used + len(chunk) > size:
+            continue
+        picked.append(chunk)
+        used += len(chunk)
+        if size - used < 8:
+            break
+
+    return b"".join(reversed(picked))
+
+
+class CompressedText(TypeDecorator):
+    """
+    Text column stored zlib-compressed with a shared preset dictionary.
+
+    SQLite keeps values by their runtime type, so compressed rows are
+    BLOBs while short and not-yet-migrated rows stay TEXT; reads handle both.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect):
+        if value is None or len(value) < MIN_COMPRESS_CHARS:
+            return value
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect) -> Optional[str]:
+        if isinstance(value, (bytes, memoryview)):
+            return decompress_text(bytes(value))
+        return value
@@ -1,41 +1,57 @@
+import datetime as dt
+from collections import Counter
+
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import asc, desc, func
 
 from . import models
+from .scoring import tokenize_rage_words
 
+# Rows fetched per round trip when streaming large per-game scans.
+STREAM_CHUNK_SIZE = 1000
 
-def get_all_games_with_scores(db: Session, limit: int = 50, offset: int = 0):
-    q = (
-        db.query(models.Game, models.GameRageScore)
-        .join(models.GameRageScore, models.Game.id == models.GameRageScore.game_id)
-        .order_by(desc(models.GameRageScore.rage_score))
-        .limit(limit)
-        .offset(offset)
-    )
-    rows = q.all()
-    results = []
-    for game, score in rows:
-        results.append(
-            {
-                "id": game.id,
-                "name": game.name,
-                "slug": game.slug,
-                "rage_score": score.rage_score,
-            }
+
+def _leaderboard(
+    db: Session,
+    column: str,
+    limit: int = 50,
+    offset: int = 0,
+    ascending: bool = False,
+    window: str = "all",
+):
+    """Games ordered by one score column; non-'all' windows read GameWindowScore."""
+    if window == "all":
+        score_model = models.GameRageScore
+        q = db.query(models.Game, score_model).join(
+            score_model, models.Game.id == score_model.game_id
+        )
+    else:
+        score_model = models.GameWindowScore
+        q = (
+            db.query(models.Game, score_model)
+            .join(score_model, models.Game.id == score_model.game_id)
+            .filter(score_model.window == window)
         )
-    return results
+    col = getattr(score_model, column)
+    q = q.order_by(asc(col) if ascending else desc(col)).limit(limit).offset(offset)
+    return [
+        {
+            "id": g.id,
+            "name": g.name,
+            "slug": g.slug,
+            "rage_score": getattr(s, column),
+        }
+        for g, s in q.all()
+    ]
 
 
-def get_game_detail(db: Session, game_id: int):
-    row = (
-        db.query(models.Game, models.GameRageScore)
-        .join(models.GameRageScore, models.Game.id == models.GameRageScore.game_id)
-        .filter(models.Game.id == game_id)
-        .first()
-    )
-    if not row:
-        return None
-    game, score = row
+def get_all_games_with_scores(
+    db: Session, limit: int = 50, offset: int = 0, window: str = "all"
+):
+    return _leaderboard(db, "rage_score", limit=limit, offset=offset, window=window)
+
+
+def _game_detail_dict(game: models.Game, score: models.GameRageScore):
     return {
         "id": game.id,
         "name": game.name,
@@ -54,116 +70,260 @@ def get_game_detail(db: Session, game_id: int):
     }
 
 
+def _apply_window(db: Session, detail, window: str):
+    """Swap the category scores in a detail payload for a windowed score."""
+    if detail is None or window == "all":
+        return detail
+    ws = db.get(models.GameWindowScore, (detail["id"], window))
+    if ws is None:
+        return None
+    for key in (
+        "rage_score",
+        "difficulty_rage",
+        "technical_rage",
+        "social_toxicity_rage",
+        "ui_design_rage",
+    ):
+        detail["rage"][key] = getattr(ws, key)
+    return detail
+
+
+def get_game_detail(db: Session, game_id: int, window: str = "all"):
+    row = (
+        db.query(models.Game, models.GameRageScore)
+        .join(models.GameRageScore, models.Game.id == models.GameRageScore.game_id)
+        .filter(models.Game.id == game_id)
+        .first()
+    )
+    if not row:
+        return None
+    game, score = row
+    return _apply_window(db, _game_detail_dict(game, score), window)
+
+
+def iter_game_details(db: Session):
+    """Stream the detail payload of every scored game."""
+    s = models.GameRageScore
+    q = (
+        db.query(
+            models.Game.id,
+            models.Game.name,
+            models.Game.slug,
+            s.rage_score,
+            s.difficulty_rage,
+            s.technical_rage,
+            s.social_toxicity_rage,
+            s.ui_design_rage,
+            s.max_achievement_drop,
+            s.max_drop_from,
+            s.max_drop_to,
+            s.max_drop_achievement,
+        )
+        .join(s, models.Game.id == s.game_id)
+        .order_by(models.Game.id)
+        .execution_options(yield_per=STREAM_CHUNK_SIZE)
+    )
+    for row in q:
+        # Rows expose the same attribute names as Game / GameRageScore.
+        yield _game_detail_dict(row, row)
+
+
 def get_game_by_slug(db: Session, slug: str):
     return db.query(models.Game).filter(models.Game.slug == slug).first()
 
 
-def get_game_scores_by_slug(db: Session, slug: str):
+def get_game_scores_by_slug(db: Session, slug: str, window: str = "all"):
     game = get_game_by_slug(db, slug)
     if not game or not game.rage_score:
         return None
-    score = game.rage_score
-    return {
-        "id": game.id,
-        "name": game.name,
-        "slug": game.slug,
-        "rage": {
-            "rage_score": score.rage_score,
-            "difficulty_rage": score.difficulty_rage,
-            "technical_rage": score.technical_rage,
-            "social_toxicity_rage": score.social_toxicity_rage,
-            "ui_design_rage": score.ui_design_rage,
-            "max_achievement_drop": score.max_achievement_drop,
-            "max_drop_from": score.max_drop_from,
-            "max_drop_to": score.max_drop_to,
-            "max_drop_achievement": score.max_drop_achievement,
-        },
-    }
+    return _apply_window(db, _game_detail_dict(game, game.rage_score), window)
 
 
 def get_game_scores_by_id(db: Session, game_id: int):
     return get_game_detail(db, game_id)
 
-from sqlalchemy import desc, asc
+def list_games_by_rage_score(
+    db: Session, limit: int = 50, offset: int = 0, window: str = "all"
+):
+    return get_all_games_with_scores(db, limit=limit, offset=offset, window=window)
 
 
-def list_games_by_rage_score(db: Session, limit: int = 50, offset: int = 0):
-    return get_all_games_with_scores(db, limit=limit, offset=offset)
+def list_games_by_difficulty(db: Session, limit: int = 50, window: str = "all"):
+    return _leaderboard(db, "difficulty_rage", limit=limit, window=window)
 
 
-def list_games_by_difficulty(db: Session, limit: int = 50):
-    q = (
-        db.query(models.Game, models.GameRageScore)
-        .join(models.GameRageScore, models.Game.id == models.GameRageScore.game_id)
-        .order_by(desc(models.GameRageScore.difficulty_rage))
+def list_games_by_technical(db: Session, limit: int = 50, window: str = "all"):
+    return _leaderboard(db, "technical_rage", limit=limit, window=window)
+
+
+def list_games_by_toxicity(db: Session, limit: int = 50, window: str = "all"):
+    return _leaderboard(db, "social_toxicity_rage", limit=limit, window=window)
+
+
+def list_coziest_games(db: Session, limit: int = 50, window: str = "all"):
+    """Lowest overall RageScore = coziest games."""
+    return _leaderboard(db, "rage_score", limit=limit, ascending=True, window=window)
+
+
+# Leaderboard route name -> query, shared by the API cache and static export.
+LEADERBOARDS = {
+    "most-rage": list_games_by_rage_score,
+    "difficulty": list_games_by_difficulty,
+    "technical": list_games_by_technical,
+    "toxicity": list_games_by_toxicity,
+    "cozy": list_coziest_games,
+}
+
+
+def get_game_reviews(db: Session, game_id: int, limit: int = 20):
+    """Newest Steam reviews for one game."""
+    r = models.SteamReviewRaw
+    rows = (
+        db.query(r.is_positive, r.language, r.review_text, r.created_at_steam)
+        .filter(r.game_id == game_id)
+        .order_by(r.created_at_steam.desc())
         .limit(limit)
     )
-    rows = q.all()
     return [
         {
-            "id": g.id,
-            "name": g.name,
-            "slug": g.slug,
-            "rage_score": s.difficulty_rage,
+            "is_positive": is_positive,
+            "language": language,
+            "review_text": text or "",
+            "created_at_steam": created,
         }
-        for g, s in rows
+        for is_positive, language, text, created in rows
     ]
 
 
-def list_games_by_technical(db: Session, limit: int = 50):
-    q = (
-        db.query(models.Game, models.GameRageScore)
-        .join(models.GameRageScore, models.Game.id == models.GameRageScore.game_id)
-        .order_by(desc(models.GameRageScore.technical_rage))
+def get_game_reddit_posts(db: Session, game_id: int, limit: int = 20):
+    """Most upvoted Reddit posts for one game."""
+    p = models.RedditPostRaw
+    rows = (
+        db.query(p.title, p.body, p.upvotes, p.num_comments, p.created_utc)
+        .filter(p.game_id == game_id)
+        .order_by(p.upvotes.desc())
         .limit(limit)
     )
-    rows = q.all()
     return [
         {
-            "id": g.id,
-            "name": g.name,
-            "slug": g.slug,
-            "rage_score": s.technical_rage,
+            "title": title or "",
+            "body": body or "",
+            "upvotes": upvotes,
+            "num_comments": num_comments,
+            "created_utc": created,
         }
-        for g, s in rows
+        for title, body, upvotes, num_comments, created in rows
     ]
 
 
-def list_games_by_toxicity(db: Session, limit: int = 50):
-    q = (
-        db.query(models.Game, models.GameRageScore)
-        .join(models.GameRageScore, models.Game.id == models.GameRageScore.game_id)
-        .order_by(desc(models.GameRageScore.social_toxicity_rage))
-        .limit(limit)
+def get_game_clips(db: Session, game_id: int):
+    c = models.RageClip
+    rows = (
+        db.query(c.id, c.source, c.url, c.title, c.thumbnail_url)
+        .filter(c.game_id == game_id)
+        .order_by(c.added_at.desc())
     )
-    rows = q.all()
-    return [
-        {
-            "id": g.id,
-            "name": g.name,
-            "slug": g.slug,
-            "rage_score": s.social_toxicity_rage,
-        }
-        for g, s in rows
-    ]
+    return [row._asdict() for row in rows]
 
 
-def list_coziest_games(db: Session, limit: int = 50):
-    """Lowest overall RageScore = coziest games."""
-    q = (
-        db.query(models.Game, models.GameRageScore)
-        .join(models.GameRageScore, models.Game.id == models.GameRageScore.game_id)
-        .order_by(asc(models.GameRageScore.rage_score))
-        .limit(limit)
+def get_game_rage_words(db: Session, game_id: int, limit: int = 50):
+    """
+    Word cloud over a game's reviews and Reddit posts.
+
+    Only the text columns are selected and they are streamed in chunks,
+    so memory is bounded by the vocabulary rather than the review count.
+    """
+    counter: Counter = Counter()
+
+    reviews = (
+        db.query(models.SteamReviewRaw.review_text)
+        .filter(
+            models.SteamReviewRaw.game_id == game_id,
+            models.SteamReviewRaw.dup_of.is_(None),  # copypasta counts once
+        )
+        .execution_options(yield_per=STREAM_CHUNK_SIZE)
     )
-    rows = q.all()
+    for (review_text,) in reviews:
+        if review_text:
+            counter.update(tokenize_rage_words(review_text))
+
+    reddit_posts = (
+        db.query(models.RedditPostRaw.title, models.RedditPostRaw.body)
+        .filter(
+            models.RedditPostRaw.game_id == game_id,
+            models.RedditPostRaw.dup_of.is_(None),
+        )
+        .execution_options(yield_per=STREAM_CHUNK_SIZE)
+    )
+    for title, body in reddit_posts:
+        if title:
+            counter.update(tokenize_rage_words(title))
+        if body:
+            counter.update(tokenize_rage_words(body))
+
+    if not counter:
+        return []
+
+    most_common = counter.most_common(limit)
+    max_count = most_common[0][1]
     return [
-        {
-            "id": g.id,
-            "name": g.name,
-            "slug": g.slug,
-            "rage_score": s.rage_score,
-        }
-        for g, s in rows
+        {"word": word, "score": (count / max_count) * 100.0}
+        for word, count in most_common
     ]
 
+
+def get_game_rage_timeline(db: Session, game_id: int):
+    """Daily positive/negative review counts, streamed without loading review text."""
+    rows = (
+        db.query(
+            models.SteamReviewRaw.created_at_steam,
+            models.SteamReviewRaw.ingested_at,
+            models.SteamReviewRaw.is_positive,
+        )
+        .filter(models.SteamReviewRaw.game_id == game_id)
+        .execution_options(yield_per=STREAM_CHUNK_SIZE)
+    )
+
+    buckets: dict[dt.date, dict[str, int]] = {}
+    for created_at_steam, ingested_at, is_positive in rows:
+        ts = created_at_steam or ingested_at
+        if not ts:
+            continue
+        day = ts.date()
+        if day not in buckets:
+            buckets[day] = {"pos": 0, "neg": 0}
+        if is_positive:
+            buckets[day]["pos"] += 1
+        else:
+            buckets[day]["neg"] += 1
+
+    # Days whose raw reviews were moved out by the retention job; like the
+    # hot rows above, near-duplicates count here.
+    a = models.ArchivedDailyTotal
+    archived = db.query(
+        a.day,
+        a.rows + func.coalesce(a.dup_rows, 0),
+        a.negatives + func.coalesce(a.dup_negatives, 0),
+    ).filter(a.game_id == game_id, a.source == "steam")
+    for day, rows, negatives in archived:
+        if day not in buckets:
+            buckets[day] = {"pos": 0, "neg": 0}
+        buckets[day]["pos"] += rows - negatives
+        buckets[day]["neg"] += negatives
+
+    points = []
+    for day in sorted(buckets.keys()):
+        pos = buckets[day]["pos"]
+        neg = buckets[day]["neg"]
+        total = pos + neg
+        rage_score = (neg / total) * 100.0 if total > 0 else 0.0
+        points.append(
+            {
+                "date": day,
+                "rage_score": rage_score,
+                "positive": pos,
+                "negative": neg,
+                "total": total,
+            }
+        )
+    return points
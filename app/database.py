@@ -1,7 +1,9 @@
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./ragequit.db"
+DATABASE_URL = os.getenv("RAGEQUIT_DATABASE_URL", "sqlite:///./ragequit.db")
 
 engine = create_engine(
     DATABASE_URL, connect_args={"check_same_thread": False}
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .scoring import FEATURES_VERSION, extract_review_features
+
+FEATURE_COLUMNS = ("rage_points", "diff_hits", "tech_hits", "toxic_hits", "ui_hits")
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def reddit_post_text(title: Optional[str], body: Optional[str]) -> str:
+    return (title or "") + "\n" + (body or "")
+
+
+def review_features(review_text: Optional[str], is_positive: bool) -> Dict[str, int]:
+    return extract_review_features(review_text or "", is_positive)
+
+
+def reddit_features(title: Optional[str], body: Optional[str]) -> Dict[str, int]:
+    # Reddit posts come from a rage-focused search, so they count as negative.
+    return extract_review_features(reddit_post_text(title, body), False)
+
+
+def _stale(model):
+    return or_(
+        model.features_version.is_(None),
+        model.features_version != FEATURES_VERSION,
+    )
+
+
+def _backfill_table(
+    db: Session, model, text_columns, features_fn, batch_size: int, game_ids: Optional[list]
+) -> int:
+    # Scoped to games, the scan rides the (game_id, created) index instead
+    # of reading the whole table.
+    scope = [model.game_id.in_(game_ids)] if game_ids is not None else []
+    updated = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(model.id, *text_columns)
+            .filter(model.id > last_id, _stale(model), *scope)
+            .order_by(model.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        db.execute(
+            update(model),
+            [{"id": row[0], **features_fn(*row[1:])} for row in rows],
+        )
+        db.commit()
+        last_id = rows[-1][0]
+        updated += len(rows)
+    return updated
+
+
+def backfill_features(
+    db: Session,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    game_ids: Optional[Iterable[int]] = None,
+) -> Dict[str, int]:
+    """
+    (Re-)extract features for rows that are missing them or carry an old
+    version stamp; only rows of game_ids when given.
+    """
+    if game_ids is not None:
+        game_ids = list(game_ids)
+    reviews = _backfill_table(
+        db,
+        models.SteamReviewRaw,
+        (models.SteamReviewRaw.review_text, models.SteamReviewRaw.is_positive),
+        review_features,
+        batch_size,
+        game_ids,
+    )
+    posts = _backfill_table(
+        db,
+        models.RedditPostRaw,
+        (models.RedditPostRaw.title, models.RedditPostRaw.body),
+        reddit_features,
+        batch_size,
+        game_ids,
+    )
+    return {"reviews": reviews, "reddit_posts": posts}
@@ -0,0 +1,125 @@
+import base64
+import datetime as dt
+import heapq
+from itertools import islice
+from typing import Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from . import models
+
+FEED_DEFAULT_LIMIT = 20
+FEED_MAX_LIMIT = 100
+
+# Tie-break order between sources for rows with the same timestamp.
+SOURCE_RANK = {"steam": 1, "reddit": 0}
+
+# (created_at, source rank, row id) of the last item on the previous page.
+FeedKey = Tuple[dt.datetime, int, int]
+
+
+def encode_cursor(key: FeedKey) -> str:
+    created, rank, row_id = key
+    raw = f"{created.isoformat()}|{rank}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> FeedKey:
+    """Raises ValueError for anything that is not a cursor we handed out."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created, rank, row_id = raw.split("|")
+        return dt.datetime.fromisoformat(created), int(rank), int(row_id)
+    except (UnicodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid feed cursor: {cursor!r}") from e
+
+
+def _after(ts_column, id_column, rank: int, cursor: FeedKey):
+    """
+    Rows of one source that sort strictly after the cursor in
+    (created_at, rank, id) descending order.
+    """
+    c_created, c_rank, c_id = cursor
+    if rank < c_rank:
+        return ts_column <= c_created
+    if rank > c_rank:
+        return ts_column < c_created
+    return or_(
+        ts_column < c_created,
+        and_(ts_column == c_created, id_column < c_id),
+    )
+
+
+def _steam_stream(db: Session, game_id: int, cursor: Optional[FeedKey], limit: int) -> Iterator[Tuple[FeedKey, Dict]]:
+    r = models.SteamReviewRaw
+    rank = SOURCE_RANK["steam"]
+    q = db.query(
+        r.id, r.created_at_steam, r.is_positive, r.language, r.review_text
+    ).filter(r.game_id == game_id, r.created_at_steam.isnot(None))
+    if cursor is not None:
+        q = q.filter(_after(r.created_at_steam, r.id, rank, cursor))
+    q = q.order_by(r.created_at_steam.desc(), r.id.desc()).limit(limit)
+
+    for row_id, created, is_positive, language, text in q.execution_options(yield_per=limit):
+        yield (created, rank, row_id), {
+            "source": "steam",
+            "id": row_id,
+            "created_at": created,
+            "is_positive": is_positive,
+            "language": language,
+            "review_text": text or "",
+        }
+
+
+def _reddit_stream(db: Session, game_id: int, cursor: Optional[FeedKey], limit: int) -> Iterator[Tuple[FeedKey, Dict]]:
+    p = models.RedditPostRaw
+    rank = SOURCE_RANK["reddit"]
+    q = db.query(
+        p.id, p.created_utc, p.title, p.body, p.upvotes, p.num_comments
+    ).filter(p.game_id == game_id, p.created_utc.isnot(None))
+    if cursor is not None:
+        q = q.filter(_after(p.created_utc, p.id, rank, cursor))
+    q = q.order_by(p.created_utc.desc(), p.id.desc()).limit(limit)
+
+    for row_id, created, title, body, upvotes, num_comments in q.execution_options(yield_per=limit):
+        yield (created, rank, row_id), {
+            "source": "reddit",
+            "id": row_id,
+            "created_at": created,
+            "title": title or "",
+            "body": body or "",
+            "upvotes": upvotes,
+            "num_comments": num_comments,
+        }
+
+
+def get_game_feed(
+    db: Session,
+    game_id: int,
+    limit: int = FEED_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Dict:
+    """
+    Newest-first page of Steam reviews and Reddit posts for one game.
+
+    Both sources are read in index order and merged lazily, so at most
+    limit + 1 rows are pulled from each and only as many as the page
+    needs are decoded.
+    """
+    limit = max(1, min(limit, FEED_MAX_LIMIT))
+    after = decode_cursor(cursor) if cursor else None
+
+    streams = [
+        _steam_stream(db, game_id, after, limit + 1),
+        _reddit_stream(db, game_id, after, limit + 1),
+    ]
+    merged = heapq.merge(*streams, key=lambda item: item[0], reverse=True)
+    page = list(islice(merged, limit + 1))
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1][0])
+
+    return {"items": [item for _, item in page], "next_cursor": next_cursor}
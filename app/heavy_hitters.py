@@ -0,0 +1,154 @@
+import datetime as dt
+import heapq
+import json
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .scoring import tokenize_rage_words
+
+# Counters kept per sketch. Any word's count is overestimated by at most
+# total / SKETCH_CAPACITY, and every word above that frequency is kept.
+SKETCH_CAPACITY = 2000
+
+GLOBAL_KEY = "global"
+
+
+def week_key(day: dt.date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"week:{year}-W{week:02d}"
+
+
+class SpaceSaving:
+    """
+    Mergeable Space-Saving summary of the top `capacity` words.
+
+    counts[w] overestimates the true count by at most errors[w], which is
+    itself at most total / capacity.
+    """
+
+    def __init__(self, capacity: int = SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def _floor(self) -> int:
+        # Unmonitored words may have been seen up to min-count times.
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def merge(self, other: "SpaceSaving"):
+        floor_a = self._floor()
+        floor_b = other._floor()
+        counts: Dict[str, int] = {}
+        errors: Dict[str, int] = {}
+        for word in set(self.counts) | set(other.counts):
+            counts[word] = self.counts.get(word, floor_a) + other.counts.get(word, floor_b)
+            errors[word] = self.errors.get(word, floor_a) + other.errors.get(word, floor_b)
+
+        keep = heapq.nlargest(self.capacity, counts, key=counts.get)
+        self.counts = {w: counts[w] for w in keep}
+        self.errors = {w: errors[w] for w in keep}
+        self.total += other.total
+
+    def update(self, tokens: Counter):
+        """Fold in an exact batch of token counts."""
+        batch = SpaceSaving(self.capacity)
+        batch.counts = dict(tokens)
+        batch.errors = dict.fromkeys(tokens, 0)
+        batch.total = sum(tokens.values())
+        self.merge(batch)
+
+    def top(self, limit: int) -> List[Tuple[str, int, int]]:
+        words = heapq.nlargest(limit, self.counts, key=self.counts.get)
+        return [(w, self.counts[w], self.errors[w]) for w in words]
+
+    def max_error(self) -> float:
+        return self.total / self.capacity
+
+    def to_bytes(self) -> bytes:
+        items = [[w, c, self.errors[w]] for w, c in self.counts.items()]
+        payload = {"k": self.capacity, "n": self.total, "items": items}
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SpaceSaving":
+        payload = json.loads(zlib.decompress(data))
+        sketch = cls(payload["k"])
+        sketch.total = payload["n"]
+        for word, count, error in payload["items"]:
+            sketch.counts[word] = count
+            sketch.errors[word] = error
+        return sketch
+
+
+def load_sketch(db: Session, key: str) -> Optional[SpaceSaving]:
+    row = db.get(models.WordSketch, key)
+    return SpaceSaving.from_bytes(row.data) if row else None
+
+
+def merge_into_stored(db: Session, key: str, sketch: SpaceSaving):
+    """Merge a local sketch into the stored one; the caller commits."""
+    row = db.get(models.WordSketch, key)
+    if row is None:
+        stored = SpaceSaving(sketch.capacity)
+        row = models.WordSketch(key=key)
+        db.add(row)
+    else:
+        stored = SpaceSaving.from_bytes(row.data)
+    stored.merge(sketch)
+    row.data = stored.to_bytes()
+    row.total = stored.total
+    row.updated_at = dt.datetime.utcnow()
+    # Sessions don't autoflush, and get() only finds flushed rows: a second
+    # merge in this transaction would otherwise insert the key again.
+    db.flush([row])
+
+
+def feed_word_sketches(db: Session, texts: Iterable[Tuple[Optional[dt.datetime], str]]):
+    """
+    Tokenize newly ingested texts and merge them into the global and
+    per-week sketches. Texts without a timestamp count toward this week.
+    """
+    per_week: Dict[str, Counter] = {}
+    overall: Counter = Counter()
+    today = dt.datetime.utcnow().date()
+    for created, text in texts:
+        tokens = tokenize_rage_words(text)
+        if not tokens:
+            continue
+        key = week_key(created.date() if created else today)
+        per_week.setdefault(key, Counter()).update(tokens)
+        overall.update(tokens)
+
+    if not overall:
+        return
+
+    for key, counts in list(per_week.items()) + [(GLOBAL_KEY, overall)]:
+        local = SpaceSaving()
+        local.update(counts)
+        merge_into_stored(db, key, local)
+
+
+def global_rage_words(db: Session, limit: int = 50, week: Optional[str] = None):
+    key = f"week:{week}" if week else GLOBAL_KEY
+    sketch = load_sketch(db, key)
+    if sketch is None or not sketch.counts:
+        return []
+    top = sketch.top(limit)
+    max_count = top[0][1]
+    bound = sketch.max_error()
+    return [
+        {
+            "word": word,
+            "score": (count / max_count) * 100.0,
+            "count": count,
+            "max_error": min(error, bound),
+        }
+        for word, count, error in top
+    ]
@@ -0,0 +1,152 @@
+import contextvars
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+REPORT_DIR = "run_reports"
+
+_current_game: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_game", default=None
+)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageTimer:
+    """Handle yielded by stage(); callers bump .rows as they go."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+
+class RunReport:
+    """
+    Wall time, calls and rows per stage, overall and per game. Safe to
+    record into from several threads (ingest producers and the writer).
+    """
+
+    def __init__(self, job: str):
+        self.job = job
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.games: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def record(self, stage: str, seconds: float, rows: int = 0, game: Optional[str] = None):
+        with self._lock:
+            buckets = [self.stages]
+            if game is not None:
+                buckets.append(self.games.setdefault(game, {}))
+            for bucket in buckets:
+                entry = bucket.setdefault(stage, {"seconds": 0.0, "calls": 0, "rows": 0})
+                entry["seconds"] += seconds
+                entry["calls"] += 1
+                entry["rows"] += rows
+
+    @staticmethod
+    def _with_rates(stages: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for name in sorted(stages):
+            entry = dict(stages[name])
+            entry["rows_per_second"] = (
+                round(entry["rows"] / entry["seconds"], 1)
+                if entry["rows"] and entry["seconds"] > 0
+                else None
+            )
+            entry["seconds"] = round(entry["seconds"], 4)
+            out[name] = entry
+        return out
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            stages = self._with_rates(self.stages)
+            games = {g: self._with_rates(s) for g, s in sorted(self.games.items())}
+        return {
+            "job": self.job,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.utcnow().isoformat(),
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "stages": stages,
+            "games": games,
+        }
+
+    def write(self, report_dir: str = REPORT_DIR) -> str:
+        os.makedirs(report_dir, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(report_dir, f"{self.job}-{stamp}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+# The outermost start_run() owns the report, so update_all.py gets one
+# report covering fetch, scoring and export.
+_active: Optional[RunReport] = None
+_depth = 0
+
+
+def start_run(job: str) -> RunReport:
+    global _active, _depth
+    if _depth == 0:
+        _active = RunReport(job)
+    _depth += 1
+    return _active
+
+
+def finish_run() -> Optional[str]:
+    """Close the run; the outermost caller writes the JSON report."""
+    global _active, _depth
+    _depth = max(0, _depth - 1)
+    if _depth or _active is None:
+        return None
+    path = _active.write()
+    print(
+        f"[REPORT] {_active.job}: {time.perf_counter() - _active._started:.1f}s, "
+        f"peak RSS {peak_rss_mb():.0f} MB -> {path}"
+    )
+    _active = None
+    return path
+
+
+def current_game() -> Optional[str]:
+    """The game stages are attributed to in this context, if any."""
+    return _current_game.get()
+
+
+@contextmanager
+def game(name: Optional[str]):
+    """Attribute every stage recorded inside the block to one game."""
+    token = _current_game.set(name)
+    try:
+        yield
+    finally:
+        _current_game.reset(token)
+
+
+@contextmanager
+def stage(name: str, rows: int = 0):
+    """Time a block; a no-op outside start_run()/finish_run()."""
+    timer = StageTimer()
+    timer.rows = rows
+    started = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        if _active is not None:
+            _active.record(
+                name, time.perf_counter() - started, timer.rows, _current_game.get()
+            )
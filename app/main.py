@@ -1,24 +1,65 @@
-import re
+import time
+
+# Taken before the heavy imports so time-to-ready includes them.
+_import_started = time.perf_counter()
+
+import asyncio
 import datetime as dt
-from collections import Counter
+import json
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from .database import Base, engine, get_db
-from . import schemas, crud, models
+from .database import SessionLocal, get_db
+from .cache import api_cache
+from .warmup import cached_game_detail, cached_leaderboard, warm_up
+from .score_stream import HEARTBEAT_SECONDS, ScoreBroker, topics_for
+from .singleflight import SingleFlightTimeout
+from .admission import AdmissionController, AdmissionMiddleware
+from .rollups import window_totals
+from .search import SEARCH_MAX_LIMIT, game_search
+from . import schemas, crud, feed, models
 
 # -------------------------------------------------------------------
 # APP + DB BOOTSTRAP
 # -------------------------------------------------------------------
 
-Base.metadata.create_all(bind=engine)
+# Schema changes are applied by `python migrate.py`, not on import.
+
+
+score_broker = ScoreBroker()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db = SessionLocal()
+    try:
+        stats = warm_up(api_cache, db)
+        game_search.refresh(db, force=True)
+    finally:
+        db.close()
+    print(
+        f"[WARMUP] Cached {stats['leaderboards']} leaderboards and "
+        f"{stats['games']} game details in {stats['seconds']:.2f}s; "
+        f"indexed {len(game_search.index)} game names; "
+        f"ready {time.perf_counter() - _import_started:.2f}s after import"
+    )
+    poller = asyncio.create_task(score_broker.run())
+    yield
+    poller.cancel()
+    with suppress(asyncio.CancelledError):
+        await poller
+
 
 app = FastAPI(
     title="RageQuit.io API",
     description="Backend for RageQuit.io – game rage scores",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -36,6 +77,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Upper bound for every `limit` query parameter.
+MAX_LIMIT = 200
+
+admission = AdmissionController()
+
+# Heavy-route slots are held until a response body has been fully sent.
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+
+@app.exception_handler(SingleFlightTimeout)
+async def single_flight_timeout(request: Request, exc: SingleFlightTimeout):
+    # Waited too long on a coalesced computation that is still running.
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
 # -------------------------------------------------------------------
 # GAMES
 # -------------------------------------------------------------------
@@ -43,30 +100,73 @@ app.add_middleware(
 
 @app.get("/games", response_model=list[schemas.GameSummary])
 def list_games(
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
     db: Session = Depends(get_db),
 ):
-    games = crud.get_all_games_with_scores(db, limit=limit, offset=offset)
+    games = api_cache.get_or_set(
+        ("games", window.value, limit, offset),
+        lambda: crud.get_all_games_with_scores(
+            db, limit=limit, offset=offset, window=window.value
+        ),
+    )
     return [schemas.GameSummary(**g) for g in games]
 
 
+# Declared before /games/{game_id} so "search" is not parsed as an id.
+@app.get("/games/search", response_model=list[schemas.GameSearchHit])
+def search_games(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=SEARCH_MAX_LIMIT),
+    db: Session = Depends(get_db),
+):
+    """Typeahead: games whose name (or any word onwards) or slug starts with q, highest rage first."""
+    return [schemas.GameSearchHit(**g) for g in game_search.search(db, q, limit=limit)]
+
+
 @app.get("/games/{game_id}", response_model=schemas.GameDetail)
-def get_game(game_id: int, db: Session = Depends(get_db)):
-    game = crud.get_game_detail(db, game_id)
+def get_game(
+    game_id: int,
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
+    db: Session = Depends(get_db),
+):
+    game = cached_game_detail(api_cache, db, game_id, window.value)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     return schemas.GameDetail(**game)
 
 
 @app.get("/games/slug/{slug}", response_model=schemas.GameDetail)
-def get_game_by_slug(slug: str, db: Session = Depends(get_db)):
-    data = crud.get_game_scores_by_slug(db, slug)
+def get_game_by_slug(
+    slug: str,
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
+    db: Session = Depends(get_db),
+):
+    data = api_cache.get_or_set(
+        ("game-slug", slug, window.value),
+        lambda: crud.get_game_scores_by_slug(db, slug, window=window.value),
+    )
     if not data:
         raise HTTPException(status_code=404, detail="Game not found")
     return schemas.GameDetail(**data)
 
 
+@app.get("/games/{game_id}/similar", response_model=list[schemas.SimilarGameOut])
+def get_similar_games(
+    game_id: int,
+    limit: int = Query(10, ge=1, le=10),  # similarity.SIMILAR_K neighbours are stored
+    db: Session = Depends(get_db),
+):
+    """Games with the closest rage profile, precomputed by the scoring job."""
+    from .similarity import get_similar_games as load_similar
+
+    similar = api_cache.get_or_set(
+        ("similar", game_id, limit), lambda: load_similar(db, game_id, limit=limit)
+    )
+    return [schemas.SimilarGameOut(**g) for g in similar]
+
+
 # -------------------------------------------------------------------
 # RAGE WORD CLOUD
 # -------------------------------------------------------------------
@@ -78,131 +178,33 @@ def get_game_by_slug(slug: str, db: Session = Depends(get_db)):
 )
 def get_game_rage_words(
     game_id: int,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
     db: Session = Depends(get_db),
 ):
-    reviews = (
-        db.query(models.SteamReviewRaw)
-        .filter(models.SteamReviewRaw.game_id == game_id)
-        .all()
-    )
-    texts: list[str] = []
-    for r in reviews:
-        if r.review_text:
-            texts.append(r.review_text)
-
-    reddit_posts = (
-        db.query(models.RedditPostRaw)
-        .filter(models.RedditPostRaw.game_id == game_id)
-        .all()
+    words = api_cache.get_or_set(
+        ("rage-words", game_id, limit),
+        lambda: crud.get_game_rage_words(db, game_id, limit=limit),
     )
-    for p in reddit_posts:
-        chunk = ""
-        if p.title:
-            chunk += p.title + " "
-        if p.body:
-            chunk += p.body
-        if chunk:
-            texts.append(chunk)
-
-    full_text = " ".join(texts).lower()
-
-    tokens = re.findall(r"[a-zA-Z]+", full_text)
-
-    stopwords = {
-        "the",
-        "and",
-        "for",
-        "you",
-        "your",
-        "with",
-        "that",
-        "this",
-        "have",
-        "but",
-        "not",
-        "are",
-        "was",
-        "were",
-        "they",
-        "them",
-        "get",
-        "got",
-        "just",
-        "like",
-        "its",
-        "from",
-        "been",
-        "will",
-        "what",
-        "when",
-        "where",
-        "who",
-        "why",
-        "how",
-        "does",
-        "did",
-        "can",
-        "cant",
-        "could",
-        "should",
-        "would",
-        "all",
-        "any",
-        "some",
-        "into",
-        "about",
-        "more",
-        "very",
-        "really",
-        "also",
-        "than",
-        "then",
-        "there",
-        "here",
-        "out",
-        "over",
-        "under",
-        "game",
-        "games",
-        "play",
-        "played",
-        "playing",
-        "one",
-        "two",
-        "three",
-        "still",
-        "even",
-        "because",
-        "good",
-        "great",
-        "fun",
-        "love",
-        "enjoy",
-        "enjoyed",
-        "well",
-        "time",
-        "hours",
-        "hour",
-        "make",
-        "made",
-    }
-
-    filtered = [t for t in tokens if len(t) >= 4 and t not in stopwords]
+    return [schemas.RageWordOut(**w) for w in words]
 
-    counter = Counter(filtered)
-    if not counter:
-        return []
 
-    most_common = counter.most_common(limit)
-    max_count = most_common[0][1]
-
-    result: list[schemas.RageWordOut] = []
-    for word, count in most_common:
-        score = (count / max_count) * 100.0
-        result.append(schemas.RageWordOut(word=word, score=score))
+@app.get(
+    "/rage-words/global",
+    response_model=list[schemas.GlobalRageWordOut],
+)
+def get_global_rage_words(
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    week: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Site-wide word cloud from the ingest-fed sketch; week looks like 2026-W42."""
+    from . import heavy_hitters
 
-    return result
+    words = api_cache.get_or_set(
+        ("rage-words-global", week or "all", limit),
+        lambda: heavy_hitters.global_rage_words(db, limit=limit, week=week),
+    )
+    return [schemas.GlobalRageWordOut(**w) for w in words]
 
 
 # -------------------------------------------------------------------
@@ -210,31 +212,33 @@ def get_game_rage_words(
 # -------------------------------------------------------------------
 
 
+@app.get("/games/{game_id}/feed", response_model=schemas.FeedPage)
+def get_game_feed(
+    game_id: int,
+    limit: int = Query(20, ge=1, le=feed.FEED_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Steam reviews and Reddit posts merged newest-first; pass next_cursor to page."""
+    try:
+        page = feed.get_game_feed(db, game_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schemas.FeedPage(**page)
+
+
 @app.get(
     "/games/{game_id}/reviews",
     response_model=list[schemas.SteamReviewOut],
 )
 def get_game_reviews(
     game_id: int,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=MAX_LIMIT),
     db: Session = Depends(get_db),
 ):
-    rows = (
-        db.query(models.SteamReviewRaw)
-        .filter(models.SteamReviewRaw.game_id == game_id)
-        .order_by(models.SteamReviewRaw.created_at_steam.desc())
-        .limit(limit)
-        .all()
-    )
-
     return [
-        schemas.SteamReviewOut(
-            is_positive=r.is_positive,
-            language=r.language,
-            review_text=r.review_text or "",
-            created_at_steam=r.created_at_steam,
-        )
-        for r in rows
+        schemas.SteamReviewOut(**r)
+        for r in crud.get_game_reviews(db, game_id, limit=limit)
     ]
 
 
@@ -244,29 +248,52 @@ def get_game_reviews(
 )
 def get_game_reddit(
     game_id: int,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=MAX_LIMIT),
     db: Session = Depends(get_db),
 ):
-    rows = (
-        db.query(models.RedditPostRaw)
-        .filter(models.RedditPostRaw.game_id == game_id)
-        .order_by(models.RedditPostRaw.upvotes.desc())
-        .limit(limit)
-        .all()
-    )
-
     return [
-        schemas.RedditPostOut(
-            title=p.title or "",
-            body=p.body or "",
-            upvotes=p.upvotes,
-            num_comments=p.num_comments,
-            created_utc=p.created_utc,
-        )
-        for p in rows
+        schemas.RedditPostOut(**p)
+        for p in crud.get_game_reddit_posts(db, game_id, limit=limit)
     ]
 
 
+# -------------------------------------------------------------------
+# BULK EXPORT (NDJSON)
+# -------------------------------------------------------------------
+
+
+@app.get("/games/{game_id}/export/{source}")
+def export_game_rows(
+    game_id: int,
+    source: schemas.ExportSource,
+    request: Request,
+    since: Optional[dt.datetime] = None,
+    after_id: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Stream every raw row of one source for a game as NDJSON, in id order.
+    since= only returns rows ingested at or after that time; to resume an
+    interrupted pull pass after_id=<id of the last line received>.
+    Gzip-compressed when the client sends Accept-Encoding: gzip.
+    """
+    from .bulk_export import gzip_stream, iter_ndjson
+
+    if db.get(models.Game, game_id) is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(dt.timezone.utc).replace(tzinfo=None)
+
+    body = iter_ndjson(source.value, game_id, since=since, after_id=after_id)
+    headers = {
+        "Content-Disposition": f'attachment; filename="game-{game_id}-{source.value}.ndjson"',
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
 # -------------------------------------------------------------------
 # RAGE TIMELINE
 # -------------------------------------------------------------------
@@ -280,42 +307,53 @@ def get_game_rage_timeline(
     game_id: int,
     db: Session = Depends(get_db),
 ):
-    rows = (
-        db.query(models.SteamReviewRaw)
-        .filter(models.SteamReviewRaw.game_id == game_id)
-        .all()
+    return [schemas.RageTimelinePoint(**p) for p in _rage_timeline(db, game_id)]
+
+
+def _rage_timeline(db: Session, game_id: int):
+    # The columnar snapshot answers without touching SQLite when it has the game.
+    from .columnar import get_snapshot
+
+    snapshot = get_snapshot()
+    if snapshot is not None and snapshot.has_game(game_id):
+        return snapshot.timeline(game_id)
+    return api_cache.get_or_set(
+        ("rage-timeline", game_id),
+        lambda: crud.get_game_rage_timeline(db, game_id),
     )
 
-    buckets: dict[dt.date, dict[str, int]] = {}
-    for r in rows:
-        ts = r.created_at_steam or r.ingested_at
-        if not ts:
-            continue
-        day = ts.date()
-        if day not in buckets:
-            buckets[day] = {"pos": 0, "neg": 0}
-        if r.is_positive:
-            buckets[day]["pos"] += 1
-        else:
-            buckets[day]["neg"] += 1
-
-    points: list[schemas.RageTimelinePoint] = []
-    for day in sorted(buckets.keys()):
-        pos = buckets[day]["pos"]
-        neg = buckets[day]["neg"]
-        total = pos + neg
-        rage_score = (neg / total) * 100.0 if total > 0 else 0.0
-        points.append(
-            schemas.RageTimelinePoint(
-                date=day,
-                rage_score=rage_score,
-                positive=pos,
-                negative=neg,
-                total=total,
-            )
-        )
 
-    return points
+@app.get("/games/{game_id}/review-stats", response_model=schemas.ReviewStatsOut)
+def get_game_review_stats(
+    game_id: int,
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
+    db: Session = Depends(get_db),
+):
+    """Steam review counts and keyword hits over a window, from the columnar snapshot."""
+    from .columnar import get_snapshot
+
+    snapshot = get_snapshot()
+    if snapshot is not None and snapshot.has_game(game_id):
+        counts = snapshot.review_counts(game_id, window.value)
+    else:
+        counts = api_cache.get_or_set(
+            ("review-stats", game_id, window.value),
+            lambda: window_totals(db, window.value, [game_id], source="steam").get(game_id, {}),
+        )
+    reviews = counts.get("rows") or 0
+    negative = counts.get("negatives") or 0
+    return schemas.ReviewStatsOut(
+        window=window,
+        reviews=reviews,
+        positive=reviews - negative,
+        negative=negative,
+        negative_share=negative / reviews if reviews else 0.0,
+        rage_points=(counts.get("rage_points") or 0) / 10.0,
+        diff_hits=counts.get("diff_hits") or 0,
+        tech_hits=counts.get("tech_hits") or 0,
+        toxic_hits=counts.get("toxic_hits") or 0,
+        ui_hits=counts.get("ui_hits") or 0,
+    )
 
 
 # -------------------------------------------------------------------
@@ -331,13 +369,64 @@ def get_game_clips(
     game_id: int,
     db: Session = Depends(get_db),
 ):
-    rows = (
-        db.query(models.RageClip)
-        .filter(models.RageClip.game_id == game_id)
-        .order_by(models.RageClip.added_at.desc())
-        .all()
-    )
-    return rows
+    return [schemas.RageClipOut(**c) for c in crud.get_game_clips(db, game_id)]
+
+
+# -------------------------------------------------------------------
+# AGGREGATE GAME PAGE
+# -------------------------------------------------------------------
+
+# include= name -> loader; list sections use the same defaults as their routes.
+PAGE_SECTIONS = {
+    "rage-timeline": lambda db, game_id: _rage_timeline(db, game_id),
+    "rage-words": lambda db, game_id: api_cache.get_or_set(
+        ("rage-words", game_id, 50),
+        lambda: crud.get_game_rage_words(db, game_id, limit=50),
+    ),
+    "reviews": lambda db, game_id: crud.get_game_reviews(db, game_id, limit=20),
+    "reddit": lambda db, game_id: crud.get_game_reddit_posts(db, game_id, limit=20),
+    "clips": lambda db, game_id: crud.get_game_clips(db, game_id),
+}
+
+
+@app.get("/games/{game_id}/page", response_model=schemas.GamePage)
+def get_game_page(
+    game_id: int,
+    include: Optional[str] = None,
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
+    db: Session = Depends(get_db),
+):
+    """
+    Everything the game page renders in one response. include= takes a
+    comma-separated subset of the section names (default: all of them).
+
+    Sections are read one after another in this request's session, inside
+    one read transaction so they all see the same snapshot. The server
+    does the same work as the per-section routes; what the page saves is
+    the client's extra round trips.
+    """
+    if db.bind.dialect.name == "sqlite":
+        # pysqlite only opens a transaction before writes; pin the snapshot.
+        db.connection().exec_driver_sql("BEGIN")
+
+    sections = list(PAGE_SECTIONS)
+    if include:
+        sections = [name.strip() for name in include.split(",") if name.strip()]
+        unknown = [name for name in sections if name not in PAGE_SECTIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown sections {unknown}; choose from {list(PAGE_SECTIONS)}",
+            )
+
+    game = cached_game_detail(api_cache, db, game_id, window.value)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    page = {"game": game}
+    for name in sections:
+        page[name.replace("-", "_")] = PAGE_SECTIONS[name](db, game_id)
+    return schemas.GamePage(**page)
 
 
 # -------------------------------------------------------------------
@@ -347,49 +436,214 @@ def get_game_clips(
 
 @app.get("/leaderboards/most-rage", response_model=list[schemas.GameSummary])
 def leaderboard_most_rage(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
     db: Session = Depends(get_db),
 ):
-    games = crud.get_all_games_with_scores(db, limit=limit, offset=0)
+    games = cached_leaderboard(api_cache, db, "most-rage", limit, window.value)
     return [schemas.GameSummary(**g) for g in games]
 
 
 @app.get("/leaderboards/difficulty", response_model=list[schemas.GameSummary])
 def leaderboard_difficulty(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
     db: Session = Depends(get_db),
 ):
-    games = crud.list_games_by_difficulty(db, limit=limit)
+    games = cached_leaderboard(api_cache, db, "difficulty", limit, window.value)
     return [schemas.GameSummary(**g) for g in games]
 
 
 @app.get("/leaderboards/technical", response_model=list[schemas.GameSummary])
 def leaderboard_technical(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
     db: Session = Depends(get_db),
 ):
-    games = crud.list_games_by_technical(db, limit=limit)
+    games = cached_leaderboard(api_cache, db, "technical", limit, window.value)
     return [schemas.GameSummary(**g) for g in games]
 
 
 @app.get("/leaderboards/toxicity", response_model=list[schemas.GameSummary])
 def leaderboard_toxicity(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
     db: Session = Depends(get_db),
 ):
-    games = crud.list_games_by_toxicity(db, limit=limit)
+    games = cached_leaderboard(api_cache, db, "toxicity", limit, window.value)
     return [schemas.GameSummary(**g) for g in games]
 
 
 @app.get("/leaderboards/cozy", response_model=list[schemas.GameSummary])
 def leaderboard_cozy(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    window: schemas.ScoreWindow = schemas.ScoreWindow.all,
     db: Session = Depends(get_db),
 ):
-    games = crud.list_coziest_games(db, limit=limit)
+    games = cached_leaderboard(api_cache, db, "cozy", limit, window.value)
     return [schemas.GameSummary(**g) for g in games]
 
 
+# -------------------------------------------------------------------
+# RAGE ALERTS
+# -------------------------------------------------------------------
+
+
+@app.get("/alerts", response_model=list[schemas.RageAlertOut])
+def list_rage_alerts(
+    limit: int = Query(20, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_db),
+):
+    from . import spikes
+
+    return [schemas.RageAlertOut(**a) for a in spikes.list_spiking_games(db, limit=limit)]
+
+
+# -------------------------------------------------------------------
+# LIVE SCORE STREAM (SSE + WebSocket)
+# -------------------------------------------------------------------
+
+
+def _parse_topics(games: Optional[str], leaderboards: Optional[str]):
+    return _checked_topics(
+        [g for g in (games or "").split(",") if g.strip()],
+        [w.strip() for w in (leaderboards or "").split(",") if w.strip()],
+    )
+
+
+def _message_topics(msg):
+    """Topics from a WebSocket {"games": [...], "leaderboards": [...]} message."""
+    if not isinstance(msg, dict):
+        raise HTTPException(status_code=400, detail="subscription must be a JSON object")
+    games, windows = msg.get("games", []), msg.get("leaderboards", [])
+    if not isinstance(games, list) or not isinstance(windows, list):
+        raise HTTPException(status_code=400, detail="games and leaderboards must be lists")
+    return _checked_topics(games, windows)
+
+
+def _checked_topics(games, windows):
+    try:
+        game_ids = [int(g) for g in games]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="games must be comma-separated ids")
+    bad = [w for w in windows if w not in schemas.ScoreWindow._value2member_map_]
+    if bad:
+        raise HTTPException(status_code=400, detail=f"Unknown leaderboard windows {bad}")
+    return topics_for(game_ids, windows)
+
+
+@app.get("/stream")
+async def stream_scores(
+    request: Request,
+    games: Optional[str] = None,
+    leaderboards: Optional[str] = None,
+):
+    """
+    Server-sent events with changed score rows after each compute run.
+    games=1,2 subscribes to games; leaderboards=all,7d to whole windows.
+    """
+    topics = _parse_topics(games, leaderboards)
+    last_event_id = request.headers.get("last-event-id")
+
+    async def events():
+        sub = score_broker.subscribe(topics)
+        try:
+            if last_event_id and last_event_id.isdigit():
+                for event in await asyncio.to_thread(score_broker.replay, int(last_event_id)):
+                    sub.offer(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if event.get("type") == "resync":
+                    yield "event: resync\ndata: {}\n\n"
+                    continue
+                if topics.isdisjoint(topics_for([event["game_id"]], [event["window"]])):
+                    continue  # replayed change for another topic
+                yield f"id: {event['id']}\nevent: score\ndata: {json.dumps(event)}\n\n"
+        finally:
+            score_broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/stream")
+async def stream_scores_ws(
+    websocket: WebSocket,
+    games: Optional[str] = None,
+    leaderboards: Optional[str] = None,
+):
+    """
+    WebSocket flavour of /stream. Clients may re-subscribe at any time by
+    sending {"games": [1, 2], "leaderboards": ["all"]}; a malformed message
+    closes the socket with 1008, like bad query parameters do.
+    """
+    try:
+        topics = _parse_topics(games, leaderboards)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    await websocket.accept()
+    sub = score_broker.subscribe(topics)
+
+    async def receive_subscriptions() -> Optional[str]:
+        """Applies re-subscribe messages; returns a close reason for a bad one."""
+        while True:
+            try:
+                msg = await websocket.receive_json()
+            except WebSocketDisconnect:
+                return None
+            except ValueError:
+                return "subscription must be JSON"
+            try:
+                sub.topics = _message_topics(msg)
+            except HTTPException as e:
+                return e.detail
+
+    receiver = asyncio.create_task(receive_subscriptions())
+    try:
+        while not receiver.done():
+            getter = asyncio.create_task(sub.queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                break
+            event = getter.result()
+            await websocket.send_json(
+                {"type": "resync"} if event.get("type") == "resync" else {"type": "score", **event}
+            )
+        reason = receiver.result()
+        if reason:
+            await websocket.close(code=1008, reason=reason)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        score_broker.unsubscribe(sub)
+
+
+# -------------------------------------------------------------------
+# METRICS
+# -------------------------------------------------------------------
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Cache, request-coalescing, admission-control and search-index counters for this worker."""
+    return {
+        "cache": api_cache.stats(),
+        "singleflight": api_cache.flights.stats(),
+        "admission": admission.stats(),
+        "search": game_search.stats(),
+    }
+
+
 # -------------------------------------------------------------------
 # GAME COMPARISON
 # -------------------------------------------------------------------
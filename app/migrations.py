@@ -0,0 +1,32 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .database import Base, engine
+from . import models  # noqa: F401  (registers tables on Base.metadata)
+
+
+def ensure_schema(bind: Engine = engine):
+    """
+    Bring the database up to the current models.
+
+    create_all() only creates missing tables, so columns and indexes that
+    were added to existing models are patched in here as well.
+    """
+    Base.metadata.create_all(bind=bind)
+
+    insp = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                col_type = col.type.compile(dialect=bind.dialect)
+                conn.execute(
+                    text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}")
+                )
+                print(f"[MIGRATE] Added column {table.name}.{col.name}")
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
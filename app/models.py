@@ -1,17 +1,23 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
+    SmallInteger,
     String,
     Boolean,
+    Date,
     DateTime,
     Float,
     ForeignKey,
+    Index,
+    LargeBinary,
     UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from .database import Base
+from .compression import CompressedText
 
 
 class Game(Base):
@@ -42,14 +48,28 @@ class SteamReviewRaw(Base):
     steam_review_id = Column(String, nullable=False)
     is_positive = Column(Boolean, nullable=False)
     language = Column(String, nullable=True)
-    review_text = Column(String, nullable=True)
+    review_text = Column(CompressedText, nullable=True)
     created_at_steam = Column(DateTime, nullable=True)
     ingested_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # Precomputed at ingest by scoring.extract_review_features
+    diff_hits = Column(SmallInteger, nullable=True)
+    tech_hits = Column(SmallInteger, nullable=True)
+    toxic_hits = Column(SmallInteger, nullable=True)
+    ui_hits = Column(SmallInteger, nullable=True)
+    rage_points = Column(SmallInteger, nullable=True)  # tenths of a point
+    features_version = Column(Integer, nullable=True)
+
+    # Near-duplicate of this earlier review (see app.near_duplicates)
+    dup_of = Column(Integer, nullable=True)
+
     game = relationship("Game", back_populates="reviews")
 
     __table_args__ = (
         UniqueConstraint("game_id", "steam_review_id", name="uq_game_review"),
+        Index("ix_steam_reviews_game_created", "game_id", "created_at_steam"),
+        # Keyset pages of one game's rows (bulk export) without a sort
+        Index("ix_steam_reviews_game_id", "game_id", "id"),
     )
 
 
@@ -77,14 +97,30 @@ class RedditPostRaw(Base):
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
     reddit_id = Column(String, nullable=False, unique=True)
     title = Column(String, nullable=True)
-    body = Column(String, nullable=True)
+    body = Column(CompressedText, nullable=True)
     upvotes = Column(Integer, nullable=True)
     num_comments = Column(Integer, nullable=True)
     created_utc = Column(DateTime, nullable=True)
     ingested_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # Precomputed at ingest by scoring.extract_review_features
+    diff_hits = Column(SmallInteger, nullable=True)
+    tech_hits = Column(SmallInteger, nullable=True)
+    toxic_hits = Column(SmallInteger, nullable=True)
+    ui_hits = Column(SmallInteger, nullable=True)
+    rage_points = Column(SmallInteger, nullable=True)  # tenths of a point
+    features_version = Column(Integer, nullable=True)
+
+    # Near-duplicate of this earlier post (see app.near_duplicates)
+    dup_of = Column(Integer, nullable=True)
+
     game = relationship("Game")
 
+    __table_args__ = (
+        Index("ix_reddit_posts_game_created", "game_id", "created_utc"),
+        Index("ix_reddit_posts_game_id", "game_id", "id"),
+    )
+
 class GameRageScore(Base):
     __tablename__ = "game_rage_scores"
 
@@ -120,3 +156,224 @@ class RageClip(Base):
     added_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     game = relationship("Game")
+
+
+# Per-game, per-day feature sums (hot rows + archived totals), rebuilt by scoring
+class GameDailyRollup(Base):
+    __tablename__ = "game_daily_rollups"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    source = Column(String, primary_key=True)  # 'steam' or 'reddit'
+    rows = Column(Integer, nullable=False, default=0)
+    negatives = Column(Integer, nullable=False, default=0)
+    rage_points = Column(Integer, nullable=False, default=0)
+    diff_hits = Column(Integer, nullable=False, default=0)
+    tech_hits = Column(Integer, nullable=False, default=0)
+    toxic_hits = Column(Integer, nullable=False, default=0)
+    ui_hits = Column(Integer, nullable=False, default=0)
+
+
+class GameWindowScore(Base):
+    __tablename__ = "game_window_scores"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    window = Column(String, primary_key=True)  # '7d', '30d', '90d', 'all'
+    rage_score = Column(Float, nullable=False)
+    difficulty_rage = Column(Float, nullable=False)
+    technical_rage = Column(Float, nullable=False)
+    social_toxicity_rage = Column(Float, nullable=False)
+    ui_design_rage = Column(Float, nullable=False)
+    review_count = Column(Integer, nullable=False, default=0)
+    last_computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_game_window_scores_window_rage", "window", "rage_score"),
+    )
+
+
+# Category totals behind each window score, so new weights can rescore
+# every game without reading raw rows (see app.reweight)
+class GameScoreInput(Base):
+    __tablename__ = "game_score_inputs"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    window = Column(String, primary_key=True)
+    rows = Column(Integer, nullable=False, default=0)
+    negatives = Column(Integer, nullable=False, default=0)
+    diff_hits = Column(Integer, nullable=False, default=0)
+    tech_hits = Column(Integer, nullable=False, default=0)
+    toxic_hits = Column(Integer, nullable=False, default=0)
+    ui_hits = Column(Integer, nullable=False, default=0)
+    max_achievement_drop = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Online EWMA detector over each game's daily negative-review share
+class RageSpikeState(Base):
+    __tablename__ = "rage_spike_state"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    day = Column(Date, nullable=True)  # day currently being accumulated
+    day_total = Column(Integer, nullable=False, default=0)
+    day_negative = Column(Integer, nullable=False, default=0)
+    ewma_mean = Column(Float, nullable=True)
+    ewma_var = Column(Float, nullable=False, default=0.0)
+    observed_days = Column(Integer, nullable=False, default=0)
+    z_score = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_rage_spike_state_z", "z_score"),
+    )
+
+
+# Per-day review counts behind RageSpikeState, with the detector's baseline
+# after folding that day (NULL observed_days: not folded yet), so late days
+# replay from the nearest checkpoint instead of the whole history
+class RageSpikeDay(Base):
+    __tablename__ = "rage_spike_days"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    negative = Column(Integer, nullable=False, default=0)
+    ewma_mean = Column(Float, nullable=True)
+    ewma_var = Column(Float, nullable=True)
+    observed_days = Column(Integer, nullable=True)
+
+
+# Serialized heavy-hitter sketches of rage words ('global', 'week:2026-W42', ...)
+class WordSketch(Base):
+    __tablename__ = "word_sketches"
+
+    key = Column(String, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CompressionDict(Base):
+    __tablename__ = "compression_dicts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    data = Column(LargeBinary, nullable=False)
+    sample_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Per-day feature sums of raw rows moved out by the retention job
+class ArchivedDailyTotal(Base):
+    __tablename__ = "archived_daily_totals"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    source = Column(String, primary_key=True)  # 'steam' or 'reddit'
+    rows = Column(Integer, nullable=False, default=0)
+    negatives = Column(Integer, nullable=False, default=0)
+    rage_points = Column(Integer, nullable=False, default=0)
+    diff_hits = Column(Integer, nullable=False, default=0)
+    tech_hits = Column(Integer, nullable=False, default=0)
+    toxic_hits = Column(Integer, nullable=False, default=0)
+    ui_hits = Column(Integer, nullable=False, default=0)
+    # The same sums for near-duplicate rows (dup_of set), which the columns
+    # above leave out, so readers can apply score_near_duplicates. NULL on
+    # days archived before they were kept.
+    dup_rows = Column(Integer, default=0)
+    dup_negatives = Column(Integer, default=0)
+    dup_rage_points = Column(Integer, default=0)
+    dup_diff_hits = Column(Integer, default=0)
+    dup_tech_hits = Column(Integer, default=0)
+    dup_toxic_hits = Column(Integer, default=0)
+    dup_ui_hits = Column(Integer, default=0)
+
+
+# Rows older than archived_before have been archived; ingest skips them
+class RetentionWatermark(Base):
+    __tablename__ = "retention_watermarks"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    source = Column(String, primary_key=True)
+    archived_before = Column(DateTime, nullable=False)
+
+
+# Small process-wide counters, e.g. 'data_version' bumped after each scoring run
+class AppState(Base):
+    __tablename__ = "app_state"
+
+    key = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Append-only log of score rows that changed in a compute run; the API tails it
+class ScoreChange(Base):
+    __tablename__ = "score_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
+    window = Column(String, nullable=False)  # 'all' mirrors GameRageScore
+    rage_score = Column(Float, nullable=False)
+    difficulty_rage = Column(Float, nullable=False)
+    technical_rage = Column(Float, nullable=False)
+    social_toxicity_rage = Column(Float, nullable=False)
+    ui_design_rage = Column(Float, nullable=False)
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Top-k games with the closest rage vectors, rebuilt after each scoring run
+class GameSimilar(Base):
+    __tablename__ = "game_similar"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    rank = Column(Integer, primary_key=True)  # 1 = most similar
+    similar_game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
+    distance = Column(Float, nullable=False)
+
+
+# Every Steam app the fetch workers should ingest (bulk-imported from a file)
+class TrackedGame(Base):
+    __tablename__ = "tracked_games"
+
+    steam_app_id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    slug = Column(String, nullable=True)  # derived from name when empty
+    active = Column(Boolean, default=True, nullable=False)
+    added_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# One leasable refresh job per tracked game, shared by all fetch workers
+class IngestWorkItem(Base):
+    __tablename__ = "ingest_work"
+
+    steam_app_id = Column(Integer, ForeignKey("tracked_games.steam_app_id"), primary_key=True)
+    next_run_at = Column(DateTime, nullable=False)
+    lease_owner = Column(String, nullable=True)  # "host:pid" while claimed
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)  # failures since last success
+    last_error = Column(String, nullable=True)
+    last_finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_ingest_work_due", "next_run_at"),)
+
+
+# MinHash signature of the first row of each near-duplicate cluster
+class MinHashSignature(Base):
+    __tablename__ = "minhash_signatures"
+
+    source = Column(String, primary_key=True)  # "steam" | "reddit"
+    row_id = Column(Integer, primary_key=True)
+    game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
+    signature = Column(LargeBinary, nullable=False)  # NUM_PERM uint32 values
+
+
+# LSH band bucket -> cluster it first appeared in, per game and source
+class MinHashBand(Base):
+    __tablename__ = "minhash_bands"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    source = Column(String, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)  # band number mixed into the hash
+    row_id = Column(Integer, nullable=False)
@@ -0,0 +1,143 @@
+import re
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Hash functions per signature; split into LSH bands of BAND_ROWS each.
+# Two texts become candidates when one band matches exactly, which is
+# likely (>50%) from ~0.5 Jaccard similarity and near-certain above 0.8.
+NUM_PERM = 64
+BAND_ROWS = 4
+BANDS = NUM_PERM // BAND_ROWS
+
+# Estimated Jaccard similarity (over character shingles) at which a
+# candidate is treated as the same text.
+DUPLICATE_SIMILARITY = 0.8
+
+SHINGLE_CHARS = 5
+
+# Shorter texts ("good game", "10/10") repeat naturally and are not
+# checked; copypasta is long.
+MIN_TEXT_CHARS = 40
+
+SOURCES = {
+    "steam": models.SteamReviewRaw,
+    "reddit": models.RedditPostRaw,
+}
+
+_MERSENNE = (1 << 31) - 1
+_rng = np.random.default_rng(20261019)  # fixed: signatures are persisted
+_A = _rng.integers(1, _MERSENNE, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _MERSENNE, NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+def signature(text: str):
+    """MinHash signature (NUM_PERM uint32) of the text's shingles, or None if too short."""
+    t = _normalize(text)
+    if len(t) < MIN_TEXT_CHARS:
+        return None
+    shingles = {t[i:i + SHINGLE_CHARS] for i in range(len(t) - SHINGLE_CHARS + 1)}
+    h = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+    ) % _MERSENNE
+    # (a*h + b) mod p stays below 2**62, so uint64 never overflows
+    return ((_A[:, None] * h[None, :] + _B[:, None]) % _MERSENNE).min(axis=1).astype(np.uint32)
+
+
+def band_buckets(sig) -> List[int]:
+    """One signed 63-bit bucket key per band (band number mixed in)."""
+    rows = sig.reshape(BANDS, BAND_ROWS)
+    return [
+        (zlib.crc32(rows[b].tobytes(), b) << 31) ^ zlib.crc32(rows[b].tobytes(), b + BANDS)
+        for b in range(BANDS)
+    ]
+
+
+def similarity(a, b) -> float:
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def assign_near_duplicates(
+    db: Session, source: str, game_id: int, rows: Sequence[Tuple[int, str]]
+) -> Dict[int, int]:
+    """
+    Check newly inserted rows [(row id, text)] of one game against its LSH
+    index. Duplicates get dup_of = the id of their cluster's first row;
+    the others are indexed as new clusters. Lookup is one primary-key
+    probe per band, independent of how many rows the game has.
+    Returns {row id: dup_of}; the caller commits.
+    """
+    sigs = [(row_id, signature(text)) for row_id, text in rows]
+    sigs = [(row_id, sig) for row_id, sig in sigs if sig is not None]
+    if not sigs:
+        return {}
+
+    buckets = {row_id: band_buckets(sig) for row_id, sig in sigs}
+    b = models.MinHashBand
+    index: Dict[int, int] = dict(
+        db.query(b.bucket, b.row_id).filter(
+            b.game_id == game_id,
+            b.source == source,
+            b.bucket.in_({k for keys in buckets.values() for k in keys}),
+        )
+    )
+    s = models.MinHashSignature
+    known: Dict[int, np.ndarray] = {
+        row_id: np.frombuffer(data, dtype=np.uint32)
+        for row_id, data in db.query(s.row_id, s.signature).filter(
+            s.source == source, s.row_id.in_(set(index.values()))
+        )
+    } if index else {}
+
+    duplicates: Dict[int, int] = {}
+    new_bands: List[Dict] = []
+    new_sigs: List[Dict] = []
+    for row_id, sig in sigs:
+        match = None
+        for cluster in dict.fromkeys(index[k] for k in buckets[row_id] if k in index):
+            if cluster in known and similarity(sig, known[cluster]) >= DUPLICATE_SIMILARITY:
+                match = cluster
+                break
+        if match is not None:
+            duplicates[row_id] = match
+            continue
+
+        # First of its kind: later copies (even in this batch) point here.
+        known[row_id] = sig
+        new_sigs.append({"source": source, "row_id": row_id, "game_id": game_id, "signature": sig.tobytes()})
+        for key in buckets[row_id]:
+            if key not in index:
+                index[key] = row_id
+                new_bands.append({"game_id": game_id, "source": source, "bucket": key, "row_id": row_id})
+
+    if new_sigs:
+        db.execute(insert(s), new_sigs)
+    if new_bands:
+        db.execute(insert(b), new_bands)
+    if duplicates:
+        model = SOURCES[source]
+        db.execute(update(model), [{"id": r, "dup_of": d} for r, d in duplicates.items()])
+    return duplicates
+
+
+def forget_rows(db: Session, source: str, game_id: int, row_ids: Sequence[int]):
+    """
+    Drop the LSH index entries of rows leaving the hot table (retention),
+    so clusters never point at a row that no longer exists. A later copy
+    of an archived text starts a new cluster. The caller commits.
+    """
+    s = models.MinHashSignature
+    b = models.MinHashBand
+    db.execute(delete(s).where(s.source == source, s.row_id.in_(row_ids)))
+    db.execute(delete(b).where(b.game_id == game_id, b.source == source, b.row_id.in_(row_ids)))
@@ -1,20 +1,23 @@
-from typing import List, Dict
+from typing import List, Dict, Iterator
 import time
 import requests
 
+from . import instrumentation
+
 USER_AGENT = "RageQuit.io (local dev)"
 
 
-def fetch_reddit_posts_for_game(
+def iter_reddit_post_pages(
     game_name: str,
     max_pages: int = 3,
     posts_per_page: int = 25,
-) -> List[Dict]:
+) -> Iterator[List[Dict]]:
     """
-    Very simple Reddit scraper using the public search.json endpoint.
-    This is not using the official API; it's enough for basic rage mining.
+    Very simple Reddit scraper using the public search.json endpoint,
+    yielding one page of posts at a time. This is not using the official
+    API; it's enough for basic rage mining.
     """
-    collected: List[Dict] = []
+    collected = 0
     after = None
 
     query = f"{game_name} rage OR unfair OR bullshit OR broken OR uninstall OR lag OR toxic OR cheater"
@@ -34,7 +37,8 @@ def fetch_reddit_posts_for_game(
         url = "https://www.reddit.com/search.json"
 
         try:
-            resp = requests.get(url, params=params, headers=headers, timeout=20)
+            with instrumentation.stage("reddit.http"):
+                resp = requests.get(url, params=params, headers=headers, timeout=20)
         except requests.RequestException as e:
             print(f"[ERROR] Reddit fetch failed for {game_name}: {e}")
             break
@@ -43,20 +47,37 @@ def fetch_reddit_posts_for_game(
             print(f"[ERROR] Reddit HTTP {resp.status_code} for {game_name}")
             break
 
-        data = resp.json()
-        children = data.get("data", {}).get("children", [])
+        with instrumentation.stage("reddit.json") as timer:
+            data = resp.json()
+            children = data.get("data", {}).get("children", [])
+            timer.rows = len(children)
         if not children:
             break
 
-        for c in children:
-            collected.append(c.get("data", {}))
+        posts = [c.get("data", {}) for c in children]
+        collected += len(posts)
+        yield posts
 
         after = data.get("data", {}).get("after")
-        print(f"[INFO] Reddit page {page+1} collected {len(collected)} posts for {game_name}")
+        print(f"[INFO] Reddit page {page+1} collected {collected} posts for {game_name}")
 
         if not after:
             break
 
-        time.sleep(1.5)
+        with instrumentation.stage("reddit.throttle"):
+            time.sleep(1.5)
+
 
+def fetch_reddit_posts_for_game(
+    game_name: str,
+    max_pages: int = 3,
+    posts_per_page: int = 25,
+) -> List[Dict]:
+    """
+    Very simple Reddit scraper using the public search.json endpoint.
+    This is not using the official API; it's enough for basic rage mining.
+    """
+    collected: List[Dict] = []
+    for page in iter_reddit_post_pages(game_name, max_pages, posts_per_page):
+        collected.extend(page)
     return collected
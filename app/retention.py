@@ -0,0 +1,202 @@
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from . import models
+from .app_state import bump_data_version
+from .features import backfill_features
+from .near_duplicates import forget_rows
+from .rollups import DUP_COLUMNS, ROLLUP_COLUMNS, invalidate_daily_rollups
+
+ARCHIVE_DIR = "archive"
+DELETE_BATCH_SIZE = 500
+
+# (source name, model, timestamp column used for age)
+SOURCES = (
+    ("steam", models.SteamReviewRaw, models.SteamReviewRaw.created_at_steam),
+    ("reddit", models.RedditPostRaw, models.RedditPostRaw.created_utc),
+)
+
+
+def _age_column(model, ts_column):
+    return func.coalesce(ts_column, model.ingested_at)
+
+
+def _row_to_json(row) -> Dict:
+    out = {}
+    for col in row.__table__.columns:
+        value = getattr(row, col.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        out[col.key] = value
+    return out
+
+
+def get_watermark(db: Session, game_id: int, source: str) -> Optional[datetime]:
+    row = db.get(models.RetentionWatermark, (game_id, source))
+    return row.archived_before if row else None
+
+
+def _add_daily_totals(db: Session, game_id: int, source: str, days: Dict):
+    for day, sums in days.items():
+        row = db.get(models.ArchivedDailyTotal, (game_id, day, source))
+        if row is None:
+            row = models.ArchivedDailyTotal(
+                game_id=game_id, day=day, source=source,
+                **dict.fromkeys(ROLLUP_COLUMNS + DUP_COLUMNS, 0),
+            )
+            db.add(row)
+        for key, value in sums.items():
+            setattr(row, key, (getattr(row, key) or 0) + value)
+
+
+def _archive_game(db: Session, source: str, model, ts_column, game_id: int,
+                  cutoff: datetime, out_path: str) -> int:
+    age = _age_column(model, ts_column)
+    days: Dict = {}
+    archived = 0
+
+    # Rows go to a temp file that replaces out_path only once the deletes
+    # have committed, so a failed run never leaves live rows in an archive.
+    tmp_path = out_path + ".tmp"
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as out:
+            while True:
+                rows = (
+                    db.query(model)
+                    .filter(model.game_id == game_id, age < cutoff)
+                    .order_by(model.id)
+                    .limit(DELETE_BATCH_SIZE)
+                    .all()
+                )
+                if not rows:
+                    break
+
+                for r in rows:
+                    out.write(json.dumps(_row_to_json(r)) + "\n")
+                    ts = getattr(r, ts_column.key) or r.ingested_at
+                    sums = days.setdefault(ts.date(), dict.fromkeys(ROLLUP_COLUMNS + DUP_COLUMNS, 0))
+                    # Near-duplicates go to the dup_ columns; readers decide
+                    # whether they count (scores) or not (timelines always do).
+                    keys = DUP_COLUMNS if r.dup_of is not None else ROLLUP_COLUMNS
+                    rows_key, negatives_key, *feature_keys = keys
+                    sums[rows_key] += 1
+                    if not getattr(r, "is_positive", False):
+                        sums[negatives_key] += 1
+                    for key, c in zip(feature_keys, ROLLUP_COLUMNS[2:]):
+                        sums[key] += getattr(r, c) or 0
+
+                row_ids = [r.id for r in rows]
+                db.query(model).filter(model.id.in_(row_ids)).delete(synchronize_session=False)
+                forget_rows(db, source, game_id, row_ids)
+                db.expunge_all()
+                archived += len(rows)
+
+        _add_daily_totals(db, game_id, source, days)
+        if archived:
+            # Archived rows past the rollup watermark were never summed; rebuild.
+            invalidate_daily_rollups(db)
+            bump_data_version(db)
+
+        mark = db.get(models.RetentionWatermark, (game_id, source))
+        if mark is None:
+            db.add(models.RetentionWatermark(game_id=game_id, source=source, archived_before=cutoff))
+        elif mark.archived_before < cutoff:
+            mark.archived_before = cutoff
+
+        # Aggregates, deletes and watermark land together per game.
+        db.commit()
+    except BaseException:
+        db.rollback()
+        os.remove(tmp_path)
+        raise
+
+    if os.path.exists(out_path):
+        # An earlier run in the same second; gzip members concatenate.
+        with open(tmp_path, "rb") as src, open(out_path, "ab") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, out_path)
+    return archived
+
+
+def table_sizes(db: Session) -> Dict[str, int]:
+    """Bytes used per table/index (needs SQLite's dbstat; empty if unavailable)."""
+    try:
+        rows = db.execute(text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+        return {name: int(size) for name, size in rows}
+    except Exception:
+        return {}
+
+
+def _page_stats(db: Session) -> Dict[str, int]:
+    page_size = db.execute(text("PRAGMA page_size")).scalar()
+    return {
+        "file_bytes": db.execute(text("PRAGMA page_count")).scalar() * page_size,
+        "free_bytes": db.execute(text("PRAGMA freelist_count")).scalar() * page_size,
+    }
+
+
+def compact(db: Session):
+    """Return free pages to the OS and refresh planner statistics."""
+    db.commit()
+    with db.get_bind().connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        mode = conn.execute(text("PRAGMA auto_vacuum")).scalar()
+        if mode != 2:
+            # incremental_vacuum only works once auto_vacuum=INCREMENTAL is
+            # baked in, which takes one full VACUUM.
+            conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            conn.execute(text("VACUUM"))
+        conn.execute(text("PRAGMA incremental_vacuum"))
+        conn.execute(text("ANALYZE"))
+
+
+def run_retention(db: Session, horizon: timedelta, archive_dir: str = ARCHIVE_DIR) -> Dict:
+    """
+    Move raw rows older than `horizon` into gzip'd NDJSON under archive_dir,
+    keeping their contribution in archived_daily_totals, then compact.
+    """
+    # Features must be current before rows leave the hot tables.
+    if any(backfill_features(db).values()):
+        invalidate_daily_rollups(db)
+
+    cutoff = datetime.utcnow() - horizon
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    before_sizes = table_sizes(db)
+    before_pages = _page_stats(db)
+
+    archived: Dict[str, int] = {}
+    for source, model, ts_column in SOURCES:
+        age = _age_column(model, ts_column)
+        game_ids = [
+            gid for (gid,) in db.query(model.game_id).filter(age < cutoff).distinct()
+        ]
+        count = 0
+        for game_id in game_ids:
+            out_path = os.path.join(
+                archive_dir, model.__tablename__, str(game_id), f"{stamp}.jsonl.gz"
+            )
+            count += _archive_game(db, source, model, ts_column, game_id, cutoff, out_path)
+        archived[model.__tablename__] = count
+
+    compact(db)
+
+    after_pages = _page_stats(db)
+    return {
+        "cutoff": cutoff.isoformat(),
+        "archived_rows": archived,
+        "table_bytes_before": before_sizes,
+        "table_bytes_after": table_sizes(db),
+        "file_bytes_before": before_pages["file_bytes"],
+        "file_bytes_after": after_pages["file_bytes"],
+        "reclaimed_bytes": before_pages["file_bytes"] - after_pages["file_bytes"],
+    }
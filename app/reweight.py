@@ -0,0 +1,157 @@
+import datetime as dt
+from typing import Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from . import models
+from .app_state import SCORE_INPUTS_DUPS_KEY, get_state, set_state
+from .rollups import score_near_duplicates
+from .score_stream import SCORE_COLUMNS, record_score_change
+from .scoring import achievement_rage, combine_rage_scores, score_feature_totals
+
+# Stored per game and window in game_score_inputs.
+INPUT_COLUMNS = ("rows", "negatives", "diff_hits", "tech_hits", "toxic_hits", "ui_hits")
+
+# Leaderboard name -> (score column, ascending); mirrors crud.LEADERBOARDS.
+LEADERBOARD_ORDER = {
+    "most-rage": ("rage_score", False),
+    "difficulty": ("difficulty_rage", False),
+    "technical": ("technical_rage", False),
+    "toxicity": ("social_toxicity_rage", False),
+    "cozy": ("rage_score", True),
+}
+
+# Only moves at least this large are written (and streamed).
+MIN_CHANGE = 1e-9
+
+
+class ScoreTable:
+    """Every game's scores for one window as parallel arrays."""
+
+    def __init__(self, game_ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.game_ids = game_ids
+        self.columns = columns
+
+    def ranking(self, name: str, limit: int) -> List[int]:
+        column, ascending = LEADERBOARD_ORDER[name]
+        values = self.columns[column]
+        order = np.lexsort((self.game_ids, values if ascending else -values))
+        return self.game_ids[order[:limit]].tolist()
+
+
+def record_inputs_rule(db: Session, config: Dict, all_games: bool):
+    """Note which near-duplicate rule the inputs just written follow; the caller commits."""
+    rule = int(score_near_duplicates(config))
+    stored = get_state(db.connection(), SCORE_INPUTS_DUPS_KEY, None)
+    if not all_games and stored is not None and stored != rule:
+        rule = -1  # the other games' inputs were summed under another rule
+    set_state(db, SCORE_INPUTS_DUPS_KEY, rule)
+
+
+def inputs_match_config(conn: Connection, config: Dict) -> bool:
+    """
+    Whether the stored inputs counted near-duplicates the way `config`
+    says to. The totals can't be re-split, so otherwise only a full
+    compute_scores.py run gives the right scores.
+    """
+    return get_state(conn, SCORE_INPUTS_DUPS_KEY, None) == int(score_near_duplicates(config))
+
+
+def load_inputs(db: Session, window: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    i = models.GameScoreInput
+    rows = (
+        db.query(i.game_id, *[getattr(i, c) for c in INPUT_COLUMNS], i.max_achievement_drop)
+        .filter(i.window == window)
+        .order_by(i.game_id)
+        .all()
+    )
+    data = np.array(
+        [tuple(0.0 if v is None else v for v in row) for row in rows], dtype=np.float64
+    ).reshape(len(rows), len(INPUT_COLUMNS) + 2)
+    totals = {c: data[:, n + 1] for n, c in enumerate(INPUT_COLUMNS)}
+    totals["max_achievement_drop"] = data[:, -1]
+    return data[:, 0].astype(np.int64), totals
+
+
+def rescore(game_ids: np.ndarray, totals: Dict[str, np.ndarray], config: Dict) -> ScoreTable:
+    """Apply a scoring config to stored totals, all games at once."""
+    review = score_feature_totals(totals, config)
+    ach = {
+        "achievement_rage": achievement_rage(totals["max_achievement_drop"], config),
+        "max_achievement_drop": None,
+        "max_drop_from": None,
+        "max_drop_to": None,
+        "max_drop_achievement": None,
+    }
+    scores = combine_rage_scores(review, ach, config)
+    return ScoreTable(game_ids, {c: np.asarray(scores[c], dtype=np.float64) for c in SCORE_COLUMNS})
+
+
+def current_scores(db: Session, window: str, game_ids: np.ndarray) -> ScoreTable:
+    ws = models.GameWindowScore
+    stored = {
+        game_id: values
+        for game_id, *values in db.query(ws.game_id, *[getattr(ws, c) for c in SCORE_COLUMNS]).filter(
+            ws.window == window
+        )
+    }
+    data = np.array(
+        [stored.get(g, [np.nan] * len(SCORE_COLUMNS)) for g in game_ids.tolist()], dtype=np.float64
+    ).reshape(len(game_ids), len(SCORE_COLUMNS))
+    return ScoreTable(game_ids, {c: data[:, n] for n, c in enumerate(SCORE_COLUMNS)})
+
+
+def leaderboard_diff(before: ScoreTable, after: ScoreTable, limit: int = 10) -> Dict[str, List[Dict]]:
+    """Per leaderboard: the new top `limit`, each with its old rank (None = newly entered)."""
+    out = {}
+    for name in LEADERBOARD_ORDER:
+        old_rank = {g: n for n, g in enumerate(before.ranking(name, len(before.game_ids)), 1)}
+        column, _ = LEADERBOARD_ORDER[name]
+        index = {g: n for n, g in enumerate(after.game_ids.tolist())}
+        out[name] = [
+            {
+                "game_id": g,
+                "rank": n,
+                "previous_rank": old_rank.get(g),
+                "score": float(after.columns[column][index[g]]),
+                "previous_score": float(before.columns[column][index[g]]),
+            }
+            for n, g in enumerate(after.ranking(name, limit), 1)
+        ]
+    return out
+
+
+def apply_scores(db: Session, window: str, before: ScoreTable, after: ScoreTable, now: dt.datetime) -> int:
+    """
+    Write changed rows to game_window_scores (and game_rage_scores for
+    'all'), logging each change for /stream. Returns rows written; the
+    caller bumps data_version and commits.
+    """
+    changed = np.zeros(len(after.game_ids), dtype=bool)
+    for c in SCORE_COLUMNS:
+        old = before.columns[c]
+        changed |= np.isnan(old) | (np.abs(old - after.columns[c]) > MIN_CHANGE)
+    idx = np.flatnonzero(changed)
+    if not len(idx):
+        return 0
+
+    rows = [
+        {
+            "game_id": int(after.game_ids[n]),
+            **{c: float(after.columns[c][n]) for c in SCORE_COLUMNS},
+        }
+        for n in idx.tolist()
+    ]
+    # ORM bulk UPDATE by primary key: one executemany per table
+    db.execute(
+        update(models.GameWindowScore),
+        [{**r, "window": window, "last_computed_at": now} for r in rows],
+    )
+    if window == "all":
+        db.execute(update(models.GameRageScore), [{**r, "last_computed_at": now} for r in rows])
+    for r in rows:
+        record_score_change(db, r["game_id"], window, r, now)
+    return len(rows)
@@ -0,0 +1,200 @@
+import datetime as dt
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from . import models
+from .app_state import get_state, set_state
+from .features import FEATURE_COLUMNS
+from .scoring_config import current_config
+
+# Score windows in days; None means all-time.
+WINDOWS: Dict[str, Optional[int]] = {
+    "7d": 7,
+    "30d": 30,
+    "90d": 90,
+    "all": None,
+}
+
+ROLLUP_COLUMNS = ("rows", "negatives") + FEATURE_COLUMNS
+
+# archived_daily_totals keeps near-duplicate rows in these, apart from ROLLUP_COLUMNS.
+DUP_COLUMNS = tuple(f"dup_{c}" for c in ROLLUP_COLUMNS)
+
+# app_state: the highest raw row id per source already summed into the
+# rollups, and the near-duplicate rule they hold (-1: rebuild on next refresh).
+ROLLUP_WATERMARK_KEYS = {"steam": "rollups_steam_max_id", "reddit": "rollups_reddit_max_id"}
+ROLLUP_DUPS_KEY = "rollups_near_duplicates"
+
+
+def score_near_duplicates(config: Optional[Dict] = None) -> bool:
+    """The scoring config's rule for near-duplicate rows (dup_of set)."""
+    return bool((config or current_config())["score_near_duplicates"])
+
+
+def _hot_rollup_select(model, ts_column, source: str, negatives, with_dups: bool):
+    day = func.date(func.coalesce(ts_column, model.ingested_at))
+    q = select(
+        model.game_id.label("game_id"),
+        day.label("day"),
+        literal(source).label("source"),
+        func.count(model.id).label("rows"),
+        negatives.label("negatives"),
+        *[func.coalesce(func.sum(getattr(model, c)), 0).label(c) for c in FEATURE_COLUMNS],
+    ).group_by(model.game_id, day)
+    if not with_dups:
+        q = q.where(model.dup_of.is_(None))
+    return q
+
+
+def _hot_sources():
+    r = models.SteamReviewRaw
+    p = models.RedditPostRaw
+    return (
+        ("steam", r, r.created_at_steam, func.sum(case((r.is_positive, 0), else_=1))),
+        ("reddit", p, p.created_utc, func.count(p.id)),  # Reddit posts always count as negative
+    )
+
+
+def rebuild_daily_rollups(
+    db: Session,
+    game_ids: Optional[Iterable[int]] = None,
+    config: Optional[Dict] = None,
+):
+    """
+    Recompute game_daily_rollups from the stored per-row features plus the
+    retention job's archived totals. Only integer columns are read.
+    Near-duplicate rows count only if the config's score_near_duplicates is on.
+
+    A full rebuild moves the watermarks refresh_daily_rollups() adds from.
+    With game_ids, rows past the current watermarks are left for it to add.
+    """
+    a = models.ArchivedDailyTotal
+    with_dups = score_near_duplicates(config)
+    conn = db.connection()
+    if game_ids is not None:
+        game_ids = list(game_ids)
+    if game_ids is None:
+        upto = {source: db.query(func.max(model.id)).scalar() or 0 for source, model, _, _ in _hot_sources()}
+    else:
+        upto = {source: get_state(conn, key, None) for source, key in ROLLUP_WATERMARK_KEYS.items()}
+
+    hot = []
+    for source, model, ts_column, negatives in _hot_sources():
+        q = _hot_rollup_select(model, ts_column, source, negatives, with_dups)
+        if upto[source] is not None:
+            q = q.where(model.id <= upto[source])
+        if game_ids is not None:
+            q = q.where(model.game_id.in_(game_ids))
+        hot.append(q)
+    archived = select(
+        a.game_id.label("game_id"),
+        a.day.label("day"),
+        a.source.label("source"),
+        *[
+            (getattr(a, c) + func.coalesce(getattr(a, d), 0) if with_dups else getattr(a, c)).label(c)
+            for c, d in zip(ROLLUP_COLUMNS, DUP_COLUMNS)
+        ],
+    )
+
+    if game_ids is not None:
+        archived = archived.where(a.game_id.in_(game_ids))
+
+    parts = union_all(*hot, archived).subquery()
+    merged = select(
+        parts.c.game_id,
+        parts.c.day,
+        parts.c.source,
+        *[func.sum(parts.c[c]) for c in ROLLUP_COLUMNS],
+    ).group_by(parts.c.game_id, parts.c.day, parts.c.source)
+
+    clear = delete(models.GameDailyRollup)
+    if game_ids is not None:
+        clear = clear.where(models.GameDailyRollup.game_id.in_(game_ids))
+    db.execute(clear)
+    db.execute(
+        insert(models.GameDailyRollup).from_select(
+            ["game_id", "day", "source", *ROLLUP_COLUMNS], merged
+        )
+    )
+    if game_ids is None:
+        for source, key in ROLLUP_WATERMARK_KEYS.items():
+            set_state(db, key, upto[source])
+        set_state(db, ROLLUP_DUPS_KEY, int(with_dups))
+
+
+def refresh_daily_rollups(db: Session, config: Optional[Dict] = None) -> bool:
+    """
+    Bring game_daily_rollups up to date by adding only the raw rows
+    inserted since the last refresh, summed per (game, day) and upserted,
+    so a run costs O(new rows). Falls back to a full rebuild when the
+    near-duplicate rule changed or invalidate_daily_rollups() was called.
+    Returns True if it rebuilt. The caller commits.
+    """
+    with_dups = score_near_duplicates(config)
+    conn = db.connection()
+    if get_state(conn, ROLLUP_DUPS_KEY, -1) != int(with_dups):
+        rebuild_daily_rollups(db, config=config)
+        return True
+
+    g = models.GameDailyRollup.__table__
+    for source, model, ts_column, negatives in _hot_sources():
+        key = ROLLUP_WATERMARK_KEYS[source]
+        low = get_state(conn, key)
+        high = db.query(func.max(model.id)).scalar() or 0
+        if high <= low:
+            continue
+        new_rows = _hot_rollup_select(model, ts_column, source, negatives, with_dups).where(
+            model.id > low, model.id <= high
+        )
+        stmt = sqlite_insert(g).from_select(["game_id", "day", "source", *ROLLUP_COLUMNS], new_rows)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[g.c.game_id, g.c.day, g.c.source],
+                set_={c: g.c[c] + stmt.excluded[c] for c in ROLLUP_COLUMNS},
+            )
+        )
+        set_state(db, key, high)
+    return False
+
+
+def invalidate_daily_rollups(db: Session):
+    """
+    Force the next refresh_daily_rollups() to rebuild: call after changing
+    rows the rollups already counted (features, dup_of, archiving).
+    """
+    set_state(db, ROLLUP_DUPS_KEY, -1)
+
+
+def window_start(window: str, today: Optional[dt.date] = None) -> Optional[dt.date]:
+    days = WINDOWS[window]
+    if days is None:
+        return None
+    today = today or dt.datetime.utcnow().date()
+    return today - dt.timedelta(days=days - 1)
+
+
+def window_totals(
+    db: Session,
+    window: str,
+    game_ids: Optional[Iterable[int]] = None,
+    today: Optional[dt.date] = None,
+    source: Optional[str] = None,
+) -> Dict[int, Dict[str, int]]:
+    """Per-game feature sums over the window, summed from daily rollups."""
+    g = models.GameDailyRollup
+    q = db.query(g.game_id, *[func.sum(getattr(g, c)) for c in ROLLUP_COLUMNS])
+    if source is not None:
+        q = q.filter(g.source == source)
+    since = window_start(window, today)
+    if since is not None:
+        q = q.filter(g.day >= since)
+    if game_ids is not None:
+        q = q.filter(g.game_id.in_(list(game_ids)))
+
+    out: Dict[int, Dict[str, int]] = {}
+    for game_id, *sums in q.group_by(g.game_id):
+        out[game_id] = dict(zip(ROLLUP_COLUMNS, sums))
+    return out
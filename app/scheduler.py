@@ -0,0 +1,109 @@
+import heapq
+import itertools
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Refresh cadence bounds: hot launches every few minutes, dormant games daily.
+MIN_REFRESH_INTERVAL = timedelta(minutes=5)
+MAX_REFRESH_INTERVAL = timedelta(days=1)
+
+# How far back we look when measuring review velocity.
+VELOCITY_WINDOW = timedelta(days=3)
+
+# Roughly how many new reviews we want to pick up per refresh.
+TARGET_NEW_REVIEWS_PER_REFRESH = 25.0
+
+
+def review_velocity(db: Session, game_id: int, now: datetime) -> float:
+    """Reviews per hour over the recent VELOCITY_WINDOW."""
+    since = now - VELOCITY_WINDOW
+    count = (
+        db.query(func.count(models.SteamReviewRaw.id))
+        .filter(
+            models.SteamReviewRaw.game_id == game_id,
+            models.SteamReviewRaw.created_at_steam >= since,
+        )
+        .scalar()
+    )
+    hours = VELOCITY_WINDOW.total_seconds() / 3600.0
+    return (count or 0) / hours
+
+
+def next_refresh_interval(velocity_per_hour: float) -> timedelta:
+    """Map review velocity to a refresh interval, clamped to [MIN, MAX]."""
+    if velocity_per_hour <= 0:
+        return MAX_REFRESH_INTERVAL
+    hours = TARGET_NEW_REVIEWS_PER_REFRESH / velocity_per_hour
+    interval = timedelta(hours=hours)
+    return max(MIN_REFRESH_INTERVAL, min(MAX_REFRESH_INTERVAL, interval))
+
+
+class RefreshScheduler:
+    """
+    Min-heap of games keyed by their next refresh time.
+
+    Rescheduling a game pushes a fresh heap entry; stale entries are
+    skipped lazily when popped.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, int]] = []
+        self._due: Dict[int, datetime] = {}
+        self._info: Dict[int, Dict] = {}
+        self._seq = itertools.count()
+
+    def schedule(self, info: Dict, due_at: datetime):
+        app_id = info["steam_app_id"]
+        self._info[app_id] = info
+        self._due[app_id] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._seq), app_id))
+
+    def _prune(self):
+        while self._heap:
+            due_at, _, app_id = self._heap[0]
+            if self._due.get(app_id) == due_at:
+                return
+            heapq.heappop(self._heap)
+
+    def pop_due(self, now: datetime, limit: Optional[int] = None) -> List[Dict]:
+        """Remove and return games whose refresh time has passed, oldest first."""
+        out: List[Dict] = []
+        while limit is None or len(out) < limit:
+            self._prune()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, app_id = heapq.heappop(self._heap)
+            del self._due[app_id]
+            out.append(self._info[app_id])
+        return out
+
+    def next_due_at(self) -> Optional[datetime]:
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def queue_depth(self) -> int:
+        return len(self._due)
+
+    def due_count(self, now: datetime) -> int:
+        return sum(1 for due_at in self._due.values() if due_at <= now)
+
+    def lag(self, now: datetime) -> timedelta:
+        """How overdue the oldest pending refresh is (zero if nothing is due)."""
+        next_due = self.next_due_at()
+        if next_due is None or next_due > now:
+            return timedelta(0)
+        return now - next_due
+
+    def status(self, now: datetime) -> Dict:
+        next_due = self.next_due_at()
+        return {
+            "queue_depth": self.queue_depth(),
+            "due": self.due_count(now),
+            "lag_seconds": self.lag(now).total_seconds(),
+            "next_due_at": next_due.isoformat() if next_due else None,
+        }
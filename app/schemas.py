@@ -1,7 +1,21 @@
 from typing import Optional, List
 import datetime as dt
+from enum import Enum
 from pydantic import BaseModel
 
+#
+# -------------------------------------------------------------------
+# SCORE WINDOWS
+# -------------------------------------------------------------------
+#
+
+class ScoreWindow(str, Enum):
+    d7 = "7d"
+    d30 = "30d"
+    d90 = "90d"
+    all = "all"
+
+
 #
 # -------------------------------------------------------------------
 # RAGE BREAKDOWN
@@ -37,6 +51,21 @@ class GameSummary(BaseModel):
         orm_mode = True
 
 
+class GameSearchHit(BaseModel):
+    id: int
+    name: str
+    slug: str
+    rage_score: Optional[float] = None  # None until the game is first scored
+
+
+class SimilarGameOut(BaseModel):
+    id: int
+    name: str
+    slug: str
+    rage_score: float
+    distance: float  # Euclidean, over standardized rage vectors
+
+
 class GameDetail(BaseModel):
     id: int
     name: str
@@ -80,6 +109,34 @@ class RedditPostOut(BaseModel):
         orm_mode = True
 
 
+#
+# -------------------------------------------------------------------
+# MERGED RAGE FEED
+# -------------------------------------------------------------------
+#
+
+class FeedItemOut(BaseModel):
+    source: str  # 'steam' or 'reddit'
+    id: int
+    created_at: dt.datetime
+
+    # steam reviews
+    is_positive: Optional[bool] = None
+    language: Optional[str] = None
+    review_text: Optional[str] = None
+
+    # reddit posts
+    title: Optional[str] = None
+    body: Optional[str] = None
+    upvotes: Optional[int] = None
+    num_comments: Optional[int] = None
+
+
+class FeedPage(BaseModel):
+    items: List[FeedItemOut]
+    next_cursor: Optional[str] = None
+
+
 #
 # -------------------------------------------------------------------
 # RAGE WORD CLOUD
@@ -91,6 +148,13 @@ class RageWordOut(BaseModel):
     score: float
 
 
+class GlobalRageWordOut(BaseModel):
+    word: str
+    score: float
+    count: int
+    max_error: float
+
+
 #
 # -------------------------------------------------------------------
 # RAGE TIMELINE
@@ -125,6 +189,70 @@ class RageClipOut(BaseModel):
         orm_mode = True
 
 
+#
+# -------------------------------------------------------------------
+# RAGE ALERTS
+# -------------------------------------------------------------------
+#
+
+class RageAlertOut(BaseModel):
+    id: int
+    name: str
+    slug: str
+    day: dt.date
+    reviews: int
+    negative_share: float
+    baseline_share: float
+    severity: float
+
+
+#
+# -------------------------------------------------------------------
+# REVIEW STATS (columnar snapshot)
+# -------------------------------------------------------------------
+#
+
+class ReviewStatsOut(BaseModel):
+    window: ScoreWindow
+    reviews: int
+    positive: int
+    negative: int
+    negative_share: float
+    rage_points: float
+    diff_hits: int
+    tech_hits: int
+    toxic_hits: int
+    ui_hits: int
+
+
+#
+# -------------------------------------------------------------------
+# BULK EXPORT
+# -------------------------------------------------------------------
+#
+
+class ExportSource(str, Enum):
+    reviews = "reviews"
+    reddit = "reddit"
+
+
+#
+# -------------------------------------------------------------------
+# AGGREGATE GAME PAGE
+# -------------------------------------------------------------------
+#
+
+class GamePage(BaseModel):
+    game: GameDetail
+
+    # Sections not requested via include= are left out (null)
+    rage_timeline: Optional[List[RageTimelinePoint]] = None
+    rage_words: Optional[List[RageWordOut]] = None
+    reviews: Optional[List[SteamReviewOut]] = None
+    reddit: Optional[List[RedditPostOut]] = None
+    clips: Optional[List[RageClipOut]] = None
+
+
 #
 # -------------------------------------------------------------------
 # COMPARISON (optional, already used)
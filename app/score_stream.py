@@ -0,0 +1,180 @@
+import asyncio
+import datetime as dt
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .app_state import get_data_version
+
+SCORE_COLUMNS = (
+    "rage_score",
+    "difficulty_rage",
+    "technical_rage",
+    "social_toxicity_rage",
+    "ui_design_rage",
+)
+
+# How often each API worker checks whether a compute run has finished.
+STREAM_POLL_SECONDS = 2.0
+
+# Comment line sent to idle SSE clients so proxies keep the connection open.
+HEARTBEAT_SECONDS = 15.0
+
+# Events buffered per client; a client that falls further behind is told to resync.
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# The change log only has to cover reconnects, not history.
+SCORE_CHANGE_RETENTION_DAYS = 2
+
+_READ_BATCH = 1000
+
+
+# -------------------------------------------------------------------
+# WRITE SIDE (compute_scores.py)
+# -------------------------------------------------------------------
+
+
+def score_changed(previous: Optional[tuple], scores: Dict) -> bool:
+    if previous is None:
+        return True
+    return any(
+        abs((old or 0.0) - scores[col]) > 1e-9
+        for old, col in zip(previous, SCORE_COLUMNS)
+    )
+
+
+def record_score_change(db: Session, game_id: int, window: str, scores: Dict, now: dt.datetime):
+    db.add(
+        models.ScoreChange(
+            game_id=game_id,
+            window=window,
+            changed_at=now,
+            **{col: scores[col] for col in SCORE_COLUMNS},
+        )
+    )
+
+
+def prune_score_changes(db: Session, now: Optional[dt.datetime] = None):
+    now = now or dt.datetime.utcnow()
+    cutoff = now - dt.timedelta(days=SCORE_CHANGE_RETENTION_DAYS)
+    db.execute(delete(models.ScoreChange).where(models.ScoreChange.changed_at < cutoff))
+
+
+# -------------------------------------------------------------------
+# READ SIDE (API workers)
+# -------------------------------------------------------------------
+
+
+def topics_for(games: Iterable[int] = (), leaderboards: Iterable[str] = ()) -> Set[str]:
+    return {f"game:{g}" for g in games} | {f"leaderboard:{w}" for w in leaderboards}
+
+
+def _event_topics(event: Dict) -> Set[str]:
+    return {f"game:{event['game_id']}", f"leaderboard:{event['window']}"}
+
+
+def read_changes(conn, after_id: int) -> List[Dict]:
+    """All logged changes with id > after_id, oldest first."""
+    c = models.ScoreChange.__table__.c
+    events: List[Dict] = []
+    while True:
+        rows = conn.execute(
+            select(c.id, c.game_id, c.window, *[c[col] for col in SCORE_COLUMNS], c.changed_at)
+            .where(c.id > after_id)
+            .order_by(c.id)
+            .limit(_READ_BATCH)
+        ).all()
+        for row in rows:
+            event = row._asdict()
+            event["changed_at"] = event["changed_at"].isoformat()
+            events.append(event)
+        if len(rows) < _READ_BATCH:
+            return events
+        after_id = rows[-1].id
+
+
+class Subscription:
+    def __init__(self, topics: Set[str]):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event: Dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind: drop the backlog and ask the client to refetch.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+
+class ScoreBroker:
+    """
+    In-process pub/sub for score updates. The scoring job signals a new run
+    by bumping data_version; the poller then tails score_changes and fans
+    the new rows out to subscribers of the affected game/leaderboard topics.
+    """
+
+    def __init__(self, bind=None):
+        self.bind = bind
+        self.last_change_id = 0
+        self._version: Optional[int] = None
+        self._subscriptions: Set[Subscription] = set()
+
+    def _engine(self):
+        if self.bind is not None:
+            return self.bind
+        from .database import engine
+
+        return engine
+
+    def subscribe(self, topics: Set[str]) -> Subscription:
+        sub = Subscription(topics)
+        self._subscriptions.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self._subscriptions.discard(sub)
+
+    def publish(self, event: Dict):
+        topics = _event_topics(event)
+        for sub in list(self._subscriptions):
+            if sub.topics & topics:
+                sub.offer(event)
+
+    def replay(self, after_id: int) -> List[Dict]:
+        """Changes a reconnecting client missed (SSE Last-Event-ID)."""
+        with self._engine().connect() as conn:
+            return read_changes(conn, after_id)
+
+    def _start(self):
+        with self._engine().connect() as conn:
+            self._version = get_data_version(conn)
+            self.last_change_id = conn.execute(
+                select(func.coalesce(func.max(models.ScoreChange.id), 0))
+            ).scalar()
+
+    def _poll(self) -> List[Dict]:
+        with self._engine().connect() as conn:
+            version = get_data_version(conn)
+            if version == self._version:
+                return []
+            self._version = version
+            events = read_changes(conn, self.last_change_id)
+        if events:
+            self.last_change_id = events[-1]["id"]
+        return events
+
+    async def run(self, poll_seconds: float = STREAM_POLL_SECONDS):
+        await asyncio.to_thread(self._start)
+        while True:
+            await asyncio.sleep(poll_seconds)
+            try:
+                events = await asyncio.to_thread(self._poll)
+            except Exception as e:
+                print(f"[STREAM] poll failed: {e}")
+                continue
+            for event in events:
+                self.publish(event)
@@ -1,3 +1,5 @@
+import re
+import zlib
 from typing import List, Dict, Optional
 
 RAGE_KEYWORDS_DIFFICULTY = [
@@ -21,70 +23,268 @@ RAGE_KEYWORDS_UI_DESIGN = [
 ]
 
 
+RAGE_WORD_STOPWORDS = {
+    "the",
+    "and",
+    "for",
+    "you",
+    "your",
+    "with",
+    "that",
+    "this",
+    "have",
+    "but",
+    "not",
+    "are",
+    "was",
+    "were",
+    "they",
+    "them",
+    "get",
+    "got",
+    "just",
+    "like",
+    "its",
+    "from",
+    "been",
+    "will",
+    "what",
+    "when",
+    "where",
+    "who",
+    "why",
+    "how",
+    "does",
+    "did",
+    "can",
+    "cant",
+    "could",
+    "should",
+    "would",
+    "all",
+    "any",
+    "some",
+    "into",
+    "about",
+    "more",
+    "very",
+    "really",
+    "also",
+    "than",
+    "then",
+    "there",
+    "here",
+    "out",
+    "over",
+    "under",
+    "game",
+    "games",
+    "play",
+    "played",
+    "playing",
+    "one",
+    "two",
+    "three",
+    "still",
+    "even",
+    "because",
+    "good",
+    "great",
+    "fun",
+    "love",
+    "enjoy",
+    "enjoyed",
+    "well",
+    "time",
+    "hours",
+    "hour",
+    "make",
+    "made",
+}
+
+_WORD_RE = re.compile(r"[a-zA-Z]+")
+
+
+def tokenize_rage_words(text: str) -> List[str]:
+    """Lowercased word-cloud tokens: 4+ letters, stopwords removed."""
+    return [
+        t
+        for t in _WORD_RE.findall((text or "").lower())
+        if len(t) >= 4 and t not in RAGE_WORD_STOPWORDS
+    ]
+
+
+# Points per keyword hit / negative review.
+NEGATIVE_POINTS = 1.0
+DIFFICULTY_HIT_POINTS = 0.6
+TECH_HIT_POINTS = 0.5
+TOXIC_HIT_POINTS = 0.5
+UI_HIT_POINTS = 0.4
+MAX_POINTS_PER_REVIEW = 5.0
+
+# Weights used when no scoring_config.json overrides them (see
+# app.scoring_config). Review points are re-derived from stored hit and
+# negative counts, so changing them needs no rescan of review text.
+DEFAULT_SCORING: Dict = {
+    "version": 1,
+    "points": {
+        "negative": NEGATIVE_POINTS,
+        "difficulty_hit": DIFFICULTY_HIT_POINTS,
+        "tech_hit": TECH_HIT_POINTS,
+        "toxic_hit": TOXIC_HIT_POINTS,
+        "ui_hit": UI_HIT_POINTS,
+        "max_per_review": MAX_POINTS_PER_REVIEW,
+    },
+    # Achievement-curve drop (percentage points) that maps to 100 rage.
+    "achievement_drop_full_rage": 70.0,
+    "difficulty_blend": {"reviews": 0.7, "achievements": 0.3},
+    "rage_score": {
+        "review": 0.4,
+        "difficulty": 0.3,
+        "technical": 0.15,
+        "toxicity": 0.1,
+        "ui_design": 0.05,
+    },
+    # Whether near-duplicate rows (dup_of set) count toward scores. When off,
+    # a review bomb or copypasta cluster counts once, through its first row.
+    # Applied when compute_scores.py rebuilds the daily rollups, so
+    # reweight_scores.py (which rescores stored totals) cannot change it.
+    "score_near_duplicates": False,
+}
+
+# Stamp stored next to precomputed per-row features. It changes whenever the
+# keyword lists or point values change, which marks every row for re-extraction.
+FEATURES_VERSION = zlib.crc32(
+    repr(
+        (
+            RAGE_KEYWORDS_DIFFICULTY,
+            RAGE_KEYWORDS_TECH,
+            RAGE_KEYWORDS_TOXIC,
+            RAGE_KEYWORDS_UI_DESIGN,
+            NEGATIVE_POINTS,
+            DIFFICULTY_HIT_POINTS,
+            TECH_HIT_POINTS,
+            TOXIC_HIT_POINTS,
+            UI_HIT_POINTS,
+        )
+    ).encode("utf-8")
+) & 0x7FFFFFFF
+
+
 def _count_keywords(text: str, keywords: List[str]) -> int:
     t = (text or "").lower()
     return sum(1 for kw in keywords if kw in t)
 
 
-def score_reviews_for_game(reviews: List[Dict]) -> Dict[str, float]:
+def extract_review_features(text: str, is_positive: bool) -> Dict[str, int]:
     """
-    reviews: list of dicts like:
-      {"is_positive": bool, "review_text": str}
+    Per-row keyword hit counts, computed once at ingest.
+
+    rage_points is stored in tenths of a point so it fits an integer column.
     """
-    if not reviews:
-        return {
-            "review_rage": 0.0,
-            "difficulty_rage": 0.0,
-            "technical_rage": 0.0,
-            "social_toxicity_rage": 0.0,
-            "ui_design_rage": 0.0,
-        }
+    t = (text or "").lower()
+    diff_hits = _count_keywords(t, RAGE_KEYWORDS_DIFFICULTY)
+    tech_hits = _count_keywords(t, RAGE_KEYWORDS_TECH)
+    toxic_hits = _count_keywords(t, RAGE_KEYWORDS_TOXIC)
+    ui_hits = _count_keywords(t, RAGE_KEYWORDS_UI_DESIGN)
 
-    total = len(reviews)
-    rage_points_total = 0.0
-    difficulty_points = 0.0
-    tech_points = 0.0
-    toxic_points = 0.0
-    ui_points = 0.0
+    points = (
+        (0.0 if is_positive else NEGATIVE_POINTS)
+        + DIFFICULTY_HIT_POINTS * diff_hits
+        + TECH_HIT_POINTS * tech_hits
+        + TOXIC_HIT_POINTS * toxic_hits
+        + UI_HIT_POINTS * ui_hits
+    )
+
+    return {
+        "diff_hits": diff_hits,
+        "tech_hits": tech_hits,
+        "toxic_hits": toxic_hits,
+        "ui_hits": ui_hits,
+        "rage_points": int(round(points * 10)),
+        "features_version": FEATURES_VERSION,
+    }
 
-    for r in reviews:
-        text = r.get("review_text") or ""
-        base = 0.0
 
-        if not r.get("is_positive", True):
-            base += 1.0
+def _cap(x):
+    import numpy as np
 
-        diff_hits = _count_keywords(text, RAGE_KEYWORDS_DIFFICULTY)
-        tech_hits = _count_keywords(text, RAGE_KEYWORDS_TECH)
-        toxic_hits = _count_keywords(text, RAGE_KEYWORDS_TOXIC)
-        ui_hits = _count_keywords(text, RAGE_KEYWORDS_UI_DESIGN)
+    return np.minimum(100.0, x)
 
-        diff_score = 0.6 * diff_hits
-        tech_score = 0.5 * tech_hits
-        toxic_score = 0.5 * toxic_hits
-        ui_score = 0.4 * ui_hits
 
-        per_review_rage = base + diff_score + tech_score + toxic_score + ui_score
+def _total(totals: Dict, key: str):
+    value = totals.get(key)
+    return 0 if value is None else value
 
-        rage_points_total += per_review_rage
-        difficulty_points += diff_score
-        tech_points += tech_score
-        toxic_points += toxic_score
-        ui_points += ui_score
 
-    max_possible = total * 5.0
-    factor = 100.0 / max_possible if max_possible > 0 else 0.0
+def score_feature_totals(totals: Dict[str, float], config: Dict = DEFAULT_SCORING) -> Dict[str, float]:
+    """
+    Turn summed per-row features into review scores.
+
+    totals: {"rows", "negatives", "diff_hits", "tech_hits", "toxic_hits", "ui_hits"}
+    Values may be numbers or equal-length NumPy arrays (one entry per game),
+    which is how app.reweight rescores every game at once.
+    """
+    # Imported here: the API pulls in this module (via crud) for the
+    # tokenizer alone, and NumPy is only needed by the batch scorers.
+    import numpy as np
+
+    p = config["points"]
+    rows = np.asarray(_total(totals, "rows"), dtype=np.float64)
+    difficulty_points = p["difficulty_hit"] * np.asarray(_total(totals, "diff_hits"), dtype=np.float64)
+    tech_points = p["tech_hit"] * np.asarray(_total(totals, "tech_hits"), dtype=np.float64)
+    toxic_points = p["toxic_hit"] * np.asarray(_total(totals, "toxic_hits"), dtype=np.float64)
+    ui_points = p["ui_hit"] * np.asarray(_total(totals, "ui_hits"), dtype=np.float64)
+    rage_points_total = (
+        p["negative"] * np.asarray(_total(totals, "negatives"), dtype=np.float64)
+        + difficulty_points + tech_points + toxic_points + ui_points
+    )
+
+    max_possible = rows * p["max_per_review"]
+    factor = np.divide(100.0, max_possible, out=np.zeros_like(max_possible), where=max_possible > 0)
 
     return {
-        "review_rage": min(100.0, rage_points_total * factor),
-        "difficulty_rage": min(100.0, difficulty_points * factor),
-        "technical_rage": min(100.0, tech_points * factor),
-        "social_toxicity_rage": min(100.0, toxic_points * factor),
-        "ui_design_rage": min(100.0, ui_points * factor),
+        "review_rage": _cap(rage_points_total * factor),
+        "difficulty_rage": _cap(difficulty_points * factor),
+        "technical_rage": _cap(tech_points * factor),
+        "social_toxicity_rage": _cap(toxic_points * factor),
+        "ui_design_rage": _cap(ui_points * factor),
+    }
+
+
+def score_reviews_for_game(reviews: List[Dict], config: Dict = DEFAULT_SCORING) -> Dict[str, float]:
+    """
+    reviews: list of dicts like:
+      {"is_positive": bool, "review_text": str}
+    """
+    totals = {
+        "rows": len(reviews),
+        "negatives": 0,
+        "diff_hits": 0,
+        "tech_hits": 0,
+        "toxic_hits": 0,
+        "ui_hits": 0,
     }
+    for r in reviews:
+        is_positive = r.get("is_positive", True)
+        features = extract_review_features(r.get("review_text") or "", is_positive)
+        totals["negatives"] += 0 if is_positive else 1
+        for key in ("diff_hits", "tech_hits", "toxic_hits", "ui_hits"):
+            totals[key] += features[key]
+
+    return score_feature_totals(totals, config)
 
 
-def score_achievements_for_game(achievements: List[Dict]) -> Dict[str, Optional[float]]:
+def achievement_rage(max_drop, config: Dict = DEFAULT_SCORING):
+    """Rage from the steepest achievement-curve drop (number or array)."""
+    import numpy as np
+
+    return _cap(np.asarray(max_drop, dtype=np.float64) * (100.0 / config["achievement_drop_full_rage"]))
+
+
+def score_achievements_for_game(
+    achievements: List[Dict], config: Dict = DEFAULT_SCORING
+) -> Dict[str, Optional[float]]:
     """
     achievements: list of dicts like:
       {"api_name": str, "display_name": str, "percent": float}
@@ -113,10 +313,8 @@ def score_achievements_for_game(achievements: List[Dict]) -> Dict[str, Optional[
             drop_to = cur["percent"]
             drop_ach_name = cur.get("display_name") or cur["api_name"]
 
-    achievement_rage = min(100.0, max_drop * (100.0 / 70.0))
-
     return {
-        "achievement_rage": achievement_rage,
+        "achievement_rage": achievement_rage(max_drop, config),
         "max_achievement_drop": max_drop,
         "max_drop_from": drop_from,
         "max_drop_to": drop_to,
@@ -125,27 +323,31 @@ def score_achievements_for_game(achievements: List[Dict]) -> Dict[str, Optional[
 
 
 def combine_rage_scores(
-    review_scores: Dict[str, float], ach_scores: Dict[str, Optional[float]]
+    review_scores: Dict[str, float],
+    ach_scores: Dict[str, Optional[float]],
+    config: Dict = DEFAULT_SCORING,
 ) -> Dict[str, Optional[float]]:
-    difficulty = min(
-        100.0,
-        review_scores["difficulty_rage"] * 0.7
-        + (ach_scores["achievement_rage"] or 0.0) * 0.3,
+    blend = config["difficulty_blend"]
+    weights = config["rage_score"]
+    ach_rage = ach_scores["achievement_rage"]
+    difficulty = _cap(
+        review_scores["difficulty_rage"] * blend["reviews"]
+        + (0.0 if ach_rage is None else ach_rage) * blend["achievements"],
     )
     technical = review_scores["technical_rage"]
     toxic = review_scores["social_toxicity_rage"]
     ui_design = review_scores["ui_design_rage"]
 
     rage_score = (
-        0.4 * review_scores["review_rage"]
-        + 0.3 * difficulty
-        + 0.15 * technical
-        + 0.1 * toxic
-        + 0.05 * ui_design
+        weights["review"] * review_scores["review_rage"]
+        + weights["difficulty"] * difficulty
+        + weights["technical"] * technical
+        + weights["toxicity"] * toxic
+        + weights["ui_design"] * ui_design
     )
 
     return {
-        "rage_score": min(100.0, rage_score),
+        "rage_score": _cap(rage_score),
         "difficulty_rage": difficulty,
         "technical_rage": technical,
         "social_toxicity_rage": toxic,
@@ -0,0 +1,67 @@
+import copy
+import json
+import os
+from typing import Dict, Optional
+
+from .scoring import DEFAULT_SCORING
+
+# Versioned weight overrides; absent means DEFAULT_SCORING.
+SCORING_CONFIG_PATH = os.getenv("RAGEQUIT_SCORING_CONFIG", "scoring_config.json")
+
+_cache: Dict[str, object] = {"path": None, "mtime": None, "config": None}
+
+
+def _merge(base: Dict, override: Dict, where: str = "") -> Dict:
+    out = copy.deepcopy(base)
+    for key, value in override.items():
+        if key not in base:
+            raise ValueError(f"Unknown scoring setting: {where}{key}")
+        if isinstance(base[key], dict):
+            if not isinstance(value, dict):
+                raise ValueError(f"Scoring setting {where}{key} must be an object")
+            out[key] = _merge(base[key], value, f"{where}{key}.")
+        elif isinstance(base[key], bool):
+            if not isinstance(value, bool):
+                raise ValueError(f"Scoring setting {where}{key} must be true or false")
+            out[key] = value
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Scoring setting {where}{key} must be a number")
+        else:
+            out[key] = value
+    return out
+
+
+def load_config(path: str) -> Dict:
+    """DEFAULT_SCORING with the file's values laid over it; raises ValueError on bad input."""
+    with open(path, encoding="utf-8") as f:
+        try:
+            override = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e}") from e
+    config = _merge(DEFAULT_SCORING, override)
+    if config["points"]["max_per_review"] <= 0 or config["achievement_drop_full_rage"] <= 0:
+        raise ValueError("max_per_review and achievement_drop_full_rage must be positive")
+    return config
+
+
+def current_config(path: Optional[str] = None) -> Dict:
+    """
+    The active scoring config, re-read whenever the file's mtime changes so
+    long-running processes pick up edits. A broken edit keeps the last good
+    config (and is reported) rather than stopping the scorer.
+    """
+    path = path or SCORING_CONFIG_PATH
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return DEFAULT_SCORING
+    if _cache["path"] == path and _cache["mtime"] == mtime:
+        return _cache["config"]
+    try:
+        config = load_config(path)
+    except (OSError, ValueError) as e:
+        print(f"[SCORING] Ignoring {path}: {e}")
+        return _cache["config"] if _cache["path"] == path else DEFAULT_SCORING
+    _cache.update(path=path, mtime=mtime, config=config)
+    print(f"[SCORING] Loaded scoring config version {config['version']} from {path}")
+    return config
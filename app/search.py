@@ -0,0 +1,183 @@
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import models
+from .app_state import get_data_version
+
+# Most results one /games/search call can return.
+SEARCH_MAX_LIMIT = 50
+
+# Prefixes up to this length match too many keys to rank per request;
+# their top results are precomputed at build time.
+PRECOMPUTED_PREFIX_LEN = 2
+
+# How often a worker checks whether the games table changed.
+INDEX_CHECK_SECONDS = 30.0
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents, and collapse punctuation to single spaces."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def _index_keys(name: str, slug: str) -> List[Tuple[str, int]]:
+    """
+    (key, tier) pairs for one game: the name from each word onwards, so
+    "souls" finds "Dark Souls III", plus the slug. Tier 0 keys start at the
+    beginning of the title and rank ahead of mid-title matches.
+    """
+    words = normalize(name).split()
+    keys = {" ".join(words[i:]): min(i, 1) for i in range(len(words))}
+    slug_key = normalize(slug)
+    if slug_key and slug_key not in keys:
+        keys[slug_key] = 0
+    return list(keys.items())
+
+
+class SearchIndex:
+    """
+    Immutable prefix index over game names and slugs: one sorted key array
+    searched with bisect. Never mutated after build, so readers need no lock.
+    """
+
+    def __init__(self, games: List[Tuple[int, str, str, Optional[float]]], signature=None):
+        self.signature = signature
+        self.games: Dict[int, Dict] = {}
+        entries = []
+        for game_id, name, slug, rage_score in games:
+            self.games[game_id] = {
+                "id": game_id,
+                "name": name,
+                "slug": slug,
+                "rage_score": rage_score,
+            }
+            score = rage_score or 0.0
+            for key, tier in _index_keys(name, slug):
+                # sort key: best match first within a prefix bucket
+                entries.append((key, (tier, -score, name.lower(), game_id)))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ranks = [rank for _, rank in entries]
+
+        # Short prefixes: keep only the best SEARCH_MAX_LIMIT games each.
+        buckets: Dict[str, List[Tuple]] = {}
+        for key, rank in entries:
+            for n in range(1, min(PRECOMPUTED_PREFIX_LEN, len(key)) + 1):
+                buckets.setdefault(key[:n], []).append(rank)
+        self.top: Dict[str, List[int]] = {
+            prefix: self._best(ranks, SEARCH_MAX_LIMIT) for prefix, ranks in buckets.items()
+        }
+
+    @staticmethod
+    def _best(ranks, limit: int) -> List[int]:
+        seen = set()
+        out = []
+        for rank in sorted(ranks):
+            game_id = rank[-1]
+            if game_id not in seen:
+                seen.add(game_id)
+                out.append(game_id)
+                if len(out) == limit:
+                    break
+        return out
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        q = normalize(query)
+        if not q:
+            return []
+        if len(q) <= PRECOMPUTED_PREFIX_LEN:
+            ids = self.top.get(q, [])[:limit]
+        else:
+            lo = bisect_left(self.keys, q)
+            hi = bisect_left(self.keys, q + "\uffff", lo)
+            # A game can own several matching keys; keep its best one.
+            best: Dict[int, Tuple] = {}
+            for rank in self.ranks[lo:hi]:
+                game_id = rank[-1]
+                if game_id not in best or rank < best[game_id]:
+                    best[game_id] = rank
+            ids = [rank[-1] for rank in heapq.nsmallest(limit, best.values())]
+        return [self.games[game_id] for game_id in ids]
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+
+def _signature(db: Session):
+    """Changes whenever a game is added or renamed, or scores are recomputed."""
+    count, max_id, last_update = db.query(
+        func.count(models.Game.id), func.max(models.Game.id), func.max(models.Game.updated_at)
+    ).one()
+    return get_data_version(db.connection()), count, max_id, last_update
+
+
+def build_index(db: Session) -> SearchIndex:
+    signature = _signature(db)
+    rows = (
+        db.query(models.Game.id, models.Game.name, models.Game.slug, models.GameRageScore.rage_score)
+        .outerjoin(models.GameRageScore, models.GameRageScore.game_id == models.Game.id)
+        .all()
+    )
+    return SearchIndex(rows, signature=signature)
+
+
+class GameSearch:
+    """
+    Holds the current SearchIndex for this worker. A rebuild constructs a
+    complete new index and then swaps the reference, so a request sees
+    either the old index or the new one, never a half-built one; while one
+    thread rebuilds, the others keep answering from the old index.
+    """
+
+    def __init__(self):
+        self.index = SearchIndex([])
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self.rebuilds = 0
+        self.last_build_seconds = 0.0
+
+    def refresh(self, db: Session, force: bool = False) -> bool:
+        now = time.monotonic()
+        if not force and now - self._checked_at < INDEX_CHECK_SECONDS:
+            return False
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._checked_at = now
+            if not force and _signature(db) == self.index.signature:
+                return False
+            started = time.perf_counter()
+            self.index = build_index(db)
+            self.last_build_seconds = time.perf_counter() - started
+            self.rebuilds += 1
+            return True
+        finally:
+            self._lock.release()
+
+    def search(self, db: Session, query: str, limit: int = 10) -> List[Dict]:
+        self.refresh(db)
+        return self.index.search(query, limit)
+
+    def stats(self) -> Dict:
+        index = self.index
+        return {
+            "games": len(index),
+            "keys": len(index.keys),
+            "rebuilds": self.rebuilds,
+            "last_build_seconds": round(self.last_build_seconds, 3),
+        }
+
+
+game_search = GameSearch()
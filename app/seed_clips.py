@@ -1,5 +1,6 @@
 from datetime import datetime
-from app.database import SessionLocal, Base, engine
+from app.database import SessionLocal
+from app.migrations import ensure_schema
 from app import models
 
 CLIPS = [
@@ -18,7 +19,7 @@ CLIPS = [
 ]
 
 def main():
-    Base.metadata.create_all(bind=engine)
+    ensure_schema()
     db = SessionLocal()
     try:
         for clip in CLIPS:
@@ -0,0 +1,144 @@
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import delete, insert, or_
+from sqlalchemy.orm import Session
+
+from . import models
+
+# The rage vector compared between games.
+VECTOR_COLUMNS = (
+    "rage_score",
+    "difficulty_rage",
+    "technical_rage",
+    "social_toxicity_rage",
+    "ui_design_rage",
+)
+
+# Neighbours stored per game (and the most /similar can return).
+SIMILAR_K = 10
+
+# Query rows per distance block.
+BLOCK_SIZE = 256
+
+# Rows on each side of a block scanned for the first (upper bound) pass.
+CANDIDATE_WINDOW = 2048
+
+# Columns with less spread than this are not rescaled.
+MIN_STD = 1e-6
+
+
+def _block_neighbours(x, sq, start, stop, lo, hi, k):
+    """k nearest of x[start:stop] among x[lo:hi], as (indices, squared distances)."""
+    d2 = sq[start:stop, None] + sq[None, lo:hi] - 2.0 * (x[start:stop] @ x[lo:hi].T)
+    rows = np.arange(stop - start)
+    d2[rows, rows + start - lo] = np.inf  # not your own neighbour
+    part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+    part_d2 = np.take_along_axis(d2, part, axis=1)
+    order = np.argsort(part_d2, axis=1)
+    return np.take_along_axis(part, order, axis=1) + lo, np.take_along_axis(part_d2, order, axis=1)
+
+
+def nearest_neighbours(
+    vectors: np.ndarray,
+    k: int = SIMILAR_K,
+    block_size: int = BLOCK_SIZE,
+    window: int = CANDIDATE_WINDOW,
+):
+    """
+    Exact k-nearest neighbours by Euclidean distance over standardized
+    columns. Returns (indices, distances), each shaped (n, k'), closest first.
+
+    Rows are sorted along the first principal axis. Each block is first
+    matched against a window of its sorted neighbours; the k-th distance
+    found there bounds how far along that axis a true neighbour can lie,
+    so the exact pass only scans that slice instead of every game.
+    """
+    n = len(vectors)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64), np.empty((n, 0), dtype=np.float32)
+
+    x = vectors.astype(np.float64)
+    std = x.std(axis=0)
+    x = (x - x.mean(axis=0)) / np.where(std > MIN_STD, std, 1.0)
+    axis = np.linalg.eigh(np.cov(x, rowvar=False))[1][:, -1] if x.shape[1] > 1 else np.ones(1)
+    proj = x @ axis
+    sort = np.argsort(proj, kind="stable")
+    x = x[sort].astype(np.float32)
+    proj = proj[sort]
+    sq = np.einsum("ij,ij->i", x, x)
+
+    indices = np.empty((n, k), dtype=np.int64)
+    distances = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        lo, hi = max(0, start - window), min(n, stop + window)
+        while hi - lo - 1 < k:  # tiny inputs: widen until k others are in view
+            lo, hi = max(0, lo - window), min(n, hi + window)
+        idx, d2 = _block_neighbours(x, sq, start, stop, lo, hi, k)
+
+        # |proj_i - proj_j| <= |x_i - x_j|: nothing beyond the bound can be closer.
+        reach = float(np.sqrt(max(d2[:, -1].max(), 0.0))) * 1.0001 + 1e-6
+        lo2 = int(np.searchsorted(proj, proj[start] - reach, side="left"))
+        hi2 = int(np.searchsorted(proj, proj[stop - 1] + reach, side="right"))
+        if lo2 < lo or hi2 > hi:
+            idx, d2 = _block_neighbours(x, sq, start, stop, min(lo, lo2), max(hi, hi2), k)
+
+        indices[start:stop] = sort[idx]
+        distances[start:stop] = np.sqrt(np.maximum(d2, 0.0))
+
+    # back to the caller's row order
+    out_i = np.empty_like(indices)
+    out_d = np.empty_like(distances)
+    out_i[sort] = indices
+    out_d[sort] = distances
+    return out_i, out_d
+
+
+def rebuild_similar_games(db: Session, k: int = SIMILAR_K) -> Dict[str, int]:
+    """Recompute every game's top-k similar games and replace game_similar; the caller commits."""
+    s = models.GameRageScore
+    cols = [getattr(s, c) for c in VECTOR_COLUMNS]
+    # All-zero vectors are games with no data yet: nothing to compare.
+    rows = db.query(s.game_id, *cols).filter(or_(*[c > 0 for c in cols])).order_by(s.game_id).all()
+    db.execute(delete(models.GameSimilar))
+    if len(rows) < 2:
+        return {"games": len(rows), "pairs": 0}
+
+    data = np.array(rows, dtype=np.float64)
+    game_ids = data[:, 0].astype(np.int64)
+    indices, distances = nearest_neighbours(data[:, 1:], k)
+
+    neighbour_ids = game_ids[indices]
+    n, kk = indices.shape
+    payload = [
+        {"game_id": int(g), "rank": rank + 1, "similar_game_id": int(other), "distance": float(d)}
+        for g, others, dists in zip(game_ids.tolist(), neighbour_ids.tolist(), distances.tolist())
+        for rank, (other, d) in enumerate(zip(others, dists))
+    ]
+    db.execute(insert(models.GameSimilar), payload)
+    return {"games": n, "pairs": n * kk}
+
+
+def get_similar_games(db: Session, game_id: int, limit: int = SIMILAR_K) -> List[Dict]:
+    """Precomputed neighbours of one game: one primary-key range scan."""
+    gs = models.GameSimilar
+    rows = (
+        db.query(models.Game, models.GameRageScore.rage_score, gs.distance)
+        .join(gs, gs.similar_game_id == models.Game.id)
+        .join(models.GameRageScore, models.GameRageScore.game_id == models.Game.id)
+        .filter(gs.game_id == game_id)
+        .order_by(gs.rank)
+        .limit(limit)
+    )
+    return [
+        {
+            "id": game.id,
+            "name": game.name,
+            "slug": game.slug,
+            "rage_score": rage_score,
+            "distance": distance,
+        }
+        for game, rage_score, distance in rows
+    ]
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Longest a duplicate request waits on someone else's computation.
+DEFAULT_WAIT_SECONDS = 30.0
+
+
+class SingleFlightTimeout(TimeoutError):
+    """A caller gave up waiting; the shared computation keeps running."""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    do() is for sync code (FastAPI threadpool handlers), do_async() for
+    coroutines. Followers share the leader's result or exception; a
+    follower that times out raises SingleFlightTimeout without cancelling
+    the leader.
+    """
+
+    def __init__(self, wait_seconds: float = DEFAULT_WAIT_SECONDS):
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.absorbed = 0
+        self.timeouts = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None):
+        timeout = self.wait_seconds if timeout is None else timeout
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.absorbed += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise SingleFlightTimeout(f"Timed out after {timeout:.0f}s waiting for {key!r}")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do_async(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ):
+        timeout = self.wait_seconds if timeout is None else timeout
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self.executions += 1
+        else:
+            self.absorbed += 1
+
+        # shield(): one caller timing out or disconnecting must not cancel
+        # the computation the others are waiting on.
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise SingleFlightTimeout(
+                f"Timed out after {timeout:.0f}s waiting for {key!r}"
+            ) from None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            in_flight = len(self._calls) + len(self._tasks)
+        return {
+            "executions": self.executions,
+            "absorbed": self.absorbed,
+            "timeouts": self.timeouts,
+            "in_flight": in_flight,
+        }
@@ -0,0 +1,235 @@
+import datetime as dt
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Weight of the newest completed day in the EWMA baseline.
+EWMA_ALPHA = 0.2
+
+# Baseline needs this many completed days before we alert.
+MIN_BASELINE_DAYS = 5
+
+# A day with fewer reviews is too noisy to call a spike.
+MIN_DAY_REVIEWS = 20
+
+# Floor on the baseline variance (std of 5 percentage points).
+MIN_VARIANCE = 0.05 ** 2
+
+SPIKE_Z = 3.0
+
+
+def _fold_day(state: models.RageSpikeState):
+    """Fold the finished day's negative share into the EWMA mean/variance."""
+    if not state.day_total:
+        return
+    share = state.day_negative / state.day_total
+    if state.ewma_mean is None:
+        state.ewma_mean = share
+        state.ewma_var = 0.0
+    else:
+        diff = share - state.ewma_mean
+        incr = EWMA_ALPHA * diff
+        state.ewma_mean += incr
+        state.ewma_var = (1 - EWMA_ALPHA) * (state.ewma_var + diff * incr)
+    state.observed_days += 1
+
+
+def _checkpoint(db: Session, state: models.RageSpikeState):
+    """Store the baseline after folding state.day on that day's row."""
+    row = db.get(models.RageSpikeDay, (state.game_id, state.day))
+    row.ewma_mean = state.ewma_mean
+    row.ewma_var = state.ewma_var
+    row.observed_days = state.observed_days
+
+
+def _add_day(db: Session, state: models.RageSpikeState, day: dt.date, total: int, negative: int):
+    if state.day is not None and day < state.day:
+        return  # folded already; update_spike_detector replays instead
+    if state.day is not None and day > state.day:
+        _fold_day(state)
+        _checkpoint(db, state)
+        state.day_total = 0
+        state.day_negative = 0
+    state.day = day
+    state.day_total += total
+    state.day_negative += negative
+
+
+def _refresh_z(state: models.RageSpikeState):
+    if (
+        state.ewma_mean is None
+        or state.observed_days < MIN_BASELINE_DAYS
+        or state.day_total < MIN_DAY_REVIEWS
+    ):
+        state.z_score = 0.0
+        return
+    share = state.day_negative / state.day_total
+    std = math.sqrt(max(state.ewma_var, MIN_VARIANCE))
+    state.z_score = (share - state.ewma_mean) / std
+
+
+def _daily_history(db: Session, game_id: int) -> List[Tuple[dt.date, int, int]]:
+    """(day, reviews, negatives) per day: hot rows plus archived totals."""
+    r = models.SteamReviewRaw
+    day = func.date(r.created_at_steam)
+    counts: Dict[dt.date, List[int]] = {}
+    hot = (
+        db.query(day, func.count(r.id), func.sum(case((r.is_positive, 0), else_=1)))
+        .filter(r.game_id == game_id, r.created_at_steam.isnot(None))
+        .group_by(day)
+    )
+    for d, total, negative in hot:
+        counts[dt.date.fromisoformat(d)] = [total, negative or 0]
+
+    a = models.ArchivedDailyTotal
+    archived = db.query(
+        a.day,
+        a.rows + func.coalesce(a.dup_rows, 0),
+        a.negatives + func.coalesce(a.dup_negatives, 0),
+    ).filter(a.game_id == game_id, a.source == "steam")
+    for d, total, negative in archived:
+        c = counts.setdefault(d, [0, 0])
+        c[0] += total
+        c[1] += negative
+    return [(d, total, negative) for d, (total, negative) in sorted(counts.items())]
+
+
+def _reset(state: models.RageSpikeState):
+    state.day = None
+    state.day_total = 0
+    state.day_negative = 0
+    state.ewma_mean = None
+    state.ewma_var = 0.0
+    state.observed_days = 0
+
+
+def _replay_state(db: Session, game_id: int, state: Optional[models.RageSpikeState]):
+    """Seed a detector and its day rows from the game's whole daily history."""
+    if state is None:
+        state = models.RageSpikeState(game_id=game_id)
+        db.add(state)
+    _reset(state)
+    db.query(models.RageSpikeDay).filter_by(game_id=game_id).delete(synchronize_session=False)
+    history = _daily_history(db, game_id)
+    for day, total, negative in history:
+        db.add(models.RageSpikeDay(game_id=game_id, day=day, total=total, negative=negative))
+    db.flush()
+    for day, total, negative in history:
+        _add_day(db, state, day, total, negative)
+    return state
+
+
+def _record_days(db: Session, game_id: int, per_day: Dict[dt.date, List[int]]):
+    for day, (total, negative) in per_day.items():
+        row = db.get(models.RageSpikeDay, (game_id, day))
+        if row is None:
+            row = models.RageSpikeDay(game_id=game_id, day=day, total=0, negative=0)
+            db.add(row)
+        row.total += total
+        row.negative += negative
+    db.flush()
+
+
+def _rewind(db: Session, state: models.RageSpikeState, start: dt.date):
+    """
+    Restore the baseline from the checkpoint of the last day before
+    `start` and return the day rows from `start` on, to be re-folded.
+    """
+    d = models.RageSpikeDay
+    before = (
+        db.query(d)
+        .filter(d.game_id == state.game_id, d.day < start)
+        .order_by(d.day.desc())
+        .first()
+    )
+    _reset(state)
+    if before is not None:
+        state.ewma_mean = before.ewma_mean
+        state.ewma_var = before.ewma_var
+        state.observed_days = before.observed_days
+    return (
+        db.query(d)
+        .filter(d.game_id == state.game_id, d.day >= start)
+        .order_by(d.day)
+        .all()
+    )
+
+
+def update_spike_detector(
+    db: Session,
+    game_id: int,
+    new_reviews: Iterable[Tuple[Optional[dt.datetime], bool]],
+):
+    """
+    Feed one ingest batch of (created_at, is_positive) into the game's
+    detector; the caller commits.
+
+    Batch counts are added to rage_spike_days. A batch with days before the
+    one being accumulated (Steam's "all" filter pages by helpfulness, not
+    date) re-folds only the days from the earliest of them on, starting
+    from the checkpoint stored on the day before. A game without day rows
+    yet is seeded once from the stored history, so the batch must already
+    be inserted.
+    """
+    per_day: Dict[dt.date, List[int]] = {}
+    for created, is_positive in new_reviews:
+        if created is None:
+            continue
+        counts = per_day.setdefault(created.date(), [0, 0])
+        counts[0] += 1
+        if not is_positive:
+            counts[1] += 1
+    if not per_day:
+        return
+
+    state = db.get(models.RageSpikeState, game_id)
+    seeded = (
+        state is not None
+        and db.query(models.RageSpikeDay.day).filter_by(game_id=game_id).first() is not None
+    )
+    if not seeded:
+        state = _replay_state(db, game_id, state)
+    else:
+        _record_days(db, game_id, per_day)
+        start = min(per_day)
+        if state.day is not None and start < state.day:
+            for row in _rewind(db, state, start):
+                _add_day(db, state, row.day, row.total, row.negative)
+        else:
+            for day in sorted(per_day):
+                total, negative = per_day[day]
+                _add_day(db, state, day, total, negative)
+
+    _refresh_z(state)
+    state.updated_at = dt.datetime.utcnow()
+
+
+def list_spiking_games(db: Session, limit: int = 20, today: Optional[dt.date] = None):
+    """Games whose current day is spiking, most severe first."""
+    today = today or dt.datetime.utcnow().date()
+    s = models.RageSpikeState
+    rows = (
+        db.query(models.Game, s)
+        .join(s, models.Game.id == s.game_id)
+        .filter(s.z_score >= SPIKE_Z, s.day >= today - dt.timedelta(days=1))
+        .order_by(s.z_score.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "id": game.id,
+            "name": game.name,
+            "slug": game.slug,
+            "day": state.day,
+            "reviews": state.day_total,
+            "negative_share": state.day_negative / state.day_total,
+            "baseline_share": state.ewma_mean,
+            "severity": state.z_score,
+        }
+        for game, state in rows
+    ]
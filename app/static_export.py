@@ -0,0 +1,110 @@
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from . import crud, schemas
+from .rollups import WINDOWS
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it only gzip variants are written
+    brotli = None
+
+EXPORT_ROOT = "static_export"
+CURRENT_LINK = "current"
+KEEP_VERSIONS = 3
+LEADERBOARD_LIMIT = 100
+
+
+def _write(base: str, rel_path: str, payload) -> int:
+    """Write one JSON document plus its .gz / .br siblings; returns raw size."""
+    path = os.path.join(base, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+
+    with open(path, "wb") as f:
+        f.write(data)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+    return len(data)
+
+
+def _swap_current(root: str, version: str):
+    """Atomically repoint root/current at versions/<version>."""
+    link = os.path.join(root, CURRENT_LINK)
+    tmp_link = link + ".tmp"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.join("versions", version), tmp_link)
+    os.replace(tmp_link, link)
+
+
+def _prune_versions(root: str, keep: int):
+    versions_dir = os.path.join(root, "versions")
+    current = os.path.basename(os.readlink(os.path.join(root, CURRENT_LINK)))
+    versions = sorted(os.listdir(versions_dir))
+    for old in versions[:-keep]:
+        if old != current:
+            shutil.rmtree(os.path.join(versions_dir, old), ignore_errors=True)
+
+
+def export_static_bundle(db: Session, root: str = EXPORT_ROOT) -> Dict:
+    """
+    Pre-render leaderboards, game details (by id and slug) and timelines
+    into a new versioned directory, then swap it in as root/current.
+    """
+    if brotli is None:
+        print("[WARN] brotli is not installed; writing gzip variants only (pip install -r requirements.txt)")
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    base = os.path.join(root, "versions", version)
+    os.makedirs(base)
+
+    files = 0
+    raw_bytes = 0
+
+    for window in WINDOWS:
+        prefix = "leaderboards" if window == "all" else f"leaderboards/{window}"
+        for name, fn in crud.LEADERBOARDS.items():
+            rows: List = [
+                schemas.GameSummary(**g)
+                for g in fn(db, limit=LEADERBOARD_LIMIT, window=window)
+            ]
+            raw_bytes += _write(base, f"{prefix}/{name}.json", rows)
+            files += 1
+
+    games = 0
+    for detail in crud.iter_game_details(db):
+        payload = schemas.GameDetail(**detail)
+        raw_bytes += _write(base, f"games/{detail['id']}.json", payload)
+        raw_bytes += _write(base, f"games/slug/{detail['slug']}.json", payload)
+
+        timeline = [
+            schemas.RageTimelinePoint(**p)
+            for p in crud.get_game_rage_timeline(db, detail["id"])
+        ]
+        raw_bytes += _write(base, f"games/{detail['id']}/rage-timeline.json", timeline)
+        files += 3
+        games += 1
+
+    manifest = {
+        "version": version,
+        "generated_at": datetime.utcnow().isoformat(),
+        "games": games,
+        "files": files,
+        "raw_bytes": raw_bytes,
+        "encodings": ["identity", "gzip"] + (["br"] if brotli is not None else []),
+    }
+    _write(base, "manifest.json", manifest)
+
+    _swap_current(root, version)
+    _prune_versions(root, KEEP_VERSIONS)
+    return manifest
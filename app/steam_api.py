@@ -1,24 +1,26 @@
 import time
-from typing import List, Dict
+from typing import List, Dict, Iterator
 import requests
 
+from . import instrumentation
+
 
 USER_AGENT = "RageQuit.io (local dev)"
 
 
-def fetch_steam_reviews(
+def iter_steam_review_pages(
     app_id: int,
     max_pages: int = 10,
     num_per_page: int = 100,
     filter_type: str = "all"  # "recent" or "all"
-) -> List[Dict]:
+) -> Iterator[List[Dict]]:
     """
-    Fetch Steam reviews for a game using the public store API.
-    No API key required.
+    Yield Steam reviews for a game one API page at a time, using the
+    public store API. No API key required.
     """
     url = f"https://store.steampowered.com/appreviews/{app_id}"
     cursor = "*"
-    collected: List[Dict] = []
+    collected = 0
 
     headers = {"User-Agent": USER_AGENT}
 
@@ -33,7 +35,8 @@ def fetch_steam_reviews(
         }
 
         try:
-            resp = requests.get(url, params=params, headers=headers, timeout=15)
+            with instrumentation.stage("steam.http"):
+                resp = requests.get(url, params=params, headers=headers, timeout=15)
         except requests.RequestException as e:
             print(f"[ERROR] Failed to fetch reviews for app {app_id}: {e}")
             break
@@ -42,7 +45,9 @@ def fetch_steam_reviews(
             print(f"[ERROR] Reviews HTTP {resp.status_code} for app {app_id}")
             break
 
-        data = resp.json()
+        with instrumentation.stage("steam.json") as timer:
+            data = resp.json()
+            timer.rows = len(data.get("reviews") or [])
         if data.get("success") != 1:
             print(f"[WARN] Reviews response not successful for app {app_id}: {data.get('success')}")
             break
@@ -51,15 +56,32 @@ def fetch_steam_reviews(
         if not reviews:
             break
 
-        collected.extend(reviews)
+        collected += len(reviews)
+        yield reviews
         cursor = data.get("cursor")
         if not cursor:
             break
 
-        print(f"[INFO] Page {page+1}: total {len(collected)} reviews for app {app_id}")
-        time.sleep(1.2)
+        print(f"[INFO] Page {page+1}: total {collected} reviews for app {app_id}")
+        with instrumentation.stage("steam.throttle"):
+            time.sleep(1.2)
+
+    print(f"[INFO] Collected {collected} reviews for app {app_id}")
 
-    print(f"[INFO] Collected {len(collected)} reviews for app {app_id}")
+
+def fetch_steam_reviews(
+    app_id: int,
+    max_pages: int = 10,
+    num_per_page: int = 100,
+    filter_type: str = "all"  # "recent" or "all"
+) -> List[Dict]:
+    """
+    Fetch Steam reviews for a game using the public store API.
+    No API key required.
+    """
+    collected: List[Dict] = []
+    for page in iter_steam_review_pages(app_id, max_pages, num_per_page, filter_type):
+        collected.extend(page)
     return collected
 
 
@@ -77,7 +99,8 @@ def fetch_global_achievements(app_id: int) -> List[Dict]:
     headers = {"User-Agent": USER_AGENT}
 
     try:
-        resp = requests.get(url, params=params, headers=headers, timeout=15)
+        with instrumentation.stage("achievements.http"):
+            resp = requests.get(url, params=params, headers=headers, timeout=15)
     except requests.RequestException as e:
         print(f"[ERROR] Failed to fetch achievements for app {app_id}: {e}")
         return []
@@ -86,9 +109,11 @@ def fetch_global_achievements(app_id: int) -> List[Dict]:
         print(f"[ERROR] Achievements HTTP {resp.status_code} for app {app_id}")
         return []
 
-    data = resp.json()
-    ach_root = data.get("achievementpercentages", {})
-    achievements = ach_root.get("achievements", []) or []
+    with instrumentation.stage("achievements.json") as timer:
+        data = resp.json()
+        ach_root = data.get("achievementpercentages", {})
+        achievements = ach_root.get("achievements", []) or []
+        timer.rows = len(achievements)
 
     print(f"[INFO] Collected {len(achievements)} achievements for app {app_id}")
     return achievements
@@ -0,0 +1,59 @@
+import time
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from . import crud
+from .cache import VersionedCache
+from .rollups import WINDOWS
+
+# Popular game details preloaded before the worker reports ready.
+WARM_TOP_GAMES = 50
+
+# Matches the default `limit` of the leaderboard routes.
+WARM_LEADERBOARD_LIMIT = 50
+
+
+def leaderboard_key(name: str, window: str, limit: int):
+    return ("leaderboard", name, window, limit)
+
+
+def game_detail_key(game_id: int, window: str):
+    return ("game", game_id, window)
+
+
+def cached_leaderboard(cache: VersionedCache, db: Session, name: str, limit: int, window: str):
+    fn = crud.LEADERBOARDS[name]
+    return cache.get_or_set(
+        leaderboard_key(name, window, limit),
+        lambda: fn(db, limit=limit, window=window),
+    )
+
+
+def cached_game_detail(cache: VersionedCache, db: Session, game_id: int, window: str):
+    return cache.get_or_set(
+        game_detail_key(game_id, window),
+        lambda: crud.get_game_detail(db, game_id, window=window),
+    )
+
+
+def warm_up(cache: VersionedCache, db: Session, top_games: int = WARM_TOP_GAMES) -> Dict:
+    """Preload every leaderboard/window and the top-N game details into the cache."""
+    started = time.perf_counter()
+
+    leaderboards = 0
+    for window in WINDOWS:
+        for name in crud.LEADERBOARDS:
+            cached_leaderboard(cache, db, name, WARM_LEADERBOARD_LIMIT, window)
+            leaderboards += 1
+
+    top = crud.get_all_games_with_scores(db, limit=top_games)
+    for game in top:
+        for window in WINDOWS:
+            cached_game_detail(cache, db, game["id"], window)
+
+    return {
+        "leaderboards": leaderboards,
+        "games": len(top),
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,295 @@
+import csv
+import json
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, or_, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+# A claimed game belongs to its worker until this long after the last
+# heartbeat; after that any worker may take it over.
+LEASE_DURATION = timedelta(minutes=5)
+
+# How often a worker renews the leases it holds. Well under LEASE_DURATION
+# so one slow or missed beat does not lose the lease.
+HEARTBEAT_SECONDS = 60.0
+
+# Back-off after a failed refresh grows with consecutive failures, capped.
+RETRY_BASE = timedelta(minutes=15)
+RETRY_MAX = timedelta(hours=6)
+
+# Candidates read per claim attempt; losers of a race just try the next one.
+CLAIM_CANDIDATES = 20
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# -------------------------------------------------------------------
+# REGISTRY
+# -------------------------------------------------------------------
+
+
+def read_tracked_games_file(path: str) -> List[Dict]:
+    """
+    Load registry rows from a CSV (steam_app_id,name[,slug] header) or a
+    JSON list of objects with the same keys.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+    return [
+        {
+            "steam_app_id": int(r["steam_app_id"]),
+            "name": r["name"].strip(),
+            "slug": (r.get("slug") or "").strip() or None,
+        }
+        for r in rows
+        if r.get("steam_app_id") and r.get("name")
+    ]
+
+
+def import_tracked_games(db: Session, rows: Iterable[Dict], now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Upsert registry rows and give every new game a work item due now.
+    Re-importing a file is safe; existing schedules are left alone. The
+    caller commits.
+    """
+    now = now or datetime.utcnow()
+    rows = {r["steam_app_id"]: r for r in rows}
+    existing = {
+        g.steam_app_id: g
+        for g in db.query(models.TrackedGame).filter(models.TrackedGame.steam_app_id.in_(list(rows)))
+    } if rows else {}
+    scheduled = {
+        app_id
+        for (app_id,) in db.query(models.IngestWorkItem.steam_app_id).filter(
+            models.IngestWorkItem.steam_app_id.in_(list(rows))
+        )
+    } if rows else set()
+
+    added = updated = 0
+    for app_id, r in rows.items():
+        game = existing.get(app_id)
+        if game is None:
+            db.add(models.TrackedGame(steam_app_id=app_id, name=r["name"], slug=r.get("slug")))
+            added += 1
+        elif (game.name, game.slug, game.active) != (r["name"], r.get("slug"), True):
+            game.name, game.slug, game.active = r["name"], r.get("slug"), True
+            game.updated_at = now
+            updated += 1
+        if app_id not in scheduled:
+            db.add(models.IngestWorkItem(steam_app_id=app_id, next_run_at=now))
+    return {"added": added, "updated": updated, "unchanged": len(rows) - added - updated}
+
+
+def tracked_game_info(game: models.TrackedGame) -> Dict:
+    """The dict shape fetch_steam_data.refresh_game() expects."""
+    info = {"steam_app_id": game.steam_app_id, "name": game.name}
+    if game.slug:
+        info["slug"] = game.slug
+    return info
+
+
+def load_tracked_games(db: Session) -> List[Dict]:
+    games = (
+        db.query(models.TrackedGame)
+        .filter(models.TrackedGame.active.is_(True))
+        .order_by(models.TrackedGame.steam_app_id)
+        .all()
+    )
+    return [tracked_game_info(g) for g in games]
+
+
+# -------------------------------------------------------------------
+# LEASES
+# -------------------------------------------------------------------
+
+
+def _claimable(now: datetime):
+    w = models.IngestWorkItem
+    return (
+        w.next_run_at <= now,
+        or_(w.lease_owner.is_(None), w.lease_expires_at < now),
+    )
+
+
+def claim(db: Session, owner: str, limit: int = 1, now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Lease up to `limit` due games for `owner`, oldest first. Each claim is a
+    conditional UPDATE that only succeeds if the item is still unleased (or
+    its lease expired), so two workers can never both win the same game.
+    Expired leases of crashed workers are picked up here. Commits.
+    """
+    now = now or datetime.utcnow()
+    w = models.IngestWorkItem
+    t = models.TrackedGame
+    candidates = (
+        db.query(w.steam_app_id, w.lease_owner)
+        .join(t, t.steam_app_id == w.steam_app_id)
+        .filter(t.active.is_(True), *_claimable(now))
+        .order_by(w.next_run_at)
+        .limit(max(limit, CLAIM_CANDIDATES))
+        .all()
+    )
+
+    claimed = []
+    for app_id, previous_owner in candidates:
+        result = db.execute(
+            update(w)
+            .where(w.steam_app_id == app_id, *_claimable(now))
+            .values(lease_owner=owner, lease_expires_at=now + LEASE_DURATION, heartbeat_at=now)
+        )
+        db.commit()
+        if result.rowcount != 1:
+            continue  # another worker got there first
+        if previous_owner is not None:
+            print(f"[LEASE] Recovered app {app_id} from expired lease of {previous_owner}")
+        claimed.append(tracked_game_info(db.get(t, app_id)))
+        if len(claimed) == limit:
+            break
+    return claimed
+
+
+def heartbeat(db: Session, owner: str, app_ids: Iterable[int], now: Optional[datetime] = None) -> List[int]:
+    """Extend the leases `owner` still holds; returns the app ids it has lost. Commits."""
+    app_ids = list(app_ids)
+    if not app_ids:
+        return []
+    now = now or datetime.utcnow()
+    w = models.IngestWorkItem
+    db.execute(
+        update(w)
+        .where(w.steam_app_id.in_(app_ids), w.lease_owner == owner)
+        .values(lease_expires_at=now + LEASE_DURATION, heartbeat_at=now)
+    )
+    db.commit()
+    held = {
+        app_id
+        for (app_id,) in db.query(w.steam_app_id).filter(
+            w.steam_app_id.in_(app_ids), w.lease_owner == owner
+        )
+    }
+    return [app_id for app_id in app_ids if app_id not in held]
+
+
+def complete(db: Session, owner: str, app_id: int, next_run_at: datetime, now: Optional[datetime] = None) -> bool:
+    """Release a lease after a successful refresh. False if the lease was lost. Commits."""
+    now = now or datetime.utcnow()
+    w = models.IngestWorkItem
+    result = db.execute(
+        update(w)
+        .where(w.steam_app_id == app_id, w.lease_owner == owner)
+        .values(
+            lease_owner=None,
+            lease_expires_at=None,
+            next_run_at=next_run_at,
+            attempts=0,
+            last_error=None,
+            last_finished_at=now,
+        )
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def fail(db: Session, owner: str, app_id: int, error: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Release a lease after a failed refresh and back off; returns the retry time. Commits."""
+    now = now or datetime.utcnow()
+    w = models.IngestWorkItem
+    item = db.get(w, app_id)
+    if item is None or item.lease_owner != owner:
+        db.rollback()
+        return None
+    retry_at = now + min(RETRY_MAX, RETRY_BASE * (2 ** min(item.attempts, 10)))
+    item.lease_owner = None
+    item.lease_expires_at = None
+    item.next_run_at = retry_at
+    item.attempts += 1
+    item.last_error = error[:500]
+    db.commit()
+    return retry_at
+
+
+def queue_status(db: Session, now: Optional[datetime] = None) -> Dict:
+    now = now or datetime.utcnow()
+    w = models.IngestWorkItem
+    total, due, leased, expired, oldest_due = db.query(
+        func.count(w.steam_app_id),
+        func.sum(case((w.next_run_at <= now, 1), else_=0)),
+        func.sum(case((w.lease_expires_at >= now, 1), else_=0)),
+        func.sum(case((w.lease_expires_at < now, 1), else_=0)),
+        func.min(w.next_run_at),
+    ).one()
+    lag = (now - oldest_due).total_seconds() if oldest_due and oldest_due <= now else 0.0
+    return {
+        "queue_depth": total or 0,
+        "due": due or 0,
+        "leased": leased or 0,
+        "expired_leases": expired or 0,
+        "lag_seconds": lag,
+    }
+
+
+class LeaseHeartbeat:
+    """
+    Background thread renewing this worker's leases every HEARTBEAT_SECONDS
+    while a refresh runs, on its own session. Leases it finds taken over
+    are collected in `lost` so the worker can skip completing them.
+    """
+
+    def __init__(self, owner: str, interval: float = HEARTBEAT_SECONDS):
+        self.owner = owner
+        self.interval = interval
+        self.held: set = set()
+        self.lost: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def hold(self, app_id: int):
+        # A fresh claim: a lease lost on an earlier round no longer applies.
+        with self._lock:
+            self.held.add(app_id)
+            self.lost.discard(app_id)
+
+    def release(self, app_id: int):
+        with self._lock:
+            self.held.discard(app_id)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                app_ids = list(self.held)
+            if not app_ids:
+                continue
+            db = SessionLocal()
+            try:
+                lost = heartbeat(db, self.owner, app_ids)
+            except Exception as e:
+                print(f"[LEASE] Heartbeat failed: {e}")
+                continue
+            finally:
+                db.close()
+            for app_id in lost:
+                print(f"[LEASE] Lost lease on app {app_id}")
+            with self._lock:
+                self.lost.update(lost)
+                self.held.difference_update(lost)
@@ -0,0 +1,27 @@
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app.features import backfill_features
+from app.rollups import invalidate_daily_rollups
+from app.scoring import FEATURES_VERSION
+
+
+def main():
+    ensure_schema()
+    db: Session = SessionLocal()
+    try:
+        counts = backfill_features(db)
+        if any(counts.values()):
+            invalidate_daily_rollups(db)
+            db.commit()
+    finally:
+        db.close()
+    print(
+        f"[FEATURES] Re-extracted {counts['reviews']} reviews and "
+        f"{counts['reddit_posts']} reddit posts (version {FEATURES_VERSION})"
+    )
+
+
+if __name__ == "__main__":
+    main()
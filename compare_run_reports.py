@@ -0,0 +1,38 @@
+import argparse
+import json
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    """Print per-stage time and throughput changes between two run reports."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    print(
+        f"wall {before['wall_seconds']:.1f}s -> {after['wall_seconds']:.1f}s, "
+        f"peak RSS {before['peak_rss_mb']:.0f} -> {after['peak_rss_mb']:.0f} MB"
+    )
+    print(f"{'stage':<24} {'before s':>10} {'after s':>10} {'change':>8} {'rows/s before':>14} {'rows/s after':>13}")
+    for stage in sorted(set(before["stages"]) | set(after["stages"])):
+        b = before["stages"].get(stage, {})
+        a = after["stages"].get(stage, {})
+        b_s, a_s = b.get("seconds", 0.0), a.get("seconds", 0.0)
+        if b_s:
+            change = f"{(a_s - b_s) / b_s * 100:+.0f}%"
+        else:
+            change = "new" if stage not in before["stages"] else "-"
+        print(
+            f"{stage:<24} {b_s:>10.2f} {a_s:>10.2f} {change:>8} "
+            f"{b.get('rows_per_second') or '-':>14} {a.get('rows_per_second') or '-':>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
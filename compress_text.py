@@ -0,0 +1,154 @@
+import argparse
+import os
+import statistics
+import struct
+import time
+from datetime import datetime
+
+from sqlalchemy import func, text, update
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.database import SessionLocal, engine
+from app.migrations import ensure_schema
+from app import models
+from app.compression import (
+    MIN_COMPRESS_CHARS,
+    active_dictionary_id,
+    load_dictionaries,
+    register_dictionary,
+    train_dictionary,
+)
+
+TRAIN_SAMPLE_SIZE = 5000
+BATCH_SIZE = 500
+LATENCY_RUNS = 5
+
+
+def db_size_bytes() -> int:
+    """Size of the configured SQLite file (RAGEQUIT_DATABASE_URL), 0 if none."""
+    path = engine.url.database
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+
+def measure_latency(db: Session) -> dict:
+    """Median wall time (ms) of the text-heavy endpoints, averaged across games."""
+    from app import main
+
+    game_ids = [gid for (gid,) in db.query(models.Game.id)]
+    endpoints = {
+        "/reviews": lambda gid: main.get_game_reviews(gid, limit=100, db=db),
+        "/reddit": lambda gid: main.get_game_reddit(gid, limit=100, db=db),
+        # The route answers from api_cache after the first call; time the
+        # loader it runs on a miss, which is what reads the text.
+        "/rage-words": lambda gid: crud.get_game_rage_words(db, gid, limit=50),
+    }
+    out = {}
+    for name, call in endpoints.items():
+        timings = []
+        for gid in game_ids:
+            for _ in range(LATENCY_RUNS):
+                db.expire_all()
+                start = time.perf_counter()
+                call(gid)
+                timings.append((time.perf_counter() - start) * 1000.0)
+        out[name] = statistics.median(timings) if timings else 0.0
+    return out
+
+
+def train_and_store(db: Session) -> int:
+    samples = [
+        t
+        for (t,) in db.query(models.SteamReviewRaw.review_text)
+        .order_by(func.random())
+        .limit(TRAIN_SAMPLE_SIZE)
+    ]
+    data = train_dictionary(samples)
+    row = models.CompressionDict(
+        data=data, sample_size=len(samples), created_at=datetime.utcnow()
+    )
+    db.add(row)
+    db.commit()
+    register_dictionary(row.id, data, active=True)
+    print(f"[COMPRESS] Trained dictionary {row.id}: {len(data)} bytes from {len(samples)} reviews")
+    return row.id
+
+
+def rewrite_column(db: Session, model, column) -> int:
+    """
+    Re-store values through CompressedText: plain TEXT rows, and blobs
+    compressed without the active dictionary (ingested before it was
+    trained, or under an older one). Bytes 2-3 of a blob are its
+    dictionary id.
+    """
+    name = column.key
+    table = model.__tablename__
+    active = struct.pack(">H", active_dictionary_id())
+    rewritten = 0
+    last_id = 0
+    while True:
+        ids = [
+            row[0]
+            for row in db.execute(
+                text(
+                    f"SELECT id FROM {table} WHERE id > :last AND ("
+                    f"(typeof({name}) = 'text' AND length({name}) >= :min) OR "
+                    f"(typeof({name}) = 'blob' AND substr({name}, 2, 2) != :dict)"
+                    f") ORDER BY id LIMIT :n"
+                ),
+                {"last": last_id, "min": MIN_COMPRESS_CHARS, "dict": active, "n": BATCH_SIZE},
+            )
+        ]
+        if not ids:
+            break
+        rows = db.query(model.id, column).filter(model.id.in_(ids)).all()
+        db.execute(update(model), [{"id": rid, name: value} for rid, value in rows])
+        db.commit()
+        last_id = ids[-1]
+        rewritten += len(ids)
+    return rewritten
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress stored review and post bodies.")
+    parser.add_argument("--retrain", action="store_true", help="train a new dictionary even if one exists")
+    args = parser.parse_args()
+
+    ensure_schema()
+    load_dictionaries()
+    db: Session = SessionLocal()
+
+    try:
+        size_before = db_size_bytes()
+        latency_before = measure_latency(db)
+
+        has_dict = db.query(models.CompressionDict.id).first() is not None
+        if args.retrain or not has_dict:
+            train_and_store(db)
+
+        reviews = rewrite_column(db, models.SteamReviewRaw, models.SteamReviewRaw.review_text)
+        posts = rewrite_column(db, models.RedditPostRaw, models.RedditPostRaw.body)
+        print(f"[COMPRESS] Compressed {reviews} reviews and {posts} reddit posts")
+    finally:
+        db.close()
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+
+    db = SessionLocal()
+    try:
+        size_after = db_size_bytes()
+        latency_after = measure_latency(db)
+    finally:
+        db.close()
+
+    print("\n=== Compression report ===")
+    print(f"DB size: {size_before / 1e6:.2f} MB -> {size_after / 1e6:.2f} MB")
+    for name in latency_before:
+        print(
+            f"{name:12s} median {latency_before[name]:.2f} ms -> {latency_after[name]:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
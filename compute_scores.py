@@ -1,81 +1,203 @@
+from typing import Dict, Iterable
+
 from sqlalchemy.orm import Session
 
-from app.database import SessionLocal, engine, Base
-from app import models
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app import instrumentation, models
+from app.app_state import SCORING_VERSION_KEY, bump_data_version, set_state
+from app.columnar import SNAPSHOT_ROOT, write_snapshot
+from app.features import backfill_features
+from app.rollups import WINDOWS, rebuild_daily_rollups, refresh_daily_rollups, window_totals
+from app.score_stream import (
+    SCORE_COLUMNS,
+    prune_score_changes,
+    record_score_change,
+    score_changed,
+)
+from app.similarity import rebuild_similar_games
+from app.reweight import INPUT_COLUMNS, record_inputs_rule
 from app.scoring import (
-    score_reviews_for_game,
+    DEFAULT_SCORING,
+    score_feature_totals,
     score_achievements_for_game,
     combine_rage_scores,
 )
+from app.scoring_config import current_config
 from datetime import datetime
 
 
-def compute_all_scores():
-    Base.metadata.create_all(bind=engine)
-    db: Session = SessionLocal()
+def compute_game_score(
+    db: Session, game_id: int, totals: Dict[str, Dict[str, int]], config: Dict = DEFAULT_SCORING
+):
+    """
+    Recompute and stage the GameRageScore row, the per-window
+    GameWindowScore rows and their GameScoreInput totals for a single game.
+
+    totals: window name -> feature sums for that window (see rollups.window_totals)
+    """
+    achievements = [
+        {
+            "api_name": api_name,
+            "display_name": display_name,
+            "percent": percent,
+        }
+        for api_name, display_name, percent in db.query(
+            models.SteamAchievementRaw.api_name,
+            models.SteamAchievementRaw.display_name,
+            models.SteamAchievementRaw.percent,
+        ).filter(models.SteamAchievementRaw.game_id == game_id)
+    ]
+    ach_scores = score_achievements_for_game(achievements, config)
+    now = datetime.utcnow()
+
+    ws = models.GameWindowScore
+    previous = {
+        window: tuple(values)
+        for window, *values in db.query(
+            ws.window, *[getattr(ws, col) for col in SCORE_COLUMNS]
+        ).filter(ws.game_id == game_id)
+    }
 
-    games = db.query(models.Game).all()
-    for game in games:
-       # Steam reviews
-        reviews = [
-            {
-                "is_positive": r.is_positive,
-                "review_text": r.review_text,
-            }
-            for r in game.reviews
-        ]
-
-        # Reddit posts – treat as negative-leaning feedback because they came from rage-focused search
-        reddit_posts = (
-            db.query(models.RedditPostRaw)
-            .filter(models.RedditPostRaw.game_id == game.id)
-            .all()
+    # Steam reviews + Reddit posts, aggregated from the daily rollups
+    for window in WINDOWS:
+        window_sums = totals.get(window, {})
+        scores = combine_rage_scores(score_feature_totals(window_sums, config), ach_scores, config)
+        db.merge(
+            models.GameScoreInput(
+                game_id=game_id,
+                window=window,
+                **{c: window_sums.get(c) or 0 for c in INPUT_COLUMNS},
+                max_achievement_drop=ach_scores["max_achievement_drop"],
+                updated_at=now,
+            )
         )
-        for p in reddit_posts:
-            text = (p.title or "") + "\n" + (p.body or "")
-            reviews.append(
-                {
-                    "is_positive": False,
-                    "review_text": text,
-                }
+        db.merge(
+            models.GameWindowScore(
+                game_id=game_id,
+                window=window,
+                rage_score=scores["rage_score"],
+                difficulty_rage=scores["difficulty_rage"],
+                technical_rage=scores["technical_rage"],
+                social_toxicity_rage=scores["social_toxicity_rage"],
+                ui_design_rage=scores["ui_design_rage"],
+                review_count=window_sums.get("rows") or 0,
+                last_computed_at=now,
             )
-        achievements = [
-            {
-                "api_name": a.api_name,
-                "display_name": a.display_name,
-                "percent": a.percent,
-            }
-            for a in game.achievements
-        ]
-
-        review_scores = score_reviews_for_game(reviews)
-        ach_scores = score_achievements_for_game(achievements)
-        combined = combine_rage_scores(review_scores, ach_scores)
-
-        existing = (
-            db.query(models.GameRageScore)
-            .filter(models.GameRageScore.game_id == game.id)
-            .first()
         )
+        # Logged for the API's /stream subscribers
+        if score_changed(previous.get(window), scores):
+            record_score_change(db, game_id, window, scores, now)
+        if window == "all":
+            combined = scores
+
+    existing = (
+        db.query(models.GameRageScore)
+        .filter(models.GameRageScore.game_id == game_id)
+        .first()
+    )
+
+    if not existing:
+        existing = models.GameRageScore(game_id=game_id)
+
+    existing.rage_score = combined["rage_score"]
+    existing.difficulty_rage = combined["difficulty_rage"]
+    existing.technical_rage = combined["technical_rage"]
+    existing.social_toxicity_rage = combined["social_toxicity_rage"]
+    existing.ui_design_rage = combined["ui_design_rage"]
+    existing.max_achievement_drop = combined["max_achievement_drop"]
+    existing.max_drop_from = combined["max_drop_from"]
+    existing.max_drop_to = combined["max_drop_to"]
+    existing.max_drop_achievement = combined["max_drop_achievement"]
+    existing.last_computed_at = now
+
+    db.merge(existing)
+    # Flush and drop this game's objects so the identity map stays small.
+    db.flush()
+    db.expunge_all()
 
-        if not existing:
-            existing = models.GameRageScore(game_id=game.id)
 
-        existing.rage_score = combined["rage_score"]
-        existing.difficulty_rage = combined["difficulty_rage"]
-        existing.technical_rage = combined["technical_rage"]
-        existing.social_toxicity_rage = combined["social_toxicity_rage"]
-        existing.ui_design_rage = combined["ui_design_rage"]
-        existing.max_achievement_drop = combined["max_achievement_drop"]
-        existing.max_drop_from = combined["max_drop_from"]
-        existing.max_drop_to = combined["max_drop_to"]
-        existing.max_drop_achievement = combined["max_drop_achievement"]
-        existing.last_computed_at = datetime.utcnow()
+def _score_games(
+    db: Session, games, totals: Dict[str, Dict[int, Dict[str, int]]], config: Dict, all_games: bool = False
+):
+    for game_id, name in games:
+        with instrumentation.game(name), instrumentation.stage("scoring.game", rows=1):
+            compute_game_score(
+                db, game_id, {w: t.get(game_id, {}) for w, t in totals.items()}, config
+            )
+    set_state(db, SCORING_VERSION_KEY, config["version"])
+    record_inputs_rule(db, config, all_games)
+
+
+def compute_scores_for_games(db: Session, game_ids: Iterable[int]):
+    """Recompute scores for just the given games and commit."""
+    game_ids = list(game_ids)
+    if not game_ids:
+        return
+    with instrumentation.stage("scoring.backfill") as timer:
+        timer.rows = sum(backfill_features(db, game_ids=game_ids).values())
+    # One config for the whole run: it decides both the rollups' duplicate
+    # rule and the weights.
+    config = current_config()
+    with instrumentation.stage("scoring.rollups"):
+        if timer.rows:
+            # Rows the rollups already summed got new features.
+            rebuild_daily_rollups(db, game_ids, config)
+        refresh_daily_rollups(db, config)
+    with instrumentation.stage("scoring.window_totals"):
+        totals = {w: window_totals(db, w, game_ids) for w in WINDOWS}
+    known = db.query(models.Game.id, models.Game.name).filter(models.Game.id.in_(game_ids)).all()
+    _score_games(db, known, totals, config)
+    with instrumentation.stage("scoring.commit", rows=len(known)):
+        prune_score_changes(db)
+        bump_data_version(db)
+        db.commit()
+    print(f"[SCORE] Computed rage scores for {len(known)} games.")
 
-        db.merge(existing)
 
-    db.commit()
-    db.close()
+def compute_all_scores():
+    ensure_schema()
+    instrumentation.start_run("compute_scores")
+    db: Session = SessionLocal()
+
+    try:
+        with instrumentation.stage("scoring.backfill") as timer:
+            backfilled = backfill_features(db)
+            timer.rows = sum(backfilled.values())
+        if any(backfilled.values()):
+            print(f"[FEATURES] Backfilled {backfilled}")
+
+        config = current_config()
+        with instrumentation.stage("scoring.rollups"):
+            if any(backfilled.values()):
+                rebuild_daily_rollups(db, config=config)
+            else:
+                refresh_daily_rollups(db, config)
+        with instrumentation.stage("scoring.window_totals"):
+            totals = {w: window_totals(db, w) for w in WINDOWS}
+        games = db.query(models.Game.id, models.Game.name).all()
+        _score_games(db, games, totals, config, all_games=True)
+
+        with instrumentation.stage("scoring.similar") as timer:
+            similar = rebuild_similar_games(db)
+            timer.rows = similar["games"]
+        print(f"[SIMILAR] Stored {similar['pairs']} neighbour pairs for {similar['games']} games")
+
+        with instrumentation.stage("scoring.commit", rows=len(games)):
+            prune_score_changes(db)
+            bump_data_version(db)
+            db.commit()
+
+        with instrumentation.stage("scoring.snapshot") as timer:
+            snapshot = write_snapshot(db, config=config)
+            timer.rows = snapshot["rows"]
+        print(
+            f"[SNAPSHOT] Wrote {snapshot['rows']} review rows for {snapshot['games']} games "
+            f"to {SNAPSHOT_ROOT}/versions/{snapshot['version']}"
+        )
+    finally:
+        db.close()
+        instrumentation.finish_run()
     print("Computed rage scores for all games.")
 
 
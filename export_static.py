@@ -0,0 +1,20 @@
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.static_export import EXPORT_ROOT, export_static_bundle
+
+
+def main():
+    db: Session = SessionLocal()
+    try:
+        manifest = export_static_bundle(db)
+    finally:
+        db.close()
+    print(
+        f"[EXPORT] Wrote {manifest['files']} files for {manifest['games']} games "
+        f"to {EXPORT_ROOT}/versions/{manifest['version']} ({', '.join(manifest['encodings'])})"
+    )
+
+
+if __name__ == "__main__":
+    main()
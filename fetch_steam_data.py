@@ -1,16 +1,23 @@
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 from datetime import datetime, timezone
 
 from sqlalchemy.orm import Session
 
-from app.database import Base, engine, SessionLocal
-from app import models
-from app.models import RedditPostRaw
-from app.steam_api import fetch_steam_reviews, fetch_global_achievements
-from app.reddit_api import fetch_reddit_posts_for_game
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app import instrumentation, models
+from app.batch_writer import BatchWriter
+from app.features import review_features, reddit_features, reddit_post_text
+from app.retention import get_watermark
+from app.steam_api import iter_steam_review_pages, fetch_global_achievements
+from app.reddit_api import iter_reddit_post_pages
+from app.work_queue import load_tracked_games
 
 
-# 🔥 Games we track – add more Steam app IDs here
+# 🔥 Default games to track. Larger catalogues go in the tracked_games
+# registry (import_tracked_games.py) and are split across ingest_worker.py
+# processes.
 GAMES_TO_TRACK: List[Dict] = [
     {
         "steam_app_id": 1245620,
@@ -40,6 +47,11 @@ GAMES_TO_TRACK: List[Dict] = [
 ]
 
 
+# Games fetched at once. Each producer paces its own API requests; all of
+# them feed the one BatchWriter, so this only overlaps network waits.
+INGEST_PRODUCERS = 2
+
+
 def slugify(name: str) -> str:
     """Very simple slugify helper."""
     import re
@@ -86,185 +98,207 @@ def upsert_game(db: Session, info: Dict) -> models.Game:
     return game
 
 
-def ingest_reviews_for_game(db: Session, game: models.Game, app_id: int):
-    """Fetch Steam reviews and store them, skipping duplicates."""
-    reviews = fetch_steam_reviews(
+def _already_archived(created: Optional[datetime], watermark: Optional[datetime]) -> bool:
+    """Rows older than the retention watermark were archived; don't re-insert them."""
+    if created is None or watermark is None:
+        return False
+    return created.replace(tzinfo=None) < watermark
+
+
+def ingest_reviews_for_game(db: Session, writer: BatchWriter, game: models.Game, app_id: int):
+    """Fetch Steam reviews page by page and hand them to the writer."""
+    queued = 0
+    skipped = 0
+    watermark = get_watermark(db, game.id, "steam")
+
+    for page in iter_steam_review_pages(
         app_id,
         max_pages=15,
         num_per_page=100,
         filter_type="all",
-    )
-
-    new_rows = 0
-    skipped = 0
-
-    for r in reviews:
-        review_id = str(r.get("recommendationid"))
-        if not review_id:
-            continue
-
-        # Check for duplicates
-        exists = (
-            db.query(models.SteamReviewRaw)
-            .filter(
-                models.SteamReviewRaw.game_id == game.id,
-                models.SteamReviewRaw.steam_review_id == review_id,
-            )
-            .first()
-        )
-
-        if exists:
-            skipped += 1
-            continue
-
-        # Extract fields
-        review_text = r.get("review", "") or ""
-        is_positive = bool(r.get("voted_up", False))
-        language = r.get("language") or None
-        ts = r.get("timestamp_created")
-
-        if isinstance(ts, (int, float)):
-            created_at_steam = datetime.fromtimestamp(ts, tz=timezone.utc)
-        else:
-            created_at_steam = None
-
-        # Insert row safely (no batching)
-        row = models.SteamReviewRaw(
-            game_id=game.id,
-            steam_review_id=review_id,
-            is_positive=is_positive,
-            language=language,
-            review_text=review_text,
-            created_at_steam=created_at_steam,
-        )
-
-        db.add(row)
-        db.flush()   # ← THIS IS THE IMPORTANT FIX
-        new_rows += 1
+    ):
+        records = []
+        for r in page:
+            review_id = str(r.get("recommendationid"))
+            if not review_id:
+                continue
+
+            # Extract fields
+            review_text = r.get("review", "") or ""
+            is_positive = bool(r.get("voted_up", False))
+            language = r.get("language") or None
+            ts = r.get("timestamp_created")
+
+            if isinstance(ts, (int, float)):
+                created_at_steam = datetime.fromtimestamp(ts, tz=timezone.utc)
+            else:
+                created_at_steam = None
+
+            if _already_archived(created_at_steam, watermark):
+                skipped += 1
+                continue
+
+            records.append({
+                "game_id": game.id,
+                "steam_review_id": review_id,
+                "is_positive": is_positive,
+                "language": language,
+                "review_text": review_text,
+                "created_at_steam": created_at_steam,
+            })
+
+        # One timed stage per page; per-row timers cost more than the work.
+        with instrumentation.stage("reviews.features", rows=len(records)):
+            for record in records:
+                record.update(review_features(record["review_text"], record["is_positive"]))
+
+        # Duplicates are dropped by the writer, one query per group.
+        for record in records:
+            writer.put("review", record)
+        queued += len(records)
 
-    db.commit()
     print(
-        f"[DB] Stored {new_rows} new reviews, skipped {skipped} duplicates for {game.name}"
+        f"[DB] Queued {queued} reviews, skipped {skipped} archived for {game.name}"
     )
 
 
 
-def ingest_achievements_for_game(db: Session, game: models.Game, app_id: int):
-    """Fetch global achievement percentages and store/update them."""
+def ingest_achievements_for_game(writer: BatchWriter, game: models.Game, app_id: int):
+    """Fetch global achievement percentages and queue them for upsert."""
     achievements = fetch_global_achievements(app_id)
 
-    updated = 0
-    inserted = 0
-
+    queued = 0
     for a in achievements:
         api_name = a.get("name")
         if not api_name:
             continue
 
-        percent = float(a.get("percent", 0.0))
-
-        existing = (
-            db.query(models.SteamAchievementRaw)
-            .filter(
-                models.SteamAchievementRaw.game_id == game.id,
-                models.SteamAchievementRaw.api_name == api_name,
-            )
-            .first()
+        writer.put(
+            "achievement",
+            {
+                "game_id": game.id,
+                "api_name": api_name,
+                "display_name": api_name,
+                "description": None,
+                "percent": float(a.get("percent", 0.0)),
+            },
         )
+        queued += 1
+
+    print(f"[DB] Queued {queued} achievements for {game.name}")
 
-        if existing:
-            existing.percent = percent
-            existing.ingested_at = datetime.now(timezone.utc)
-            updated += 1
-        else:
-            row = models.SteamAchievementRaw(
-                game_id=game.id,
-                api_name=api_name,
-                display_name=api_name,
-                description=None,
-                percent=percent,
-            )
-            db.add(row)
-            inserted += 1
-
-    db.commit()
-    print(
-        f"[DB] Achievements for {game.name}: inserted {inserted}, updated {updated}"
-    )
 
+def ingest_reddit_for_game(db: Session, writer: BatchWriter, game: models.Game):
+    """Fetch Reddit posts about this game page by page and hand them to the writer."""
+    queued = 0
+    skipped = 0
+    watermark = get_watermark(db, game.id, "reddit")
 
-def ingest_reddit_for_game(db: Session, game: models.Game):
-    """Fetch Reddit posts about this game and store them."""
-    posts = fetch_reddit_posts_for_game(
+    for page in iter_reddit_post_pages(
         game.name,
         max_pages=3,
         posts_per_page=25,
-    )
+    ):
+        records = []
+        for p in page:
+            reddit_id = p.get("id")
+            if not reddit_id:
+                continue
+
+            title = p.get("title") or ""
+            body = p.get("selftext") or ""
+            created_utc = p.get("created_utc")
+
+            if isinstance(created_utc, (int, float)):
+                created = datetime.fromtimestamp(created_utc, tz=timezone.utc)
+            else:
+                created = None
+
+            if _already_archived(created, watermark):
+                skipped += 1
+                continue
+
+            records.append({
+                "game_id": game.id,
+                "reddit_id": reddit_id,
+                "title": title,
+                "body": body,
+                "upvotes": p.get("score"),
+                "num_comments": p.get("num_comments"),
+                "created_utc": created,
+                "text": reddit_post_text(title, body),
+            })
+
+        with instrumentation.stage("reddit.features", rows=len(records)):
+            for record in records:
+                record.update(reddit_features(record["title"], record["body"]))
+
+        for record in records:
+            writer.put("reddit", record)
+        queued += len(records)
 
-    new_rows = 0
-    skipped = 0
+    print(
+        f"[DB] Queued {queued} reddit posts, skipped {skipped} archived for {game.name}"
+    )
 
-    for p in posts:
-        reddit_id = p.get("id")
-        if not reddit_id:
-            continue
 
-        existing = (
-            db.query(RedditPostRaw)
-            .filter(RedditPostRaw.reddit_id == reddit_id)
-            .first()
-        )
-        if existing:
-            skipped += 1
-            continue
+def refresh_game(db: Session, writer: BatchWriter, info: Dict) -> models.Game:
+    """
+    Upsert one tracked game and queue its reviews, achievements and Reddit
+    posts. Rows are committed by the writer; call writer.flush() before
+    reading them back.
+    """
+    app_id = info["steam_app_id"]
+    with instrumentation.game(info["name"]):
+        # The one write not routed through the writer: every queued record
+        # needs game.id, so this must land first, and it only commits when
+        # the game is new or renamed.
+        game = upsert_game(db, info)
+        print(f"[INFO] Ingesting Steam data for {game.name} (app_id={app_id})")
+
+        ingest_reviews_for_game(db, writer, game, app_id)
+        ingest_achievements_for_game(writer, game, app_id)
+        ingest_reddit_for_game(db, writer, game)
+    return game
 
-        title = p.get("title") or ""
-        body = p.get("selftext") or ""
-        upvotes = p.get("score")
-        num_comments = p.get("num_comments")
-        created_utc = p.get("created_utc")
-
-        if isinstance(created_utc, (int, float)):
-            created = datetime.fromtimestamp(created_utc, tz=timezone.utc)
-        else:
-            created = None
-
-        row = RedditPostRaw(
-            game_id=game.id,
-            reddit_id=reddit_id,
-            title=title,
-            body=body,
-            upvotes=upvotes,
-            num_comments=num_comments,
-            created_utc=created,
-        )
-        db.add(row)
-        new_rows += 1
 
-    db.commit()
-    print(
-        f"[DB] Stored {new_rows} new reddit posts, skipped {skipped} duplicates for {game.name}"
-    )
+def tracked_games() -> List[Dict]:
+    """The tracked_games registry, or GAMES_TO_TRACK until one is imported."""
+    db: Session = SessionLocal()
+    try:
+        return load_tracked_games(db) or GAMES_TO_TRACK
+    finally:
+        db.close()
 
 
-def main():
-    Base.metadata.create_all(bind=engine)
+def _produce(writer: BatchWriter, info: Dict):
     db: Session = SessionLocal()
-
     try:
-        for info in GAMES_TO_TRACK:
-            app_id = info["steam_app_id"]
-            game = upsert_game(db, info)
-            print(f"[INFO] Ingesting Steam data for {game.name} (app_id={app_id})")
+        refresh_game(db, writer, info)
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Ingest failed for {info['name']}: {e}")
+    finally:
+        db.close()
+
 
-            ingest_reviews_for_game(db, game, app_id)
-            ingest_achievements_for_game(db, game, app_id)
-            ingest_reddit_for_game(db, game)
+def main():
+    ensure_schema()
+    instrumentation.start_run("fetch_steam_data")
+    games = tracked_games()
+    writer = BatchWriter()
 
+    try:
+        with ThreadPoolExecutor(max_workers=INGEST_PRODUCERS) as pool:
+            list(pool.map(lambda info: _produce(writer, info), games))
     finally:
-        db.close()
-        print("[DONE] Steam + Reddit ingestion finished.")
-        
+        # The run report is written even when close() re-raises a failed group.
+        try:
+            writer.close()
+            print("[DONE] Steam + Reddit ingestion finished.")
+        finally:
+            instrumentation.finish_run()
+
 
 if __name__ == "__main__":
     main()
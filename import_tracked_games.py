@@ -0,0 +1,35 @@
+import argparse
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app.work_queue import import_tracked_games, read_tracked_games_file
+from fetch_steam_data import GAMES_TO_TRACK
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load games into the tracked_games registry.")
+    parser.add_argument(
+        "path",
+        nargs="?",
+        help="CSV (steam_app_id,name[,slug]) or JSON list; omit to seed GAMES_TO_TRACK",
+    )
+    args = parser.parse_args()
+
+    ensure_schema()
+    rows = read_tracked_games_file(args.path) if args.path else GAMES_TO_TRACK
+    db: Session = SessionLocal()
+    try:
+        counts = import_tracked_games(db, rows)
+        db.commit()
+    finally:
+        db.close()
+    print(
+        f"[REGISTRY] {counts['added']} added, {counts['updated']} updated, "
+        f"{counts['unchanged']} unchanged"
+    )
+
+
+if __name__ == "__main__":
+    main()
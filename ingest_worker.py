@@ -0,0 +1,117 @@
+import argparse
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app import instrumentation
+from app.batch_writer import BatchWriteError, BatchWriter
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app.scheduler import review_velocity, next_refresh_interval
+from app.work_queue import (
+    LeaseHeartbeat,
+    claim,
+    complete,
+    fail,
+    queue_status,
+    worker_id,
+)
+from compute_scores import compute_scores_for_games
+from fetch_steam_data import refresh_game
+
+# Games leased per round; they are refreshed and scored together.
+WORKER_BATCH = 5
+
+# Sleep between polls when nothing is due.
+POLL_SECONDS = 30.0
+
+
+def run_round(owner: str, lease: LeaseHeartbeat, batch_size: int = WORKER_BATCH) -> int:
+    """Claim, refresh, reschedule and score one batch of due games."""
+    db: Session = SessionLocal()
+    try:
+        claimed = claim(db, owner, limit=batch_size)
+        if not claimed:
+            return 0
+        for info in claimed:
+            lease.hold(info["steam_app_id"])
+
+        writer = BatchWriter()
+        refreshed = []
+        for info in claimed:
+            app_id = info["steam_app_id"]
+            if app_id in lease.lost:
+                lease.release(app_id)
+                continue
+            try:
+                game = refresh_game(db, writer, info)
+            except Exception as e:
+                db.rollback()
+                lease.release(app_id)
+                retry_at = fail(db, owner, app_id, str(e))
+                print(f"[ERROR] Refresh failed for {info['name']}: {e}; retry at {retry_at}")
+                continue
+            refreshed.append((info, game.id, game.name))
+            db.expunge_all()
+
+        try:
+            writer.close()
+        except BatchWriteError as e:
+            for info, _, _ in refreshed:
+                lease.release(info["steam_app_id"])
+                fail(db, owner, info["steam_app_id"], str(e))
+            print(f"[ERROR] {e}; released {len(refreshed)} leases for retry")
+            return 0
+
+        scored = []
+        for info, game_id, name in refreshed:
+            app_id = info["steam_app_id"]
+            lease.release(app_id)
+            velocity = review_velocity(db, game_id, datetime.utcnow())
+            interval = next_refresh_interval(velocity)
+            if not complete(db, owner, app_id, datetime.utcnow() + interval):
+                print(f"[LEASE] {name}: lease lost before completion; another worker owns it")
+            print(f"[SCHED] {name}: {velocity:.2f} reviews/h, next refresh in {interval}")
+            scored.append(game_id)
+
+        compute_scores_for_games(db, scored)
+        return len(refreshed)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lease due games from ingest_work and refresh them.")
+    parser.add_argument("--batch", type=int, default=WORKER_BATCH, help="games leased per round")
+    parser.add_argument("--once", action="store_true", help="run a single round and exit")
+    args = parser.parse_args()
+
+    ensure_schema()
+    owner = worker_id()
+    print(f"[WORKER] {owner} started")
+
+    with LeaseHeartbeat(owner) as lease:
+        while True:
+            instrumentation.start_run("ingest_worker")
+            try:
+                done = run_round(owner, lease, args.batch)
+            finally:
+                instrumentation.finish_run()
+            if args.once:
+                break
+            if not done:
+                db: Session = SessionLocal()
+                try:
+                    status = queue_status(db)
+                finally:
+                    db.close()
+                print(
+                    f"[WORKER] idle: queue_depth={status['queue_depth']} due={status['due']} "
+                    f"leased={status['leased']} lag={status['lag_seconds']:.0f}s"
+                )
+                time.sleep(POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
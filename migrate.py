@@ -0,0 +1,11 @@
+from app.migrations import ensure_schema
+
+
+def main():
+    """Create missing tables, columns and indexes. Run before starting the API."""
+    ensure_schema()
+    print("[MIGRATE] Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app import models
+from app.crud import STREAM_CHUNK_SIZE
+from app.features import reddit_post_text
+from app.near_duplicates import SOURCES, assign_near_duplicates
+from app.rollups import rebuild_daily_rollups
+
+
+def _text(source: str, row) -> str:
+    if source == "steam":
+        return row.review_text or ""
+    return reddit_post_text(row.title, row.body)
+
+
+def main():
+    """Re-run near-duplicate detection over every stored review and post, oldest first."""
+    ensure_schema()
+    db: Session = SessionLocal()
+    try:
+        db.query(models.MinHashBand).delete()
+        db.query(models.MinHashSignature).delete()
+        totals = {}
+        for source, model in SOURCES.items():
+            db.execute(update(model).values(dup_of=None))
+            columns = [model.id, model.game_id] + (
+                [model.review_text] if source == "steam" else [model.title, model.body]
+            )
+            rows = scanned = 0
+            last_id = 0
+            while True:
+                batch = (
+                    db.query(*columns)
+                    .filter(model.id > last_id)
+                    .order_by(model.id)
+                    .limit(STREAM_CHUNK_SIZE)
+                    .all()
+                )
+                if not batch:
+                    break
+                by_game = {}
+                for row in batch:
+                    by_game.setdefault(row.game_id, []).append((row.id, _text(source, row)))
+                for game_id, items in by_game.items():
+                    rows += len(assign_near_duplicates(db, source, game_id, items))
+                scanned += len(batch)
+                last_id = batch[-1].id
+            totals[source] = (scanned, rows)
+
+        rebuild_daily_rollups(db)
+        db.commit()
+    finally:
+        db.close()
+    for source, (scanned, rows) in totals.items():
+        print(f"[DEDUP] {source}: {rows} of {scanned} rows flagged as near-duplicates")
+    print("[DEDUP] Daily rollups rebuilt; run compute_scores.py to rescore")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app import models
+from app.crud import STREAM_CHUNK_SIZE
+from app.features import reddit_post_text
+from app.heavy_hitters import feed_word_sketches
+
+
+def main():
+    """Rebuild the global/weekly word sketches from every stored review and post."""
+    ensure_schema()
+    db: Session = SessionLocal()
+    try:
+        db.query(models.WordSketch).delete()
+
+        batch = []
+        rows = 0
+        reviews = db.query(
+            models.SteamReviewRaw.created_at_steam,
+            models.SteamReviewRaw.review_text,
+        ).filter(models.SteamReviewRaw.dup_of.is_(None)).execution_options(yield_per=STREAM_CHUNK_SIZE)
+        posts = db.query(
+            models.RedditPostRaw.created_utc,
+            models.RedditPostRaw.title,
+            models.RedditPostRaw.body,
+        ).filter(models.RedditPostRaw.dup_of.is_(None)).execution_options(yield_per=STREAM_CHUNK_SIZE)
+
+        texts = [((c, t or "") for c, t in reviews), ((c, reddit_post_text(t, b)) for c, t, b in posts)]
+        for stream in texts:
+            for item in stream:
+                batch.append(item)
+                if len(batch) >= STREAM_CHUNK_SIZE:
+                    feed_word_sketches(db, batch)
+                    rows += len(batch)
+                    batch = []
+        feed_word_sketches(db, batch)
+        rows += len(batch)
+        db.commit()
+    finally:
+        db.close()
+    print(f"[SKETCH] Rebuilt word sketches from {rows} reviews and posts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app.app_state import bump_data_version
+from app.batch_writer import BatchWriteError, BatchWriter
+from app.columnar import write_snapshot
+from app.similarity import rebuild_similar_games
+from app.scheduler import (
+    RefreshScheduler,
+    review_velocity,
+    next_refresh_interval,
+)
+from app.work_queue import LeaseHeartbeat, queue_status, worker_id
+from compute_scores import compute_scores_for_games
+from export_static import main as export_static
+from fetch_steam_data import GAMES_TO_TRACK, refresh_game
+from ingest_worker import run_round
+
+# Max games refreshed per loop iteration before scoring runs.
+BATCH_SIZE = 5
+
+# Longest we sleep between checks of the queue.
+POLL_SECONDS = 30.0
+
+# Back-off after a failed refresh.
+RETRY_DELAY = timedelta(minutes=15)
+
+# Minimum gap between static bundle exports (and the columnar snapshot
+# and similar-games rebuilds that ride along).
+EXPORT_INTERVAL = timedelta(minutes=10)
+
+# Queue depth / lag snapshot, rewritten after every loop iteration.
+STATUS_PATH = "refresh_status.json"
+
+
+def write_status(status: dict):
+    tmp = STATUS_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(status, f)
+    os.replace(tmp, STATUS_PATH)
+
+
+def run_batch(scheduler: RefreshScheduler, batch: list) -> list:
+    """Refresh a batch of games, reschedule them and score just those games."""
+    db: Session = SessionLocal()
+    writer = BatchWriter()
+    refreshed = []
+    try:
+        for info in batch:
+            try:
+                game = refresh_game(db, writer, info)
+            except Exception as e:
+                db.rollback()
+                print(f"[ERROR] Refresh failed for {info['name']}: {e}")
+                scheduler.schedule(info, datetime.utcnow() + RETRY_DELAY)
+                continue
+            refreshed.append((info, game.id, game.name))
+            db.expunge_all()
+
+        try:
+            writer.close()
+        except BatchWriteError as e:
+            print(f"[ERROR] {e}; retrying the batch later")
+            for info, _, _ in refreshed:
+                scheduler.schedule(info, datetime.utcnow() + RETRY_DELAY)
+            return []
+
+        for info, game_id, name in refreshed:
+            velocity = review_velocity(db, game_id, datetime.utcnow())
+            interval = next_refresh_interval(velocity)
+            scheduler.schedule(info, datetime.utcnow() + interval)
+            print(
+                f"[SCHED] {name}: {velocity:.2f} reviews/h, "
+                f"next refresh in {interval}"
+            )
+
+        refreshed_ids = [game_id for _, game_id, _ in refreshed]
+        compute_scores_for_games(db, refreshed_ids)
+    finally:
+        db.close()
+    return refreshed_ids
+
+
+def registry_in_use() -> bool:
+    """
+    True once import_tracked_games.py has loaded games. From then on the
+    daemon leases work from ingest_work like ingest_worker.py does, so the
+    two can run side by side and games imported later get picked up.
+    """
+    db: Session = SessionLocal()
+    try:
+        t = models.TrackedGame
+        return db.query(t.steam_app_id).filter(t.active.is_(True)).first() is not None
+    finally:
+        db.close()
+
+
+def queue_round(owner: str, lease: LeaseHeartbeat):
+    """One leased batch from ingest_work; returns (games attempted, games refreshed, status)."""
+    refreshed = run_round(owner, lease, BATCH_SIZE)
+    db: Session = SessionLocal()
+    try:
+        status = queue_status(db)
+    finally:
+        db.close()
+    return refreshed, refreshed, status
+
+
+def scheduler_round(scheduler: RefreshScheduler):
+    """One batch from the in-memory schedule; returns (games attempted, games refreshed, status)."""
+    now = datetime.utcnow()
+    status = scheduler.status(now)
+    batch = scheduler.pop_due(now, limit=BATCH_SIZE)
+    if not batch:
+        return 0, 0, status
+    print(
+        f"[SCHED] queue_depth={status['queue_depth']} due={status['due']} "
+        f"lag={status['lag_seconds']:.0f}s refreshing {len(batch)} games"
+    )
+    refreshed = run_batch(scheduler, batch)
+    return len(batch), len(refreshed), scheduler.status(datetime.utcnow())
+
+
+def write_columnar_snapshot():
+    db: Session = SessionLocal()
+    try:
+        snapshot = write_snapshot(db)
+    finally:
+        db.close()
+    print(f"[SNAPSHOT] {snapshot['rows']} review rows for {snapshot['games']} games")
+
+
+def refresh_similar_games():
+    db: Session = SessionLocal()
+    try:
+        similar = rebuild_similar_games(db)
+        bump_data_version(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"[SIMILAR] Rebuilt neighbours for {similar['games']} games")
+
+
+def main():
+    ensure_schema()
+    owner = worker_id()
+
+    # Without a registry, GAMES_TO_TRACK is refreshed on this process's own schedule.
+    scheduler = RefreshScheduler()
+    now = datetime.utcnow()
+    for info in GAMES_TO_TRACK:
+        scheduler.schedule(info, now)
+
+    print(f"[SCHED] Refresh daemon {owner} started")
+    last_export = None
+    export_pending = False
+
+    with LeaseHeartbeat(owner) as lease:
+        while True:
+            now = datetime.utcnow()
+            if registry_in_use():
+                attempted, refreshed, status = queue_round(owner, lease)
+                next_due = None
+            else:
+                attempted, refreshed, status = scheduler_round(scheduler)
+                next_due = scheduler.next_due_at()
+            if refreshed:
+                export_pending = True
+
+            if export_pending and (
+                last_export is None or datetime.utcnow() - last_export >= EXPORT_INTERVAL
+            ):
+                try:
+                    export_static()
+                except Exception as e:
+                    print(f"[ERROR] Static export failed: {e}")
+                try:
+                    write_columnar_snapshot()
+                except Exception as e:
+                    print(f"[ERROR] Columnar snapshot failed: {e}")
+                try:
+                    refresh_similar_games()
+                except Exception as e:
+                    print(f"[ERROR] Similar-games rebuild failed: {e}")
+                last_export = datetime.utcnow()
+                export_pending = False
+
+            status["updated_at"] = datetime.utcnow().isoformat()
+            write_status(status)
+
+            if attempted:
+                continue
+
+            sleep_for = POLL_SECONDS
+            if next_due is not None:
+                sleep_for = min(POLL_SECONDS, max(0.0, (next_due - now).total_seconds()))
+            time.sleep(sleep_for)
+
+
+if __name__ == "__main__":
+    main()
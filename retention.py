@@ -0,0 +1,35 @@
+import argparse
+import json
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app.retention import ARCHIVE_DIR, run_retention
+
+RETENTION_DAYS = 365
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old raw reviews/posts and compact the DB.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS, help="keep rows newer than this many days")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    ensure_schema()
+    db: Session = SessionLocal()
+    try:
+        report = run_retention(db, timedelta(days=args.days), archive_dir=args.archive_dir)
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2))
+    print(
+        f"[RETENTION] Archived {sum(report['archived_rows'].values())} rows older than "
+        f"{report['cutoff']}, reclaimed {report['reclaimed_bytes'] / 1e6:.2f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.app_state import SCORING_VERSION_KEY, bump_data_version, get_state, set_state
+from app.database import SessionLocal
+from app.migrations import ensure_schema
+from app import models
+from app.reweight import (
+    LEADERBOARD_ORDER,
+    apply_scores,
+    current_scores,
+    inputs_match_config,
+    leaderboard_diff,
+    load_inputs,
+    rescore,
+)
+from app.rollups import WINDOWS
+from app.score_stream import prune_score_changes
+from app.scoring_config import SCORING_CONFIG_PATH, load_config
+
+# Leaderboard rows shown in the diff.
+DIFF_TOP = 10
+
+
+def _print_diff(db: Session, diff):
+    names = dict(
+        db.query(models.Game.id, models.Game.name).filter(
+            models.Game.id.in_({row["game_id"] for rows in diff.values() for row in rows})
+        )
+    )
+    for board, rows in diff.items():
+        print(f"\n[DIFF] {board} ({LEADERBOARD_ORDER[board][0]})")
+        for row in rows:
+            prev = row["previous_rank"]
+            move = "new" if prev is None else ("=" if prev == row["rank"] else f"{prev - row['rank']:+d}")
+            print(
+                f"  {row['rank']:>3}. {names.get(row['game_id'], row['game_id'])[:40]:<40} "
+                f"{row['previous_score']:6.2f} -> {row['score']:6.2f}  ({move})"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rescore every game from stored category totals with a scoring config."
+    )
+    parser.add_argument("--config", default=SCORING_CONFIG_PATH)
+    parser.add_argument("--apply", action="store_true", help="write the new scores (default: dry run)")
+    parser.add_argument("--window", default="all", choices=list(WINDOWS), help="window shown in the diff")
+    args = parser.parse_args()
+
+    ensure_schema()
+    config = load_config(args.config)
+    db: Session = SessionLocal()
+    try:
+        applied = get_state(db.connection(), SCORING_VERSION_KEY, default=None)
+        print(f"[REWEIGHT] Stored scores use config version {applied}; {args.config} is version {config['version']}")
+        if not inputs_match_config(db.connection(), config):
+            print(
+                f"[REWEIGHT] The stored totals were not summed with score_near_duplicates="
+                f"{config['score_near_duplicates']}; run compute_scores.py to rescore instead"
+            )
+            return
+
+        now = datetime.utcnow()
+        written = 0
+        started = time.perf_counter()
+        for window in WINDOWS:
+            game_ids, totals = load_inputs(db, window)
+            before = current_scores(db, window, game_ids)
+            after = rescore(game_ids, totals, config)
+            if window == args.window:
+                diff = leaderboard_diff(before, after, DIFF_TOP)
+                print(f"[REWEIGHT] Rescored {len(game_ids)} games in {time.perf_counter() - started:.3f}s")
+                _print_diff(db, diff)
+            if args.apply:
+                written += apply_scores(db, window, before, after, now)
+
+        if not args.apply:
+            print("\n[REWEIGHT] Dry run; re-run with --apply to write these scores")
+            return
+        set_state(db, SCORING_VERSION_KEY, config["version"])
+        prune_score_changes(db)
+        bump_data_version(db)
+        db.commit()
+        print(f"\n[REWEIGHT] Wrote {written} window scores in {time.perf_counter() - started:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
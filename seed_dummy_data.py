@@ -1,12 +1,13 @@
 from sqlalchemy.orm import Session
 
-from app.database import Base, engine, SessionLocal
+from app.database import SessionLocal
+from app.migrations import ensure_schema
 from app import models
 from datetime import datetime
 
 
 def seed():
-    Base.metadata.create_all(bind=engine)
+    ensure_schema()
     db: Session = SessionLocal()
 
     # Clear existing for repeatability in dev
@@ -0,0 +1,137 @@
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The batch scripts (compute_scores, fetch_steam_data, ...) live at the root.
+sys.path.insert(0, ROOT)
+
+# Point the app at throwaway stores before anything imports app.database.
+_TMP = tempfile.mkdtemp(prefix="ragequit-tests-")
+os.environ["RAGEQUIT_DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'ragequit.db')}"
+os.environ["RAGEQUIT_CACHE_URL"] = "memory://"
+os.environ["RAGEQUIT_SCORING_CONFIG"] = os.path.join(ROOT, "scoring_config.json")
+
+
+@pytest.fixture(autouse=True)
+def _workdir(tmp_path, monkeypatch):
+    # Status files, snapshots and run reports land here instead of the repo.
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def db():
+    """A session on an empty, fully migrated database."""
+    from app import cache, compression
+    from app.database import Base, SessionLocal, engine
+    from app.migrations import ensure_schema
+
+    engine.dispose()
+    Base.metadata.drop_all(bind=engine)
+    ensure_schema()
+
+    compression._dicts.clear()
+    compression._active_dict_id = 0
+    compression._loaded = False
+    cache.api_cache.backend = cache.MemoryBackend()
+    cache.api_cache._version_checked_at = float("-inf")
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """TestClient on the API (no lifespan: warm-up and the score poller stay off)."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def add_game(db):
+    """Factory: add_game("Name", scores={...}) -> Game, committed."""
+    from app import models
+
+    def add(name, steam_app_id=None, scores=None):
+        game = models.Game(
+            name=name,
+            slug=name.lower().replace(" ", "-"),
+            steam_app_id=steam_app_id,
+        )
+        db.add(game)
+        db.flush()
+        if scores is not None:
+            values = {
+                "rage_score": 0.0,
+                "difficulty_rage": 0.0,
+                "technical_rage": 0.0,
+                "social_toxicity_rage": 0.0,
+                "ui_design_rage": 0.0,
+                **scores,
+            }
+            db.add(models.GameRageScore(game_id=game.id, **values))
+            db.add(models.GameWindowScore(game_id=game.id, window="all", **values))
+        db.commit()
+        return game
+
+    return add
+
+
+@pytest.fixture
+def add_review(db):
+    """Factory: add_review(game, "text", created_at=..., positive=False) -> SteamReviewRaw."""
+    from app import models
+    from app.scoring import extract_review_features
+
+    counter = iter(range(1, 10**9))
+
+    def add(game, text, created_at=None, positive=False, **extra):
+        review = models.SteamReviewRaw(
+            game_id=game.id,
+            steam_review_id=f"r{next(counter)}",
+            is_positive=positive,
+            review_text=text,
+            created_at_steam=created_at or datetime(2026, 10, 1),
+            **{**extract_review_features(text, positive), **extra},
+        )
+        db.add(review)
+        db.commit()
+        return review
+
+    return add
+
+
+@pytest.fixture
+def add_post(db):
+    """Factory: add_post(game, "title", body="", created_at=...) -> RedditPostRaw."""
+    from app import models
+    from app.features import reddit_features
+
+    counter = iter(range(1, 10**9))
+
+    def add(game, title, body="", created_at=None, upvotes=1, **extra):
+        post = models.RedditPostRaw(
+            game_id=game.id,
+            reddit_id=f"t3_{next(counter)}",
+            title=title,
+            body=body,
+            upvotes=upvotes,
+            num_comments=0,
+            created_utc=created_at or datetime(2026, 10, 1),
+            **{**reddit_features(title, body), **extra},
+        )
+        db.add(post)
+        db.commit()
+        return post
+
+    return add
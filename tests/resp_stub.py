@@ -0,0 +1,82 @@
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class RespStub:
+    """
+    In-process stand-in for a Redis server: GET, SET [EX seconds], SELECT,
+    PING and FLUSHDB over RESP2, enough for app.cache.RedisBackend. `clock`
+    can be replaced to expire keys without sleeping.
+    """
+
+    def __init__(self):
+        self.clock = time.monotonic
+        self.data: Dict[Tuple[int, bytes], Tuple[bytes, Optional[float]]] = {}
+        self.commands: List[List[bytes]] = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                db = 0
+                while True:
+                    args = stub._read_command(self.rfile)
+                    if args is None:
+                        return
+                    db, reply = stub._execute(db, args)
+                    self.wfile.write(reply)
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @staticmethod
+    def _read_command(rfile) -> Optional[List[bytes]]:
+        line = rfile.readline()
+        if not line:
+            return None
+        assert line.startswith(b"*"), line
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int(rfile.readline()[1:-2])
+            args.append(rfile.read(size + 2)[:-2])
+        return args
+
+    @staticmethod
+    def _bulk(value: Optional[bytes]) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _execute(self, db: int, args: List[bytes]) -> Tuple[int, bytes]:
+        name = args[0].upper()
+        with self._lock:
+            self.commands.append(args)
+            if name == b"PING":
+                return db, b"+PONG\r\n"
+            if name == b"SELECT":
+                return int(args[1]), b"+OK\r\n"
+            if name == b"FLUSHDB":
+                self.data = {k: v for k, v in self.data.items() if k[0] != db}
+                return db, b"+OK\r\n"
+            if name == b"GET":
+                entry = self.data.get((db, args[1]))
+                if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+                    del self.data[(db, args[1])]
+                    entry = None
+                return db, self._bulk(entry[0] if entry else None)
+            if name == b"SET":
+                expires_at = None
+                if len(args) == 5 and args[3].upper() == b"EX":
+                    expires_at = self.clock() + int(args[4])
+                self.data[(db, args[1])] = (args[2], expires_at)
+                return db, b"+OK\r\n"
+        return db, b"-ERR unknown command '%s'\r\n" % args[0]
@@ -0,0 +1,111 @@
+import asyncio
+
+from starlette.responses import StreamingResponse
+
+from app.admission import AdmissionController, AdmissionMiddleware, TokenBucketLimiter
+
+
+def _scope(path, api_key=None):
+    headers = [(b"x-api-key", api_key.encode())] if api_key else []
+    return {"type": "http", "method": "GET", "path": path, "headers": headers, "client": ("1.2.3.4", 1)}
+
+
+async def _call(mw, path, api_key=None):
+    sent = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await mw(_scope(path, api_key), receive, send)
+    return sent
+
+
+def _status(sent):
+    return sent[0]["status"]
+
+
+async def _ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def test_token_bucket_refills_over_time():
+    limiter = TokenBucketLimiter(rate=1.0, capacity=2.0)
+    assert limiter.take("a", 2, now=0.0) == 0
+    assert limiter.take("a", 1, now=0.0) == 1.0
+    assert limiter.take("a", 1, now=1.0) == 0
+    # Other clients have their own bucket.
+    assert limiter.take("b", 2, now=0.0) == 0
+
+
+def test_rate_limited_client_gets_429_with_retry_after():
+    controller = AdmissionController(limiter=TokenBucketLimiter(rate=1.0, capacity=1.0))
+    mw = AdmissionMiddleware(_ok, controller, api_keys={"k"})
+
+    assert _status(asyncio.run(_call(mw, "/games"))) == 200
+    sent = asyncio.run(_call(mw, "/games"))
+    assert _status(sent) == 429
+    assert (b"retry-after", b"1") in sent[0]["headers"]
+    # An API key is a separate bucket.
+    assert _status(asyncio.run(_call(mw, "/games", api_key="k"))) == 200
+    assert controller.counters["rate_limited"] == 1
+
+
+def test_unknown_api_keys_share_the_ip_bucket():
+    controller = AdmissionController(limiter=TokenBucketLimiter(rate=1.0, capacity=1.0))
+    mw = AdmissionMiddleware(_ok, controller, api_keys={"issued"})
+
+    assert _status(asyncio.run(_call(mw, "/games"))) == 200
+    assert _status(asyncio.run(_call(mw, "/games", api_key="made-up"))) == 429
+    assert _status(asyncio.run(_call(mw, "/games", api_key="another"))) == 429
+    assert len(controller.limiter) == 1
+
+
+def test_heavy_requests_over_the_cap_are_shed_with_503():
+    controller = AdmissionController(heavy_max=1)
+    controller.heavy_in_flight = 1
+    mw = AdmissionMiddleware(_ok, controller)
+
+    assert _status(asyncio.run(_call(mw, "/games/1/rage-words"))) == 503
+    assert _status(asyncio.run(_call(mw, "/games"))) == 200
+    assert controller.counters["shed"] == 1
+
+
+def test_streaming_body_holds_the_heavy_slot_until_it_finishes():
+    controller = AdmissionController(heavy_max=1)
+    seen = []
+
+    async def body():
+        yield b"first\n"
+        # Headers and a chunk are out; the slot must still be taken.
+        seen.append(controller.heavy_in_flight)
+        seen.append(_status(await _call(mw, "/games/2/export/reviews.ndjson")))
+        yield b"second\n"
+
+    async def app(scope, receive, send):
+        await StreamingResponse(body(), media_type="application/x-ndjson")(scope, receive, send)
+
+    mw = AdmissionMiddleware(app, controller)
+    sent = asyncio.run(_call(mw, "/games/1/export/reviews.ndjson"))
+
+    assert _status(sent) == 200
+    assert b"".join(m.get("body", b"") for m in sent[1:]) == b"first\nsecond\n"
+    assert seen == [1, 503]
+    assert controller.heavy_in_flight == 0
+
+
+def test_slot_released_when_the_app_fails():
+    controller = AdmissionController(heavy_max=1)
+
+    async def broken(scope, receive, send):
+        raise RuntimeError("boom")
+
+    mw = AdmissionMiddleware(broken, controller)
+    try:
+        asyncio.run(_call(mw, "/games/1/page"))
+    except RuntimeError:
+        pass
+    assert controller.heavy_in_flight == 0
@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import pytest
+
+from app import instrumentation, models
+from app.batch_writer import BatchWriteError, BatchWriter
+from app.features import review_features
+
+
+def _review(game_id, review_id, text="unfair boss, rage quit", positive=False):
+    return {
+        "game_id": game_id,
+        "steam_review_id": review_id,
+        "is_positive": positive,
+        "language": "english",
+        "review_text": text,
+        "created_at_steam": datetime(2026, 10, 1, 12),
+        **review_features(text, positive),
+    }
+
+
+@pytest.fixture
+def writer(db):
+    w = BatchWriter(group_window=0.05)
+    yield w
+    w.close()
+
+
+def test_duplicates_are_dropped_within_a_group_and_against_the_table(db, writer, add_game, add_review):
+    game = add_game("Deduped")
+    existing = add_review(game, "already stored")
+
+    writer.put("review", _review(game.id, existing.steam_review_id))
+    writer.put("review", _review(game.id, "new-1"))
+    writer.put("review", _review(game.id, "new-1"))
+    writer.put("review", _review(game.id, "new-2", text="the servers crash every match"))
+    writer.flush()
+
+    ids = [r for (r,) in db.query(models.SteamReviewRaw.steam_review_id).order_by(models.SteamReviewRaw.id)]
+    assert ids == [existing.steam_review_id, "new-1", "new-2"]
+    assert writer.counts["review"]["inserted"] == 2
+    assert writer.counts["review"]["duplicates"] == 2
+
+
+def test_achievements_upsert_last_value_wins(db, writer, add_game):
+    game = add_game("Achievers")
+    row = {"game_id": game.id, "api_name": "BEAT_BOSS", "display_name": "BEAT_BOSS", "description": None}
+    writer.put("achievement", {**row, "percent": 10.0})
+    writer.flush()
+    writer.put("achievement", {**row, "percent": 20.0})
+    writer.put("achievement", {**row, "percent": 30.0})
+    writer.flush()
+
+    assert [a.percent for a in db.query(models.SteamAchievementRaw)] == [30.0]
+    assert writer.counts["achievement"] == {"inserted": 1, "updated": 1, "duplicates": 0, "near_duplicates": 0}
+
+
+def test_a_failed_group_is_rolled_back_and_raised_on_flush(db, writer, add_game):
+    game = add_game("Broken")
+    writer.put("review", _review(game.id, "lost"))
+    writer.put("unknown", {"game_id": game.id})
+
+    with pytest.raises(BatchWriteError, match="Unknown record kinds"):
+        writer.flush()
+    assert db.query(models.SteamReviewRaw).count() == 0
+    assert writer.counts["review"]["inserted"] == 0
+
+    writer.put("review", _review(game.id, "kept"))
+    writer.flush()  # the error was reported once; the writer carries on
+    assert db.query(models.SteamReviewRaw).count() == 1
+    assert writer.counts["review"]["inserted"] == 1
+
+
+def test_run_report_is_written_when_closing_the_writer_fails(db, monkeypatch):
+    import fetch_steam_data
+
+    class FailingWriter(BatchWriter):
+        def close(self):
+            super().close()
+            raise BatchWriteError("Batch write failed: disk full")
+
+    monkeypatch.setattr(fetch_steam_data, "tracked_games", lambda: [])
+    monkeypatch.setattr(fetch_steam_data, "BatchWriter", FailingWriter)
+
+    with pytest.raises(BatchWriteError):
+        fetch_steam_data.main()
+    assert instrumentation._active is None
+
+
+def test_writer_stages_are_attributed_to_the_producers_game(db, add_game):
+    a, b = add_game("Game A"), add_game("Game B")
+    report = instrumentation.start_run("writer-test")
+    writer = BatchWriter(group_window=0.5)
+    try:
+        with instrumentation.game("Game A"):
+            writer.put("review", _review(a.id, "a-1"))
+        with instrumentation.game("Game B"):
+            writer.put("review", _review(b.id, "b-1"))
+            writer.put("review", _review(b.id, "b-2", text="constant lag and crash"))
+        writer.close()
+        stats = report.to_dict()
+    finally:
+        instrumentation.finish_run()
+
+    assert writer.groups == 1
+    assert stats["games"]["Game A"]["writer.insert"]["rows"] == 1
+    assert stats["games"]["Game B"]["writer.insert"]["rows"] == 2
+    assert stats["games"]["Game B"]["writer.dedupe"]["rows"] == 2
+    # The commit covers the whole group, so it belongs to no single game.
+    assert "writer.commit" in stats["stages"]
+    assert "writer.commit" not in stats["games"]["Game B"]
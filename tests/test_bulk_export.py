@@ -0,0 +1,56 @@
+import json
+import zlib
+
+from app import bulk_export
+
+
+def _lines(body: bytes):
+    return [json.loads(line) for line in body.decode("utf-8").splitlines()]
+
+
+def test_export_streams_rows_in_id_order_and_resumes_after_id(db, client, add_game, add_review, monkeypatch):
+    monkeypatch.setattr(bulk_export, "EXPORT_BATCH_SIZE", 2)
+    game, other = add_game("Exported"), add_game("Not exported")
+    ids = [add_review(game, f"review {i}").id for i in range(5)]
+    add_review(other, "someone else's")
+
+    rows = _lines(client.get(f"/games/{game.id}/export/reviews").content)
+    assert [r["id"] for r in rows] == ids
+    assert rows[0]["review_text"] == "review 0"
+
+    resumed = _lines(client.get(f"/games/{game.id}/export/reviews", params={"after_id": ids[2]}).content)
+    assert [r["id"] for r in resumed] == ids[3:]
+
+
+def test_export_is_gzipped_when_the_client_accepts_it(db, client, add_game, add_post):
+    game = add_game("Zipped")
+    add_post(game, "rage quit again")
+
+    response = client.get(f"/games/{game.id}/export/reddit", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert _lines(response.content)[0]["title"] == "rage quit again"  # httpx inflates it
+
+    raw = b"".join(bulk_export.gzip_stream(bulk_export.iter_ndjson("reddit", game.id)))
+    assert _lines(zlib.decompress(raw, 31)) == _lines(response.content)
+
+
+def test_export_of_an_unknown_game_is_404(db, client):
+    assert client.get("/games/999/export/reviews").status_code == 404
+
+
+def test_keyset_pages_use_an_index_instead_of_sorting(db):
+    from sqlalchemy import text
+
+    for table, index in (
+        ("steam_reviews_raw", "ix_steam_reviews_game_id"),
+        ("reddit_posts_raw", "ix_reddit_posts_game_id"),
+    ):
+        plan = " ".join(
+            row[-1]
+            for row in db.execute(text(
+                f"EXPLAIN QUERY PLAN SELECT id FROM {table} "
+                "WHERE game_id = 1 AND id > 0 ORDER BY id LIMIT 500"
+            ))
+        )
+        assert "TEMP B-TREE" not in plan, plan
+        assert index in plan, plan
@@ -0,0 +1,156 @@
+import datetime as dt
+import pickle
+import threading
+import time
+
+import pytest
+
+from app import cache
+from app.app_state import bump_data_version
+from app.cache import (
+    MemoryBackend,
+    RedisBackend,
+    SQLiteBackend,
+    VersionedCache,
+    backend_from_url,
+)
+from app.database import SessionLocal, engine
+from resp_stub import RespStub
+
+
+@pytest.fixture
+def resp_server():
+    server = RespStub()
+    yield server
+    server.close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    """(backend, expire) where expire() lets a short-TTL entry lapse."""
+    if request.param == "memory":
+        return MemoryBackend(), lambda: time.sleep(0.15)
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.db")), lambda: time.sleep(0.15)
+    server = request.getfixturevalue("resp_server")
+    now = [time.monotonic()]
+    server.clock = lambda: now[0]
+
+    def expire():
+        now[0] += 2  # Redis TTLs are whole seconds
+
+    return RedisBackend(server.host, server.port), expire
+
+
+@pytest.fixture
+def versioned(db, backend, monkeypatch):
+    monkeypatch.setattr(cache, "VERSION_CHECK_SECONDS", 0.0)
+    return VersionedCache(backend[0], bind=engine)
+
+
+def _bump():
+    session = SessionLocal()
+    bump_data_version(session)
+    session.commit()
+    session.close()
+
+
+def test_backend_is_chosen_from_the_url(tmp_path):
+    assert isinstance(backend_from_url("memory://"), MemoryBackend)
+    sqlite_backend = backend_from_url(f"sqlite:///{tmp_path}/c.db")
+    assert isinstance(sqlite_backend, SQLiteBackend)
+    assert sqlite_backend.path == f"{tmp_path}/c.db"
+    redis_backend = backend_from_url("redis://cache.internal:6380/2")
+    assert isinstance(redis_backend, RedisBackend)
+    assert (redis_backend.host, redis_backend.port, redis_backend.db) == ("cache.internal", 6380, 2)
+    with pytest.raises(ValueError):
+        backend_from_url("memcached://localhost")
+
+
+def test_backend_round_trip_and_ttl(backend):
+    store, expire = backend
+    assert store.get("missing") is None
+    store.set("k", b"\x00value", ttl=60)
+    store.set("short", b"x", ttl=0.1)
+    assert store.get("k") == b"\x00value"
+    assert store.get("short") == b"x"
+
+    expire()
+
+    assert store.get("short") is None
+    assert store.get("k") == b"\x00value"
+
+
+def test_redis_backend_selects_its_database(resp_server):
+    store = RedisBackend(resp_server.host, resp_server.port, db=3)
+    store.set("k", b"v", ttl=60)
+
+    assert store.get("k") == b"v"
+    assert resp_server.commands[0] == [b"SELECT", b"3"]
+    assert (3, b"k") in resp_server.data
+
+
+def test_values_are_json_with_dates(versioned):
+    versioned.set(("timeline", 1), [{"date": dt.date(2026, 10, 19), "n": 2}])
+
+    assert versioned.get(("timeline", 1)) == [{"date": "2026-10-19", "n": 2}]
+
+
+def test_pickled_entries_are_never_unpickled(versioned):
+    class Boom:
+        def __reduce__(self):
+            return (exec, ("raise SystemExit('unpickled')",))
+
+    versioned.backend.set(versioned._key(("evil",)), pickle.dumps(Boom()), 60)
+
+    assert versioned.get(("evil",), "miss") == "miss"
+
+
+def test_bumping_data_version_invalidates_entries(versioned):
+    calls = []
+    assert versioned.get_or_set(("board",), lambda: calls.append(1) or "v0") == "v0"
+    assert versioned.get_or_set(("board",), lambda: calls.append(1) or "again") == "v0"
+
+    _bump()
+
+    assert versioned.get(("board",)) is None
+    assert versioned.get_or_set(("board",), lambda: calls.append(1) or "v1") == "v1"
+    assert len(calls) == 2
+
+
+def test_result_loaded_before_a_bump_is_not_served_as_the_new_version(versioned):
+    def loader():
+        _bump()  # the scoring job commits while this request is reading
+        return "read from old data"
+
+    assert versioned.get_or_set(("detail", 7), loader) == "read from old data"
+
+    assert versioned.get(("detail", 7)) is None
+    assert versioned.get_or_set(("detail", 7), lambda: "fresh") == "fresh"
+
+
+def test_concurrent_misses_run_the_loader_once(versioned):
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return {"rows": 3}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(versioned.get_or_set(("hot",), loader)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 5
+    while versioned.flights.stats()["absorbed"] < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert results == [{"rows": 3}] * 8
@@ -0,0 +1,88 @@
+import datetime as dt
+import os
+
+import pytest
+
+from app import crud, models
+from app.columnar import KEEP_VERSIONS, SNAPSHOT_ROOT, get_snapshot, write_snapshot
+from app.rollups import rebuild_daily_rollups, window_totals
+from app.scoring import DEFAULT_SCORING
+
+TODAY = dt.date(2026, 10, 19)
+
+
+def _at(days_ago, hour=12):
+    return dt.datetime.combine(TODAY - dt.timedelta(days=days_ago), dt.time(hour))
+
+
+def _seed(db, add_game, add_review):
+    game = add_game("Columnar")
+    add_review(game, "unfair", created_at=_at(1, 9))
+    add_review(game, "lovely", created_at=_at(1, 18), positive=True)
+    add_review(game, "crash lag", created_at=_at(12))
+    add_review(game, "impossible", created_at=_at(40))
+    db.add(models.ArchivedDailyTotal(
+        game_id=game.id, day=TODAY - dt.timedelta(days=500), source="steam",
+        rows=5, negatives=3, rage_points=40, diff_hits=2, tech_hits=1, toxic_hits=0, ui_hits=0,
+    ))
+    db.commit()
+    return game.id
+
+
+def test_snapshot_timeline_matches_the_sql_timeline(db, add_game, add_review):
+    game_id = _seed(db, add_game, add_review)
+
+    meta = write_snapshot(db)
+    snapshot = get_snapshot()
+
+    assert meta["games"] == 1 and meta["rows"] == 4 + 2
+    assert snapshot.has_game(game_id) and not snapshot.has_game(game_id + 1)
+    assert snapshot.timeline(game_id) == crud.get_game_rage_timeline(db, game_id)
+
+
+def test_snapshot_window_counts_match_the_rollups(db, add_game, add_review):
+    game_id = _seed(db, add_game, add_review)
+    rebuild_daily_rollups(db)
+    db.commit()
+    snapshot = write_snapshot(db) and get_snapshot()
+
+    for window in ("7d", "30d", "90d", "all"):
+        expected = window_totals(db, window, [game_id], today=TODAY, source="steam")[game_id]
+        counts = snapshot.review_counts(game_id, window, today=TODAY)
+        assert counts == expected, window
+
+
+@pytest.mark.parametrize("score_dups", [False, True])
+def test_snapshot_applies_the_rollups_near_duplicate_rule(db, add_game, add_review, score_dups):
+    game_id = _seed(db, add_game, add_review)
+    first = db.query(models.SteamReviewRaw).filter_by(game_id=game_id).first()
+    game = db.get(models.Game, game_id)
+    add_review(game, "unfair", created_at=_at(1, 10), dup_of=first.id)
+    add_review(game, "lovely", created_at=_at(50), positive=True, dup_of=first.id)
+    db.add(models.ArchivedDailyTotal(
+        game_id=game_id, day=TODAY - dt.timedelta(days=600), source="steam",
+        **dict.fromkeys(("rows", "negatives", "rage_points", "diff_hits", "tech_hits", "toxic_hits", "ui_hits"), 0),
+        dup_rows=4, dup_negatives=4, dup_rage_points=8, dup_diff_hits=4, dup_tech_hits=0,
+        dup_toxic_hits=0, dup_ui_hits=0,
+    ))
+    db.commit()
+    config = {**DEFAULT_SCORING, "score_near_duplicates": score_dups}
+    rebuild_daily_rollups(db, config=config)
+    db.commit()
+
+    write_snapshot(db, config=config)
+    snapshot = get_snapshot()
+
+    for window in ("7d", "30d", "90d", "all"):
+        expected = window_totals(db, window, [game_id], today=TODAY, source="steam")[game_id]
+        assert snapshot.review_counts(game_id, window, today=TODAY) == expected, window
+    assert snapshot.timeline(game_id) == crud.get_game_rage_timeline(db, game_id)
+    assert snapshot.review_counts(game_id, "all", today=TODAY)["rows"] == (4 + 5 + 2 + 4 if score_dups else 4 + 5)
+
+
+def test_new_snapshots_are_swapped_in_and_old_ones_pruned(db, add_game, add_review):
+    _seed(db, add_game, add_review)
+    versions = [write_snapshot(db)["version"] for _ in range(KEEP_VERSIONS + 1)]
+
+    assert sorted(os.listdir(os.path.join(SNAPSHOT_ROOT, "versions"))) == versions[-KEEP_VERSIONS:]
+    assert get_snapshot().path.endswith(versions[-1])
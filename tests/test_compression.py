@@ -0,0 +1,66 @@
+from sqlalchemy import text
+
+from app import models
+from app.compression import (
+    MIN_COMPRESS_CHARS,
+    compress_text,
+    decompress_text,
+    train_dictionary,
+)
+from compress_text import db_size_bytes, rewrite_column, train_and_store
+
+LONG = "The final boss is unfair and the checkpoints are brutal, I rage quit twice tonight. " * 3
+
+
+def _stored(db, review_id):
+    return db.execute(
+        text("SELECT typeof(review_text), review_text FROM steam_reviews_raw WHERE id = :id"),
+        {"id": review_id},
+    ).one()
+
+
+def test_round_trip_with_and_without_dictionary():
+    blob = compress_text(LONG)
+    assert blob[1:3] == b"\x00\x00"
+    assert decompress_text(blob) == LONG
+
+    zdict = train_dictionary([LONG, LONG.upper(), LONG])
+    assert zdict and len(zdict) <= 32 * 1024
+
+
+def test_column_stores_long_text_compressed_and_short_text_plain(db, add_game, add_review):
+    game = add_game("Compressed")
+    long_review = add_review(game, LONG)
+    short_review = add_review(game, "unfair")
+
+    kind, raw = _stored(db, long_review.id)
+    assert kind == "blob" and len(raw) < len(LONG)
+    assert _stored(db, short_review.id)[0] == "text"
+    assert len("unfair") < MIN_COMPRESS_CHARS
+
+    db.expire_all()
+    assert db.get(models.SteamReviewRaw, long_review.id).review_text == LONG
+
+
+def test_rewrite_recompresses_blobs_from_before_the_dictionary(db, add_game, add_review):
+    game = add_game("Retrained")
+    ids = [add_review(game, LONG + str(n)).id for n in range(3)]
+    assert all(_stored(db, i)[1][1:3] == b"\x00\x00" for i in ids)
+
+    dict_id = train_and_store(db)
+    assert rewrite_column(db, models.SteamReviewRaw, models.SteamReviewRaw.review_text) == 3
+
+    for n, i in enumerate(ids):
+        kind, raw = _stored(db, i)
+        assert kind == "blob"
+        assert int.from_bytes(raw[1:3], "big") == dict_id
+    db.expire_all()
+    assert db.get(models.SteamReviewRaw, ids[0]).review_text == LONG + "0"
+
+    # Everything is on the active dictionary now.
+    assert rewrite_column(db, models.SteamReviewRaw, models.SteamReviewRaw.review_text) == 0
+
+
+def test_db_size_reads_the_configured_database_not_the_working_directory(db):
+    # The tests chdir into an empty tmp dir; the database lives elsewhere.
+    assert db_size_bytes() > 0
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import pytest
+
+from app import crud
+
+
+def test_rage_timeline_buckets_reviews_per_day(db, add_game, add_review, monkeypatch):
+    monkeypatch.setattr(crud, "STREAM_CHUNK_SIZE", 2)  # several yield_per chunks
+    game = add_game("Timeline")
+    add_review(game, "unfair", created_at=datetime(2026, 10, 1, 9))
+    add_review(game, "great", created_at=datetime(2026, 10, 1, 18), positive=True)
+    add_review(game, "unfair", created_at=datetime(2026, 10, 1, 20))
+    add_review(game, "unfair", created_at=datetime(2026, 10, 2, 8))
+    add_review(game, "nice", created_at=datetime(2026, 10, 3, 8), positive=True)
+
+    points = crud.get_game_rage_timeline(db, game.id)
+
+    assert [(p["date"].day, p["positive"], p["negative"]) for p in points] == [
+        (1, 1, 2), (2, 0, 1), (3, 1, 0),
+    ]
+    assert points[0]["rage_score"] == pytest.approx(200.0 / 3)
+
+
+def test_rage_words_are_scaled_to_the_most_common(db, add_game, add_review, monkeypatch):
+    monkeypatch.setattr(crud, "STREAM_CHUNK_SIZE", 1)
+    game = add_game("Words")
+    add_review(game, "checkpoint checkpoint boss")
+    add_review(game, "checkpoint boss")
+    add_review(game, "camera")
+
+    words = crud.get_game_rage_words(db, game.id, limit=2)
+
+    assert words == [
+        {"word": "checkpoint", "score": 100.0},
+        {"word": "boss", "score": 2 / 3 * 100.0},
+    ]
+    assert crud.get_game_rage_words(db, add_game("Silent").id) == []
+
+
+def test_reviews_are_newest_first_and_limited(db, add_game, add_review):
+    game = add_game("Reviews")
+    for day in (3, 1, 2):
+        add_review(game, f"day {day}", created_at=datetime(2026, 10, day))
+
+    reviews = crud.get_game_reviews(db, game.id, limit=2)
+
+    assert [r["review_text"] for r in reviews] == ["day 3", "day 2"]
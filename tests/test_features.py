@@ -0,0 +1,63 @@
+from app import models
+from app.features import backfill_features
+from app.scoring import FEATURES_VERSION, extract_review_features
+from compute_scores import compute_scores_for_games
+
+
+def _mark_stale(db, review):
+    db.query(models.SteamReviewRaw).filter(models.SteamReviewRaw.id == review.id).update(
+        {"features_version": None, "diff_hits": None, "rage_points": None}
+    )
+    db.commit()
+
+
+def test_extract_review_features_counts_hits_in_tenths_of_points():
+    features = extract_review_features("Unfair bosses, crashes constantly", is_positive=False)
+    assert features["diff_hits"] >= 1
+    assert features["tech_hits"] >= 1
+    assert features["features_version"] == FEATURES_VERSION
+    assert features["rage_points"] == round(
+        10 * (1.0 + 0.6 * features["diff_hits"] + 0.5 * features["tech_hits"]
+              + 0.5 * features["toxic_hits"] + 0.4 * features["ui_hits"])
+    )
+    assert extract_review_features("lovely", is_positive=True)["rage_points"] == 0
+
+
+def test_backfill_reextracts_stale_rows(db, add_game, add_review):
+    game = add_game("Stale")
+    review = add_review(game, "impossible and unfair")
+    _mark_stale(db, review)
+
+    assert backfill_features(db) == {"reviews": 1, "reddit_posts": 0}
+    db.expire_all()
+    row = db.get(models.SteamReviewRaw, review.id)
+    assert row.features_version == FEATURES_VERSION
+    assert row.diff_hits >= 1
+    assert backfill_features(db) == {"reviews": 0, "reddit_posts": 0}
+
+
+def test_backfill_can_be_scoped_to_games(db, add_game, add_review):
+    a, b = add_game("Scoped A"), add_game("Scoped B")
+    ra = add_review(a, "unfair")
+    rb = add_review(b, "unfair")
+    _mark_stale(db, ra)
+    _mark_stale(db, rb)
+
+    assert backfill_features(db, game_ids=[a.id])["reviews"] == 1
+    db.expire_all()
+    assert db.get(models.SteamReviewRaw, rb.id).features_version is None
+
+
+def test_batch_scoring_only_backfills_the_batch(db, add_game, add_review):
+    a, b = add_game("Batch A"), add_game("Batch B")
+    add_review(a, "unfair, rage quit")
+    rb = add_review(b, "unfair")
+    _mark_stale(db, rb)
+
+    a_id, b_id, rb_id = a.id, b.id, rb.id
+
+    compute_scores_for_games(db, [a_id])
+
+    assert db.get(models.GameRageScore, a_id).rage_score > 0
+    assert db.get(models.GameRageScore, b_id) is None
+    assert db.get(models.SteamReviewRaw, rb_id).features_version is None
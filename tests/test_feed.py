@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.feed import decode_cursor, encode_cursor, get_game_feed
+
+T0 = datetime(2026, 10, 1, 12)
+
+
+def _seed(game, add_review, add_post):
+    # Interleaved sources, with a steam/reddit and a steam/steam timestamp tie.
+    add_review(game, "s1", created_at=T0)
+    add_post(game, "p1", created_at=T0)
+    add_review(game, "s2", created_at=T0 + timedelta(hours=1))
+    add_review(game, "s3", created_at=T0 + timedelta(hours=1))
+    add_post(game, "p2", created_at=T0 + timedelta(hours=2))
+    add_review(game, "s4", created_at=T0 - timedelta(hours=1))
+    add_post(game, "p3", created_at=T0 - timedelta(hours=2))
+
+
+def _label(item):
+    return item["review_text"] if item["source"] == "steam" else item["title"]
+
+
+def test_pages_cover_the_merged_feed_once_in_order(db, add_game, add_review, add_post):
+    game = add_game("Feed")
+    _seed(game, add_review, add_post)
+
+    seen, cursor = [], None
+    while True:
+        page = get_game_feed(db, game.id, limit=2, cursor=cursor)
+        seen += [_label(i) for i in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["p2", "s3", "s2", "s1", "p1", "s4", "p3"]
+
+
+def test_cursor_round_trips_and_rejects_garbage():
+    key = (T0, 1, 42)
+    assert decode_cursor(encode_cursor(key)) == key
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_feed_route_pages_and_rejects_bad_cursors(client, add_game, add_review, add_post):
+    game = add_game("Feed route")
+    _seed(game, add_review, add_post)
+
+    first = client.get(f"/games/{game.id}/feed", params={"limit": 3}).json()
+    second = client.get(
+        f"/games/{game.id}/feed", params={"limit": 10, "cursor": first["next_cursor"]}
+    ).json()
+
+    assert [_label(i) for i in first["items"] + second["items"]] == [
+        "p2", "s3", "s2", "s1", "p1", "s4", "p3",
+    ]
+    assert second["next_cursor"] is None
+    assert client.get(f"/games/{game.id}/feed", params={"cursor": "zzz"}).status_code == 400
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from app import models
+
+
+def test_page_returns_every_section_by_default(client, db, add_game, add_review, add_post):
+    game = add_game("Page", scores={"rage_score": 30.0})
+    add_review(game, "checkpoint placement is unfair", created_at=datetime(2026, 10, 2))
+    add_post(game, "Camera rage thread", created_at=datetime(2026, 10, 3))
+    db.add(models.RageClip(game_id=game.id, url="https://clips.example/1", title="Rage"))
+    db.commit()
+
+    page = client.get(f"/games/{game.id}/page").json()
+
+    assert page["game"]["name"] == "Page"
+    assert page["rage_timeline"][0]["date"] == "2026-10-02"
+    assert page["rage_words"][0]["word"] in {"checkpoint", "placement", "unfair"}
+    assert page["reviews"][0]["review_text"] == "checkpoint placement is unfair"
+    assert page["reddit"][0]["title"] == "Camera rage thread"
+    assert page["clips"][0]["url"] == "https://clips.example/1"
+
+
+def test_include_limits_the_sections(client, add_game):
+    game = add_game("Partial", scores={})
+
+    page = client.get(f"/games/{game.id}/page", params={"include": "clips, reviews"}).json()
+
+    assert page["clips"] == [] and page["reviews"] == []
+    assert page["rage_timeline"] is None and page["reddit"] is None
+
+
+def test_unknown_sections_and_games_are_rejected(client, add_game):
+    game = add_game("Strict", scores={})
+
+    assert client.get(f"/games/{game.id}/page", params={"include": "nope"}).status_code == 400
+    assert client.get("/games/999999/page").status_code == 404
@@ -0,0 +1,68 @@
+import datetime as dt
+import random
+from collections import Counter
+
+from app.heavy_hitters import SpaceSaving, feed_word_sketches, global_rage_words, week_key
+
+
+def test_small_streams_are_counted_exactly():
+    sketch = SpaceSaving(capacity=10)
+    sketch.update(Counter({"boss": 3, "camera": 1}))
+    sketch.update(Counter({"boss": 2}))
+
+    assert sketch.top(2) == [("boss", 5, 0), ("camera", 1, 0)]
+    assert sketch.total == 6
+
+
+def test_error_bound_holds_and_heavy_words_survive():
+    rng = random.Random(7)
+    heavy = {"checkpoint": 900, "camera": 600, "hitbox": 400}
+    truth = Counter(heavy)
+    sketch = SpaceSaving(capacity=50)
+    batches = [Counter() for _ in range(40)]
+    for word, n in heavy.items():
+        for _ in range(n):
+            batches[rng.randrange(40)][word] += 1
+    for i in range(4000):
+        word = f"noise{rng.randrange(3000)}"
+        batches[i % 40][word] += 1
+        truth[word] += 1
+    for batch in batches:
+        sketch.update(batch)
+
+    assert [w for w, _, _ in sketch.top(3)] == ["checkpoint", "camera", "hitbox"]
+    bound = sketch.total / sketch.capacity
+    for word, count, error in sketch.top(50):
+        assert truth[word] <= count <= truth[word] + bound
+        assert error <= bound
+
+
+def test_serialization_round_trips():
+    sketch = SpaceSaving(capacity=5)
+    sketch.update(Counter({"boss": 4, "lag": 2}))
+
+    copy = SpaceSaving.from_bytes(sketch.to_bytes())
+
+    assert (copy.capacity, copy.total, copy.top(5)) == (5, 6, sketch.top(5))
+
+
+def test_ingested_texts_feed_global_and_weekly_sketches(db):
+    day = dt.datetime(2026, 10, 14, 9)
+    feed_word_sketches(db, [(day, "checkpoint checkpoint camera"), (day, "checkpoint")])
+    db.commit()
+
+    words = global_rage_words(db, limit=2)
+    assert [(w["word"], w["count"]) for w in words] == [("checkpoint", 3), ("camera", 1)]
+    assert words[0]["score"] == 100.0
+    week = week_key(day.date())[len("week:"):]
+    assert global_rage_words(db, week=week)[0]["word"] == "checkpoint"
+    assert global_rage_words(db, week="2020-W01") == []
+
+
+def test_two_feeds_in_one_transaction_merge_into_one_row(db):
+    day = dt.datetime(2026, 10, 14, 9)
+    feed_word_sketches(db, [(day, "checkpoint camera")])
+    feed_word_sketches(db, [(day, "checkpoint")])
+    db.commit()
+
+    assert [(w["word"], w["count"]) for w in global_rage_words(db)] == [("checkpoint", 2), ("camera", 1)]
@@ -0,0 +1,88 @@
+import json
+import threading
+
+from app import instrumentation
+from app.instrumentation import RunReport
+
+
+def test_stages_are_attributed_to_the_current_game():
+    instrumentation.start_run("job")
+    try:
+        with instrumentation.stage("fetch", rows=3):
+            pass
+        with instrumentation.game("Elden Ring"):
+            with instrumentation.stage("fetch") as timer:
+                timer.rows = 7
+        report = instrumentation._active.to_dict()
+    finally:
+        path = instrumentation.finish_run()
+
+    assert report["stages"]["fetch"]["calls"] == 2
+    assert report["stages"]["fetch"]["rows"] == 10
+    assert report["games"] == {"Elden Ring": {"fetch": report["games"]["Elden Ring"]["fetch"]}}
+    assert report["games"]["Elden Ring"]["fetch"]["rows"] == 7
+    with open(path) as f:
+        assert json.load(f)["job"] == "job"
+
+
+def test_nested_runs_share_the_outer_report():
+    outer = instrumentation.start_run("update_all")
+    inner = instrumentation.start_run("compute_scores")
+    assert inner is outer
+    assert instrumentation.finish_run() is None
+    assert instrumentation.finish_run() is not None
+
+
+def test_stage_is_a_no_op_outside_a_run():
+    with instrumentation.stage("idle", rows=1) as timer:
+        timer.rows += 1
+    assert instrumentation._active is None
+
+
+def test_record_is_safe_across_threads():
+    report = RunReport("threads")
+    start = threading.Barrier(8)
+
+    def worker(n):
+        start.wait()
+        for _ in range(2000):
+            report.record("writer.insert", 0.0001, rows=2, game=f"game-{n % 2}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stage = report.stages["writer.insert"]
+    assert (stage["calls"], stage["rows"]) == (16000, 32000)
+    assert report.games["game-0"]["writer.insert"]["calls"] == 8000
+
+
+def test_feature_extraction_is_timed_once_per_page(db, add_game, monkeypatch):
+    import fetch_steam_data
+
+    game = add_game("Paged")
+    pages = [
+        [{"recommendationid": n, "review": "unfair", "timestamp_created": 1760000000} for n in range(3)],
+        [{"recommendationid": 10 + n, "review": "lovely", "voted_up": True} for n in range(2)],
+    ]
+    monkeypatch.setattr(fetch_steam_data, "iter_steam_review_pages", lambda *a, **kw: iter(pages))
+
+    class Writer:
+        def __init__(self):
+            self.records = []
+
+        def put(self, kind, record):
+            self.records.append(record)
+
+    writer = Writer()
+    instrumentation.start_run("ingest")
+    try:
+        fetch_steam_data.ingest_reviews_for_game(db, writer, game, 1)
+        stage = instrumentation._active.to_dict()["stages"]["reviews.features"]
+    finally:
+        instrumentation.finish_run()
+
+    assert (stage["calls"], stage["rows"]) == (2, 5)
+    assert [r["diff_hits"] for r in writer.records] == [1, 1, 1, 0, 0]
@@ -0,0 +1,33 @@
+from app import models
+from app.near_duplicates import DUPLICATE_SIMILARITY, assign_near_duplicates, signature, similarity
+
+COPYPASTA = "This game is an unfair mess, the final boss one-shots you and the camera fights you too"
+EDITED = "This game is an unfair mess!! The final boss one-shots you and the camera fights you too."
+OTHER = "Servers crash every evening and the netcode lag makes ranked matches impossible to finish"
+
+
+def test_short_texts_get_no_signature():
+    assert signature("10/10 would rage again") is None
+
+
+def test_edited_copies_score_as_similar_and_different_texts_do_not():
+    assert similarity(signature(COPYPASTA), signature(EDITED)) >= DUPLICATE_SIMILARITY
+    assert similarity(signature(COPYPASTA), signature(OTHER)) < 0.3
+
+
+def test_copies_point_at_the_first_row_of_their_cluster(db, add_game, add_review):
+    game, other_game = add_game("Bombed"), add_game("Elsewhere")
+    first = add_review(game, COPYPASTA)
+    assert assign_near_duplicates(db, "steam", game.id, [(first.id, first.review_text)]) == {}
+
+    batch = [add_review(game, t) for t in (EDITED, OTHER, COPYPASTA)]
+    dups = assign_near_duplicates(db, "steam", game.id, [(r.id, r.review_text) for r in batch])
+    assert dups == {batch[0].id: first.id, batch[2].id: first.id}
+
+    # Clusters are per game.
+    elsewhere = add_review(other_game, COPYPASTA)
+    assert assign_near_duplicates(db, "steam", other_game.id, [(elsewhere.id, COPYPASTA)]) == {}
+
+    db.commit()
+    assert db.get(models.SteamReviewRaw, batch[0].id).dup_of == first.id
+    assert db.get(models.SteamReviewRaw, batch[1].id).dup_of is None
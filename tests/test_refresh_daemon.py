@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import ingest_worker
+import refresh_daemon
+from app import models
+from app.work_queue import LeaseHeartbeat, claim, import_tracked_games
+from fetch_steam_data import upsert_game
+
+
+def _import(db, *app_ids):
+    import_tracked_games(db, [{"steam_app_id": a, "name": f"Game {a}"} for a in app_ids])
+    db.commit()
+
+
+def test_queue_rounds_lease_games_including_ones_imported_later(db, monkeypatch):
+    monkeypatch.setattr(ingest_worker, "refresh_game", lambda db, writer, info: upsert_game(db, info))
+    lease = LeaseHeartbeat("daemon")
+    assert not refresh_daemon.registry_in_use()
+
+    _import(db, 10)
+    assert refresh_daemon.registry_in_use()
+    attempted, refreshed, status = refresh_daemon.queue_round("daemon", lease)
+    assert (attempted, refreshed, status["due"]) == (1, 1, 0)
+
+    _import(db, 11)
+    assert refresh_daemon.queue_round("daemon", lease)[:2] == (1, 1)
+    assert refresh_daemon.queue_round("daemon", lease)[:2] == (0, 0)
+
+    item = db.get(models.IngestWorkItem, 11)
+    db.refresh(item)
+    assert item.lease_owner is None and item.next_run_at > datetime.utcnow()
+    assert not lease.held
+
+
+def test_games_leased_by_an_ingest_worker_are_left_alone(db, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(
+        ingest_worker, "refresh_game", lambda db, writer, info: refreshed.append(info) or upsert_game(db, info)
+    )
+    _import(db, 20)
+    assert claim(db, "ingest-worker-1")
+
+    assert refresh_daemon.queue_round("daemon", LeaseHeartbeat("daemon"))[:2] == (0, 0)
+    assert refreshed == []
@@ -0,0 +1,119 @@
+import glob
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud, models, retention
+from app.app_state import get_data_version
+from app.near_duplicates import assign_near_duplicates
+from app.retention import get_watermark, run_retention
+from app.rollups import rebuild_daily_rollups, window_totals
+from app.scoring import DEFAULT_SCORING
+
+OLD = datetime.utcnow() - timedelta(days=400)
+RECENT = datetime.utcnow() - timedelta(days=2)
+
+
+def _totals(db, game_id, config=None):
+    rebuild_daily_rollups(db, [game_id], config)
+    db.commit()
+    return window_totals(db, "all", [game_id])[game_id]
+
+
+def test_old_rows_move_to_the_archive_and_keep_counting(db, add_game, add_review, tmp_path):
+    game = add_game("Retained")
+    game_id = game.id
+    add_review(game, "unfair boss", created_at=OLD)
+    add_review(game, "lovely", created_at=OLD, positive=True)
+    add_review(game, "crash on launch", created_at=RECENT)
+    totals_before = _totals(db, game_id)
+    timeline_before = crud.get_game_rage_timeline(db, game_id)
+
+    report = run_retention(db, timedelta(days=365), archive_dir=str(tmp_path / "archive"))
+
+    assert report["archived_rows"] == {"steam_reviews_raw": 2, "reddit_posts_raw": 0}
+    assert db.query(models.SteamReviewRaw).count() == 1
+    [path] = glob.glob(str(tmp_path / "archive" / "steam_reviews_raw" / str(game_id) / "*.jsonl.gz"))
+    with gzip.open(path, "rt") as f:
+        archived = [json.loads(line) for line in f]
+    assert sorted(r["review_text"] for r in archived) == ["lovely", "unfair boss"]
+
+    assert _totals(db, game_id) == totals_before
+    assert crud.get_game_rage_timeline(db, game_id) == timeline_before
+    assert get_watermark(db, game_id, "steam") is not None
+
+
+def test_archiving_bumps_the_data_version(db, add_game, add_review, tmp_path):
+    add_review(add_game("Cached"), "unfair", created_at=OLD)
+    before = get_data_version(db.connection())
+
+    run_retention(db, timedelta(days=365), archive_dir=str(tmp_path))
+
+    assert get_data_version(db.connection()) > before
+
+
+def test_failed_commit_leaves_no_archive_file(db, add_game, add_review, tmp_path, monkeypatch):
+    add_review(add_game("Rolled back"), "unfair", created_at=OLD)
+
+    def fail(*args):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(retention, "_add_daily_totals", fail)
+    with pytest.raises(RuntimeError):
+        run_retention(db, timedelta(days=365), archive_dir=str(tmp_path / "archive"))
+
+    assert db.query(models.SteamReviewRaw).count() == 1
+    assert glob.glob(str(tmp_path / "archive" / "**" / "*.gz*"), recursive=True) == []
+
+
+def test_second_run_finds_nothing_new(db, add_game, add_review, tmp_path):
+    game = add_game("Idempotent")
+    add_review(game, "unfair", created_at=OLD)
+    run_retention(db, timedelta(days=365), archive_dir=str(tmp_path))
+
+    report = run_retention(db, timedelta(days=365), archive_dir=str(tmp_path))
+
+    assert sum(report["archived_rows"].values()) == 0
+    assert db.query(models.ArchivedDailyTotal).one().rows == 1
+
+
+@pytest.mark.parametrize("score_dups", [False, True])
+def test_archived_near_duplicates_still_follow_the_setting(db, add_game, add_review, tmp_path, score_dups):
+    game = add_game("Bombed long ago")
+    game_id = game.id
+    first = add_review(game, "unfair rage quit", created_at=OLD)
+    add_review(game, "unfair rage quit", created_at=OLD, dup_of=first.id)
+    add_review(game, "lovely", created_at=OLD, positive=True, dup_of=first.id)
+    config = {**DEFAULT_SCORING, "score_near_duplicates": score_dups}
+    totals_before = _totals(db, game_id, config)
+    timeline_before = crud.get_game_rage_timeline(db, game_id)
+
+    run_retention(db, timedelta(days=365), archive_dir=str(tmp_path))
+
+    assert totals_before["rows"] == (3 if score_dups else 1)
+    assert _totals(db, game_id, config) == totals_before
+    # The timeline counts every review, duplicates included, either way.
+    assert crud.get_game_rage_timeline(db, game_id) == timeline_before
+    assert timeline_before[0]["total"] == 3
+    # The archive keeps both, so flipping the setting later still works.
+    flipped = {**DEFAULT_SCORING, "score_near_duplicates": not score_dups}
+    assert _totals(db, game_id, flipped)["rows"] == (1 if score_dups else 3)
+
+
+def test_archived_rows_leave_the_near_duplicate_index(db, add_game, add_review, tmp_path):
+    text = "This game is an unfair mess, the final boss one-shots you and the camera fights you too"
+    game = add_game("Clustered")
+    game_id = game.id
+    old = add_review(game, text, created_at=OLD)
+    assign_near_duplicates(db, "steam", game_id, [(old.id, text)])
+    db.commit()
+
+    run_retention(db, timedelta(days=365), archive_dir=str(tmp_path))
+
+    assert db.query(models.MinHashSignature).count() == 0
+    assert db.query(models.MinHashBand).count() == 0
+    # A new copy starts a live cluster instead of pointing at the archived row.
+    copy = add_review(db.get(models.Game, game_id), text, created_at=RECENT)
+    assert assign_near_duplicates(db, "steam", game_id, [(copy.id, text)]) == {}
@@ -0,0 +1,141 @@
+import copy
+import datetime as dt
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app import models, scoring_config
+from app.reweight import (
+    ScoreTable,
+    apply_scores,
+    current_scores,
+    inputs_match_config,
+    leaderboard_diff,
+    load_inputs,
+    rescore,
+)
+from app.rollups import WINDOWS
+from app.score_stream import SCORE_COLUMNS
+from app.scoring import DEFAULT_SCORING
+from app.scoring_config import current_config
+from compute_scores import compute_scores_for_games
+
+RECENT = dt.datetime.utcnow() - dt.timedelta(days=1)
+
+
+def _reweighted():
+    config = copy.deepcopy(DEFAULT_SCORING)
+    config["version"] = 2
+    config["points"]["tech_hit"] = 2.0
+    config["rage_score"].update(review=0.2, technical=0.35)
+    config["achievement_drop_full_rage"] = 35.0
+    return config
+
+
+def _write_config(path, config, mtime_ns):
+    path.write_text(json.dumps(config))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def _seed(db, add_game, add_review):
+    games = [add_game(name) for name in ("Crashy", "Hard", "Calm")]
+    for text in ("crash lag crash", "lag on every map", "lovely"):
+        add_review(games[0], text, created_at=RECENT, positive=text == "lovely")
+    for text in ("unfair boss", "impossible parry", "rage quit"):
+        add_review(games[1], text, created_at=RECENT - dt.timedelta(days=40))
+    add_review(games[2], "lovely", created_at=RECENT, positive=True)
+    for n, percent in enumerate((90.0, 30.0, 25.0)):
+        db.add(models.SteamAchievementRaw(
+            game_id=games[1].id, api_name=f"A{n}", display_name=f"A{n}", percent=percent,
+        ))
+    db.commit()
+    return [g.id for g in games]
+
+
+def test_rescore_matches_a_full_compute_with_the_same_config(db, add_game, add_review, tmp_path, monkeypatch):
+    game_ids = _seed(db, add_game, add_review)
+    compute_scores_for_games(db, game_ids)
+    rescored = {w: rescore(*load_inputs(db, w), _reweighted()) for w in WINDOWS}
+    default = current_scores(db, "all", rescored["all"].game_ids)
+    assert not np.allclose(rescored["all"].columns["rage_score"], default.columns["rage_score"])
+
+    path = _write_config(tmp_path / "v2.json", _reweighted(), 10**18)
+    monkeypatch.setattr(scoring_config, "SCORING_CONFIG_PATH", path)
+    compute_scores_for_games(db, game_ids)
+
+    for window, after in rescored.items():
+        stored = current_scores(db, window, after.game_ids)
+        for c in SCORE_COLUMNS:
+            np.testing.assert_allclose(after.columns[c], stored.columns[c], err_msg=f"{window} {c}")
+
+
+def test_inputs_under_another_near_duplicate_rule_are_refused(db, add_game, add_review, tmp_path, monkeypatch):
+    game_ids = _seed(db, add_game, add_review)
+    compute_scores_for_games(db, game_ids[:1])
+    with_dups = {**_reweighted(), "score_near_duplicates": True}
+    assert inputs_match_config(db.connection(), DEFAULT_SCORING)
+    assert not inputs_match_config(db.connection(), with_dups)
+
+    # A per-game run under the other rule leaves the inputs mixed.
+    path = _write_config(tmp_path / "dups.json", with_dups, 10**18)
+    monkeypatch.setattr(scoring_config, "SCORING_CONFIG_PATH", path)
+    compute_scores_for_games(db, game_ids[1:])
+    assert not inputs_match_config(db.connection(), with_dups)
+    assert not inputs_match_config(db.connection(), DEFAULT_SCORING)
+
+
+def test_apply_scores_writes_and_logs_only_changed_rows(db, add_game, add_review):
+    game_ids = _seed(db, add_game, add_review)
+    compute_scores_for_games(db, game_ids)
+    changes_before = db.query(models.ScoreChange).count()
+
+    ids, totals = load_inputs(db, "all")
+    before = current_scores(db, "all", ids)
+    after = rescore(ids, totals, _reweighted())
+    written = apply_scores(db, "all", before, after, dt.datetime.utcnow())
+    db.commit()
+
+    calm = game_ids[2]  # no rage at all, so nothing to reweight
+    assert written == 2
+    assert db.query(models.ScoreChange).count() == changes_before + 2
+    crashy = db.get(models.GameRageScore, game_ids[0])
+    assert crashy.technical_rage == pytest.approx(after.columns["technical_rage"][0])
+    assert db.get(models.GameWindowScore, (calm, "all")).rage_score == 0.0
+    assert apply_scores(db, "all", current_scores(db, "all", ids), after, dt.datetime.utcnow()) == 0
+
+
+def test_leaderboard_diff_reports_new_ranks_against_old_ones():
+    ids = np.array([1, 2, 3])
+
+    def table(rage):
+        return ScoreTable(ids, {c: np.array(rage, dtype=np.float64) for c in SCORE_COLUMNS})
+
+    diff = leaderboard_diff(table([10.0, 50.0, 30.0]), table([60.0, 50.0, 30.0]), limit=2)
+
+    assert diff["most-rage"] == [
+        {"game_id": 1, "rank": 1, "previous_rank": 3, "score": 60.0, "previous_score": 10.0},
+        {"game_id": 2, "rank": 2, "previous_rank": 1, "score": 50.0, "previous_score": 50.0},
+    ]
+    assert [row["game_id"] for row in diff["cozy"]] == [3, 2]
+
+
+def test_hot_reload_keeps_the_last_good_config(tmp_path):
+    path = _write_config(tmp_path / "scoring.json", {"version": 2}, 10**18)
+    assert current_config(path)["version"] == 2
+
+    (tmp_path / "scoring.json").write_text("{not json")
+    os.utime(path, ns=(10**18 + 1, 10**18 + 1))
+    assert current_config(path)["version"] == 2
+
+    _write_config(tmp_path / "scoring.json", {"version": 2, "points": {"max_per_review": 0}}, 10**18 + 2)
+    assert current_config(path)["version"] == 2
+
+    _write_config(tmp_path / "scoring.json", {"version": 3, "points": {"tech_hit": 1.5}}, 10**18 + 3)
+    config = current_config(path)
+    assert (config["version"], config["points"]["tech_hit"]) == (3, 1.5)
+
+    os.remove(path)
+    assert current_config(path) is DEFAULT_SCORING
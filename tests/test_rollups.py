@@ -0,0 +1,113 @@
+import datetime as dt
+
+import pytest
+
+from app import models
+from app.rollups import (
+    invalidate_daily_rollups,
+    rebuild_daily_rollups,
+    refresh_daily_rollups,
+    window_start,
+    window_totals,
+)
+from app.scoring import DEFAULT_SCORING
+from compute_scores import compute_scores_for_games
+
+TODAY = dt.date(2026, 10, 19)
+
+
+def _at(days_ago):
+    return dt.datetime.combine(TODAY - dt.timedelta(days=days_ago), dt.time(12))
+
+
+def test_window_start_is_inclusive_of_today():
+    assert window_start("7d", TODAY) == dt.date(2026, 10, 13)
+    assert window_start("all", TODAY) is None
+
+
+def test_window_totals_sum_only_days_inside_the_window(db, add_game, add_review):
+    game = add_game("Windowed")
+    add_review(game, "unfair", created_at=_at(1))
+    add_review(game, "lovely", created_at=_at(3), positive=True)
+    add_review(game, "crash", created_at=_at(20))
+    add_review(game, "unfair crash", created_at=_at(200))
+    rebuild_daily_rollups(db)
+
+    counts = {w: window_totals(db, w, [game.id], today=TODAY)[game.id] for w in ("7d", "30d", "all")}
+
+    assert (counts["7d"]["rows"], counts["7d"]["negatives"]) == (2, 1)
+    assert (counts["30d"]["rows"], counts["30d"]["negatives"]) == (3, 2)
+    assert (counts["all"]["rows"], counts["all"]["negatives"]) == (4, 3)
+    assert counts["all"]["diff_hits"] == 2
+
+
+def test_scoring_writes_one_score_row_per_window(db, add_game, add_review):
+    game = add_game("Scored windows")
+    game_id = game.id
+    recent = dt.datetime.utcnow() - dt.timedelta(days=1)
+    add_review(game, "lovely", created_at=recent, positive=True)
+    add_review(game, "unfair rage quit", created_at=recent - dt.timedelta(days=100))
+
+    compute_scores_for_games(db, [game_id])
+
+    rows = {w.window: w for w in db.query(models.GameWindowScore).filter_by(game_id=game_id)}
+    assert set(rows) == {"7d", "30d", "90d", "all"}
+    assert rows["7d"].review_count == 1 and rows["7d"].rage_score == 0.0
+    assert rows["all"].review_count == 2 and rows["all"].rage_score > 0
+    assert db.get(models.GameRageScore, game_id).rage_score == rows["all"].rage_score
+
+
+@pytest.mark.parametrize("score_dups", [False, True])
+def test_near_duplicates_count_only_when_the_config_says_so(db, add_game, add_review, score_dups):
+    game = add_game("Bombed")
+    game_id = game.id
+    first = add_review(game, "unfair rage quit", created_at=_at(1))
+    add_review(game, "unfair rage quit", created_at=_at(1), dup_of=first.id)
+    add_review(game, "unfair rage quit", created_at=_at(2), dup_of=first.id)
+
+    rebuild_daily_rollups(db, config={**DEFAULT_SCORING, "score_near_duplicates": score_dups})
+
+    totals = window_totals(db, "all", [game_id])[game_id]
+    assert (totals["rows"], totals["negatives"]) == ((3, 3) if score_dups else (1, 1))
+
+
+def _rollup_rows(db):
+    return sorted(
+        (r.game_id, r.day, r.source, r.rows, r.negatives, r.diff_hits)
+        for r in db.query(models.GameDailyRollup)
+    )
+
+
+def test_refresh_adds_only_new_rows_and_matches_a_full_rebuild(db, add_game, add_review, add_post):
+    game = add_game("Incremental")
+    add_review(game, "unfair", created_at=_at(1))
+    add_post(game, "rage quit", created_at=_at(1))
+    assert refresh_daily_rollups(db) is True  # nothing built yet
+    db.commit()
+
+    add_review(game, "impossible", created_at=_at(1))
+    add_review(game, "lovely", created_at=_at(2), positive=True)
+    add_post(game, "crash", created_at=_at(5))
+    assert refresh_daily_rollups(db) is False
+    assert refresh_daily_rollups(db) is False  # a second run adds nothing
+    incremental = _rollup_rows(db)
+
+    rebuild_daily_rollups(db)
+    assert incremental == _rollup_rows(db)
+    assert window_totals(db, "all", [game.id])[game.id]["rows"] == 5
+
+
+def test_refresh_rebuilds_when_the_rollups_are_invalidated_or_the_rule_changes(db, add_game, add_review):
+    game = add_game("Invalidated")
+    first = add_review(game, "unfair", created_at=_at(1))
+    add_review(game, "unfair", created_at=_at(1), dup_of=first.id)
+    refresh_daily_rollups(db)
+    assert refresh_daily_rollups(db) is False
+
+    with_dups = {**DEFAULT_SCORING, "score_near_duplicates": True}
+    assert refresh_daily_rollups(db, with_dups) is True
+    assert window_totals(db, "all", [game.id])[game.id]["rows"] == 2
+
+    invalidate_daily_rollups(db)
+    assert refresh_daily_rollups(db) is True
+    assert window_totals(db, "all", [game.id])[game.id]["rows"] == 1
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from app.scheduler import (
+    MAX_REFRESH_INTERVAL,
+    MIN_REFRESH_INTERVAL,
+    RefreshScheduler,
+    next_refresh_interval,
+    review_velocity,
+)
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+def _info(app_id):
+    return {"steam_app_id": app_id, "name": f"Game {app_id}"}
+
+
+def test_interval_follows_velocity_within_bounds():
+    assert next_refresh_interval(0) == MAX_REFRESH_INTERVAL
+    assert next_refresh_interval(10_000) == MIN_REFRESH_INTERVAL
+    assert next_refresh_interval(0.001) == MAX_REFRESH_INTERVAL
+    # 25 reviews wanted per refresh at 5 reviews/h -> every 5 hours
+    assert next_refresh_interval(5.0) == timedelta(hours=5)
+
+
+def test_pop_due_returns_oldest_first_and_respects_limit():
+    s = RefreshScheduler()
+    s.schedule(_info(1), NOW - timedelta(minutes=1))
+    s.schedule(_info(2), NOW - timedelta(minutes=10))
+    s.schedule(_info(3), NOW + timedelta(minutes=5))
+
+    assert [g["steam_app_id"] for g in s.pop_due(NOW, limit=1)] == [2]
+    assert [g["steam_app_id"] for g in s.pop_due(NOW)] == [1]
+    assert s.pop_due(NOW) == []
+    assert s.next_due_at() == NOW + timedelta(minutes=5)
+
+
+def test_rescheduling_replaces_the_old_entry():
+    s = RefreshScheduler()
+    s.schedule(_info(1), NOW - timedelta(minutes=1))
+    s.schedule(_info(1), NOW + timedelta(hours=1))
+
+    assert s.pop_due(NOW) == []
+    assert s.queue_depth() == 1
+    assert s.status(NOW)["due"] == 0
+    assert [g["steam_app_id"] for g in s.pop_due(NOW + timedelta(hours=2))] == [1]
+
+
+def test_lag_measures_the_oldest_overdue_game():
+    s = RefreshScheduler()
+    assert s.lag(NOW) == timedelta(0)
+    s.schedule(_info(1), NOW - timedelta(minutes=7))
+    assert s.lag(NOW) == timedelta(minutes=7)
+    assert s.status(NOW)["lag_seconds"] == 420.0
+
+
+def test_review_velocity_counts_recent_reviews_per_hour(db, add_game, add_review):
+    game = add_game("Velocity")
+    for hours in (1, 2, 3):
+        add_review(game, "too hard", created_at=NOW - timedelta(hours=hours))
+    add_review(game, "too hard", created_at=NOW - timedelta(days=10))
+
+    assert review_velocity(db, game.id, NOW) == 3 / 72
@@ -0,0 +1,113 @@
+import datetime as dt
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app import main, score_stream
+from app.app_state import bump_data_version
+from app.database import engine
+from app.score_stream import ScoreBroker, record_score_change, score_changed, topics_for
+
+SCORES = {
+    "rage_score": 10.0,
+    "difficulty_rage": 5.0,
+    "technical_rage": 1.0,
+    "social_toxicity_rage": 0.0,
+    "ui_design_rage": 0.0,
+}
+
+
+def _log_run(db, *changes):
+    now = dt.datetime.utcnow()
+    for game_id, window in changes:
+        record_score_change(db, game_id, window, SCORES, now)
+    bump_data_version(db)
+    db.commit()
+
+
+def test_score_changed_ignores_float_noise():
+    same = tuple(SCORES[c] for c in score_stream.SCORE_COLUMNS)
+    assert score_changed(None, SCORES)
+    assert not score_changed(same, {**SCORES, "rage_score": 10.0 + 1e-12})
+    assert score_changed(same, {**SCORES, "rage_score": 10.5})
+
+
+def test_poll_delivers_each_run_once_to_matching_topics(db, add_game):
+    a, b = add_game("Streamed A"), add_game("Streamed B")
+    broker = ScoreBroker(bind=engine)
+    broker._start()
+    game_sub = broker.subscribe(topics_for([a.id]))
+    board_sub = broker.subscribe(topics_for(leaderboards=["7d"]))
+
+    assert broker._poll() == []  # no run finished yet
+    _log_run(db, (a.id, "all"), (b.id, "7d"))
+    events = broker._poll()
+    for event in events:
+        broker.publish(event)
+
+    assert [(e["game_id"], e["window"]) for e in events] == [(a.id, "all"), (b.id, "7d")]
+    assert game_sub.queue.get_nowait()["game_id"] == a.id and game_sub.queue.empty()
+    assert board_sub.queue.get_nowait()["game_id"] == b.id and board_sub.queue.empty()
+    assert broker._poll() == []
+
+
+def test_replay_returns_changes_after_the_last_event_id(db, add_game):
+    game = add_game("Replayed")
+    _log_run(db, (game.id, "all"))
+    _log_run(db, (game.id, "7d"))
+    broker = ScoreBroker(bind=engine)
+
+    first, second = broker.replay(0)
+
+    assert [e["window"] for e in broker.replay(first["id"])] == ["7d"]
+    assert second["rage_score"] == 10.0
+
+
+def test_slow_subscriber_is_told_to_resync(monkeypatch):
+    monkeypatch.setattr(score_stream, "SUBSCRIBER_QUEUE_SIZE", 2)
+    broker = ScoreBroker()
+    sub = broker.subscribe(topics_for([1]))
+
+    for n in range(3):
+        broker.publish({"id": n, "game_id": 1, "window": "all"})
+
+    assert sub.queue.get_nowait() == {"type": "resync"}
+    assert sub.queue.empty()
+
+
+def _wait_for_topics(broker, topics):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if any(sub.topics == topics for sub in broker._subscriptions):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"no subscription for {topics}")
+
+
+def test_websocket_resubscribes_and_receives_matching_events(db, client):
+    event = {"id": 7, "game_id": 2, "window": "all", **SCORES, "changed_at": "2026-01-01T00:00:00"}
+    with client.websocket_connect("/stream?games=1") as ws:
+        ws.send_json({"games": [2], "leaderboards": []})
+        _wait_for_topics(main.score_broker, {"game:2"})
+        ws.portal.call(main.score_broker.publish, event)
+
+        assert ws.receive_json() == {"type": "score", **event}
+    assert not main.score_broker._subscriptions
+
+
+@pytest.mark.parametrize("message", [{"games": ["x"]}, {"leaderboards": ["forever"]}, {"games": 3}, [1, 2]])
+def test_websocket_closes_with_1008_on_a_bad_subscription(db, client, message):
+    with client.websocket_connect("/stream") as ws:
+        ws.send_json(message)
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+    assert exc.value.code == 1008
+    assert not main.score_broker._subscriptions
+
+
+def test_websocket_rejects_bad_query_topics(db, client):
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect("/stream?games=abc"):
+            pass
+    assert exc.value.code == 1008
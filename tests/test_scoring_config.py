@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from app.scoring import DEFAULT_SCORING
+from app.scoring_config import SCORING_CONFIG_PATH, load_config
+
+
+def _write(tmp_path, override):
+    path = tmp_path / "scoring_config.json"
+    path.write_text(json.dumps(override))
+    return str(path)
+
+
+@pytest.mark.parametrize("value", [False, True])
+def test_score_near_duplicates_is_read_from_the_file(tmp_path, value):
+    config = load_config(_write(tmp_path, {"score_near_duplicates": value}))
+    assert config["score_near_duplicates"] is value
+    assert config["points"] == DEFAULT_SCORING["points"]
+
+
+@pytest.mark.parametrize("value", [1, "yes", None])
+def test_score_near_duplicates_must_be_a_boolean(tmp_path, value):
+    with pytest.raises(ValueError, match="true or false"):
+        load_config(_write(tmp_path, {"score_near_duplicates": value}))
+
+
+def test_the_shipped_config_matches_the_defaults():
+    assert load_config(SCORING_CONFIG_PATH) == DEFAULT_SCORING
@@ -0,0 +1,59 @@
+import pytest
+
+from app import main, search
+from app.search import GameSearch, SearchIndex, normalize
+
+
+def _index(*games):
+    return SearchIndex([(i + 1, name, name.lower().replace(" ", "-"), score) for i, (name, score) in enumerate(games)])
+
+
+def _names(hits):
+    return [h["name"] for h in hits]
+
+
+def test_normalize_strips_accents_and_punctuation():
+    assert normalize("  Pokémon: Scarlet!! ") == "pokemon scarlet"
+
+
+def test_title_prefixes_rank_ahead_of_mid_title_matches_then_by_rage():
+    index = _index(("Dark Souls III", 80.0), ("Souls Calm", 10.0), ("Soulcalibur", 50.0), ("Celeste", 90.0))
+
+    assert _names(index.search("souls")) == ["Souls Calm", "Dark Souls III"]
+    assert _names(index.search("soul")) == ["Soulcalibur", "Souls Calm", "Dark Souls III"]
+    assert _names(index.search("soul", limit=1)) == ["Soulcalibur"]
+    assert index.search("   ") == []
+
+
+def test_short_prefixes_use_the_precomputed_buckets():
+    index = _index(("Dark Souls", 80.0), ("Dead Cells", 60.0), ("Diablo", None))
+
+    assert _names(index.search("d")) == ["Dark Souls", "Dead Cells", "Diablo"]
+    assert _names(index.search("de")) == ["Dead Cells"]
+    # "s" finds "Dark Souls" through its second word, after the title match.
+    assert _names(index.search("s")) == ["Dark Souls"]
+
+
+def test_accented_names_match_plain_queries():
+    index = _index(("Pokémon Scarlet", 30.0))
+    assert _names(index.search("pokemon sc")) == ["Pokémon Scarlet"]
+    assert _names(index.search("POKÉMON")) == ["Pokémon Scarlet"]
+
+
+def test_search_route_rebuilds_when_games_change(db, client, add_game, monkeypatch):
+    monkeypatch.setattr(main, "game_search", GameSearch())
+    monkeypatch.setattr(search, "INDEX_CHECK_SECONDS", 0.0)
+    add_game("Hollow Knight", scores={"rage_score": 70.0})
+
+    assert _names(client.get("/games/search", params={"q": "hollow"}).json()) == ["Hollow Knight"]
+
+    add_game("Hollow Knight Silksong", scores={"rage_score": 95.0})
+    body = client.get("/games/search", params={"q": "hollow k"}).json()
+    assert _names(body) == ["Hollow Knight Silksong", "Hollow Knight"]
+    assert body[0]["rage_score"] == 95.0
+    assert main.game_search.rebuilds == 2
+
+
+@pytest.mark.parametrize("params", [{}, {"q": ""}, {"q": "a", "limit": 0}])
+def test_search_route_validates_parameters(db, client, params):
+    assert client.get("/games/search", params=params).status_code == 422
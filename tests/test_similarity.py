@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from app import similarity
+
+
+def _brute_force(vectors, k):
+    x = vectors.astype(np.float64)
+    std = x.std(axis=0)
+    x = (x - x.mean(axis=0)) / np.where(std > similarity.MIN_STD, std, 1.0)
+    d = np.sqrt(((x[:, None, :] - x[None, :, :]) ** 2).sum(axis=2))
+    np.fill_diagonal(d, np.inf)
+    idx = np.argsort(d, axis=1)[:, :k]
+    return idx, np.take_along_axis(d, idx, axis=1)
+
+
+@pytest.mark.parametrize("block_size,window", [(256, 2048), (7, 5), (1, 1)])
+def test_nearest_neighbours_match_brute_force(block_size, window):
+    rng = np.random.default_rng(42)
+    vectors = rng.gamma(2.0, 10.0, size=(300, len(similarity.VECTOR_COLUMNS)))
+
+    idx, dist = similarity.nearest_neighbours(vectors, k=5, block_size=block_size, window=window)
+    want_idx, want_dist = _brute_force(vectors, 5)
+
+    np.testing.assert_array_equal(idx, want_idx)
+    np.testing.assert_allclose(dist, want_dist, rtol=1e-4, atol=1e-4)
+
+
+def test_nearest_neighbours_with_fewer_games_than_k():
+    idx, dist = similarity.nearest_neighbours(np.array([[1.0, 0, 0, 0, 0], [2.0, 0, 0, 0, 0]]), k=10)
+    assert idx.tolist() == [[1], [0]]
+
+    idx, _ = similarity.nearest_neighbours(np.array([[1.0, 0, 0, 0, 0]]), k=10)
+    assert idx.shape == (1, 0)
+
+
+def test_similar_route_returns_the_closest_profiles(db, client, add_game):
+    base = add_game("Base", scores={"rage_score": 50.0, "difficulty_rage": 40.0})
+    near = add_game("Near", scores={"rage_score": 48.0, "difficulty_rage": 39.0})
+    far = add_game("Far", scores={"rage_score": 5.0, "technical_rage": 30.0})
+    add_game("No data", scores={})
+    ids = (base.id, near.id, far.id)
+
+    assert similarity.rebuild_similar_games(db, k=2) == {"games": 3, "pairs": 6}
+    db.commit()
+
+    body = client.get(f"/games/{ids[0]}/similar").json()
+    assert [g["id"] for g in body] == [ids[1], ids[2]]
+    assert body[0]["distance"] < body[1]["distance"]
+    assert [g["id"] for g in client.get(f"/games/{ids[0]}/similar", params={"limit": 1}).json()] == [ids[1]]
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.singleflight import SingleFlight, SingleFlightTimeout
+
+
+def _run_concurrently(flight, key, fn, n):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def _wait_absorbed(flight, n):
+    deadline = time.monotonic() + 5
+    while flight.absorbed < n and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_followers_share_the_leaders_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "page"
+
+    threads, results, _ = _run_concurrently(flight, "k", slow, 5)
+    _wait_absorbed(flight, 4)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1] and results == ["page"] * 5
+    assert flight.stats() == {"executions": 1, "absorbed": 4, "timeouts": 0, "in_flight": 0}
+    assert flight.do("k", lambda: "next") == "next"  # nothing cached between flights
+
+
+def test_followers_see_the_leaders_error():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("db down")
+
+    threads, _, errors = _run_concurrently(flight, "k", failing, 3)
+    _wait_absorbed(flight, 2)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert [str(e) for e in errors] == ["db down"] * 3
+
+
+def test_follower_times_out_without_cancelling_the_leader():
+    flight = SingleFlight(wait_seconds=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("k", lambda: release.wait(5)))
+    leader.start()
+    while not flight.stats()["in_flight"]:
+        time.sleep(0.005)
+
+    with pytest.raises(SingleFlightTimeout):
+        flight.do("k", lambda: "never runs")
+    release.set()
+    leader.join()
+    assert flight.timeouts == 1 and flight.executions == 1
+
+
+def test_async_calls_are_coalesced():
+    flight = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        return await asyncio.gather(*[flight.do_async("k", load) for _ in range(6)])
+
+    assert asyncio.run(main()) == [42] * 6
+    assert calls == [1] and flight.absorbed == 5
@@ -0,0 +1,93 @@
+import datetime as dt
+
+from app import models, spikes
+
+TODAY = dt.date(2026, 10, 19)
+
+
+def _ingest(db, game_id, day, total, negative, seq=[0]):
+    """Insert one day's reviews and feed them to the detector, like the batch writer."""
+    created = dt.datetime.combine(day, dt.time(12))
+    batch = []
+    for n in range(total):
+        seq[0] += 1
+        is_positive = n >= negative
+        db.add(models.SteamReviewRaw(
+            game_id=game_id, steam_review_id=f"s{seq[0]}", is_positive=is_positive,
+            created_at_steam=created,
+        ))
+        batch.append((created, is_positive))
+    db.flush()
+    spikes.update_spike_detector(db, game_id, batch)
+    db.commit()
+
+
+def _state(db, game_id):
+    s = db.get(models.RageSpikeState, game_id)
+    return (s.day, s.day_total, s.day_negative, s.observed_days, s.ewma_mean, s.ewma_var)
+
+
+def _history():
+    # ten calm days at 10% negative, then today at 80%
+    days = [(TODAY - dt.timedelta(days=n), 30, 3) for n in range(10, 0, -1)]
+    return days + [(TODAY, 30, 24)]
+
+
+def test_spike_is_listed_once_the_baseline_exists(db, add_game):
+    game = add_game("Spiking")
+    for day, total, negative in _history():
+        _ingest(db, game.id, day, total, negative)
+
+    [alert] = spikes.list_spiking_games(db, today=TODAY)
+    assert alert["id"] == game.id
+    assert alert["negative_share"] == 0.8
+    assert abs(alert["baseline_share"] - 0.1) < 1e-9
+    assert alert["severity"] >= spikes.SPIKE_Z
+
+
+def test_out_of_order_days_match_in_order_ingest(db, add_game):
+    in_order = add_game("In order")
+    shuffled = add_game("Shuffled")
+    history = _history()
+    for day, total, negative in history:
+        _ingest(db, in_order.id, day, total, negative)
+
+    # Helpfulness-ordered pages: recent days first, older ones arrive later.
+    for day, total, negative in history[5:] + history[:5]:
+        _ingest(db, shuffled.id, day, total, negative)
+
+    a, b = _state(db, in_order.id), _state(db, shuffled.id)
+    assert a[:4] == b[:4] == (TODAY, 30, 24, 10)
+    assert abs(a[4] - b[4]) < 1e-12 and abs(a[5] - b[5]) < 1e-12
+    assert len(spikes.list_spiking_games(db, today=TODAY)) == 2
+
+
+def test_quiet_day_is_not_a_spike(db, add_game):
+    game = add_game("Quiet")
+    for day, total, negative in _history()[:-1] + [(TODAY, 5, 5)]:
+        _ingest(db, game.id, day, total, negative)
+
+    assert spikes.list_spiking_games(db, today=TODAY) == []  # under MIN_DAY_REVIEWS
+
+
+def test_late_days_refold_only_from_the_nearest_checkpoint(db, add_game, monkeypatch):
+    game = add_game("Late")
+    history = _history()
+    for day, total, negative in history[:3] + history[4:]:
+        _ingest(db, game.id, day, total, negative)
+    expected = add_game("Expected")
+    for day, total, negative in history:
+        _ingest(db, expected.id, day, total, negative)
+
+    def no_full_history(*args):
+        raise AssertionError("replayed the whole history")
+
+    monkeypatch.setattr(spikes, "_daily_history", no_full_history)
+    day, total, negative = history[3]
+    _ingest(db, game.id, day, total, negative)
+
+    a, b = _state(db, game.id), _state(db, expected.id)
+    assert a[:4] == b[:4]
+    assert abs(a[4] - b[4]) < 1e-12 and abs(a[5] - b[5]) < 1e-12
+    rows = db.query(models.RageSpikeDay).filter_by(game_id=game.id).count()
+    assert rows == len(history)
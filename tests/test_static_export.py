@@ -0,0 +1,53 @@
+import gzip
+import json
+import os
+
+from app import static_export
+from app.static_export import KEEP_VERSIONS, export_static_bundle
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_bundle_is_swapped_in_with_gzip_siblings(db, add_game, tmp_path):
+    game = add_game("Exported", scores={"rage_score": 42.0})
+    root = str(tmp_path / "export")
+
+    manifest = export_static_bundle(db, root=root)
+
+    current = os.path.join(root, "current")
+    assert os.path.realpath(current).endswith(manifest["version"])
+    detail = json.loads(_read(os.path.join(current, "games", f"{game.id}.json")))
+    assert detail["name"] == "Exported"
+    assert detail["rage"]["rage_score"] == 42.0
+    assert _read(os.path.join(current, "games", "slug", "exported.json")) == _read(
+        os.path.join(current, "games", f"{game.id}.json")
+    )
+
+    board_path = os.path.join(current, "leaderboards", "most-rage.json")
+    board = json.loads(_read(board_path))
+    assert [g["id"] for g in board] == [game.id]
+    assert gzip.decompress(_read(board_path + ".gz")) == _read(board_path)
+    assert manifest["games"] == 1
+
+
+def test_old_versions_are_pruned(db, add_game, tmp_path):
+    add_game("Pruned", scores={})
+    root = str(tmp_path / "export")
+
+    versions = [export_static_bundle(db, root=root)["version"] for _ in range(KEEP_VERSIONS + 2)]
+
+    kept = sorted(os.listdir(os.path.join(root, "versions")))
+    assert kept == versions[-KEEP_VERSIONS:]
+    assert os.path.realpath(os.path.join(root, "current")).endswith(versions[-1])
+
+
+def test_missing_brotli_is_reported(db, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(static_export, "brotli", None)
+
+    manifest = export_static_bundle(db, root=str(tmp_path / "export"))
+
+    assert manifest["encodings"] == ["identity", "gzip"]
+    assert "brotli is not installed" in capsys.readouterr().out
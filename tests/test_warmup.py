@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy import inspect, text
+
+from app.cache import MemoryBackend, VersionedCache
+from app.database import engine
+from app.migrations import ensure_schema
+from app.rollups import WINDOWS
+from app.warmup import WARM_LEADERBOARD_LIMIT, game_detail_key, leaderboard_key, warm_up
+from app import crud
+
+
+def test_ensure_schema_adds_columns_missing_from_old_tables(db):
+    db.close()
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE rage_clips"))
+        conn.execute(text(
+            "CREATE TABLE rage_clips (id INTEGER PRIMARY KEY, game_id INTEGER NOT NULL, url VARCHAR NOT NULL)"
+        ))
+
+    ensure_schema()
+
+    columns = {c["name"] for c in inspect(engine).get_columns("rage_clips")}
+    assert {"title", "thumbnail_url", "added_at"} <= columns
+
+
+def test_warm_up_preloads_leaderboards_and_top_game_details(db, add_game):
+    game = add_game("Warm", scores={"rage_score": 10.0})
+    cache = VersionedCache(MemoryBackend(), bind=engine)
+
+    stats = warm_up(cache, db)
+
+    assert stats["leaderboards"] == len(WINDOWS) * len(crud.LEADERBOARDS)
+    assert stats["games"] == 1
+    board = cache.get(leaderboard_key("most-rage", "all", WARM_LEADERBOARD_LIMIT))
+    assert [g["id"] for g in board] == [game.id]
+    assert cache.get(game_detail_key(game.id, "all"))["name"] == "Warm"
+
+
+def test_importing_the_api_does_not_load_numpy():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('numpy' in sys.modules)"],
+        cwd=root, capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,125 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+from app import models
+from app.database import SessionLocal
+from app.work_queue import (
+    LEASE_DURATION,
+    LeaseHeartbeat,
+    RETRY_BASE,
+    claim,
+    complete,
+    fail,
+    heartbeat,
+    import_tracked_games,
+    queue_status,
+    read_tracked_games_file,
+)
+
+NOW = datetime(2026, 10, 19, 12)
+
+
+def _import(db, n=3):
+    counts = import_tracked_games(
+        db, [{"steam_app_id": 100 + i, "name": f"Game {i}"} for i in range(n)], now=NOW
+    )
+    db.commit()
+    return counts
+
+
+def test_import_is_idempotent_and_keeps_schedules(db):
+    assert _import(db) == {"added": 3, "updated": 0, "unchanged": 0}
+    db.get(models.IngestWorkItem, 100).next_run_at = NOW + timedelta(days=1)
+    db.commit()
+
+    counts = import_tracked_games(db, [{"steam_app_id": 100, "name": "Game 0 Remastered"}], now=NOW)
+    db.commit()
+    assert counts == {"added": 0, "updated": 1, "unchanged": 0}
+    assert _import(db) == {"added": 0, "updated": 1, "unchanged": 2}
+    assert db.query(models.IngestWorkItem).count() == 3
+    assert db.get(models.IngestWorkItem, 100).next_run_at == NOW + timedelta(days=1)
+
+
+def test_registry_file_formats(tmp_path):
+    (tmp_path / "games.csv").write_text("steam_app_id,name,slug\n1,Celeste,\n2,  Hades ,hades\n,Nameless,\n")
+    (tmp_path / "games.json").write_text(json.dumps([{"steam_app_id": "3", "name": "Cuphead"}]))
+
+    assert read_tracked_games_file(str(tmp_path / "games.csv")) == [
+        {"steam_app_id": 1, "name": "Celeste", "slug": None},
+        {"steam_app_id": 2, "name": "Hades", "slug": "hades"},
+    ]
+    assert read_tracked_games_file(str(tmp_path / "games.json"))[0]["steam_app_id"] == 3
+
+
+def test_concurrent_claims_never_hand_out_a_game_twice(db):
+    _import(db, n=4)
+    results, start = [], threading.Barrier(6)
+
+    def worker(n):
+        session = SessionLocal()
+        try:
+            start.wait()
+            results.extend(g["steam_app_id"] for g in claim(session, f"w{n}", limit=2, now=NOW))
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == [100, 101, 102, 103]
+    assert claim(db, "late", now=NOW) == []
+
+
+def test_expired_lease_is_recovered_and_the_old_owner_loses_it(db):
+    _import(db, n=1)
+    assert [g["steam_app_id"] for g in claim(db, "crashed", now=NOW)] == [100]
+    assert claim(db, "other", now=NOW + LEASE_DURATION - timedelta(seconds=1)) == []
+
+    later = NOW + LEASE_DURATION + timedelta(seconds=1)
+    assert [g["name"] for g in claim(db, "other", now=later)] == ["Game 0"]
+    assert heartbeat(db, "crashed", [100], now=later) == [100]
+    assert not complete(db, "crashed", 100, later + timedelta(hours=1), now=later)
+    assert heartbeat(db, "other", [100], now=later) == []
+
+
+def test_heartbeat_keeps_a_lease_alive(db):
+    _import(db, n=1)
+    claim(db, "w", now=NOW)
+    beat = NOW + LEASE_DURATION - timedelta(seconds=1)
+    assert heartbeat(db, "w", [100], now=beat) == []
+    assert claim(db, "other", now=NOW + LEASE_DURATION + timedelta(seconds=1)) == []
+
+
+def test_reclaiming_a_lost_lease_clears_it():
+    lease = LeaseHeartbeat("w")
+    lease.hold(100)
+    lease.lost.add(100)  # what the heartbeat thread records
+    lease.held.discard(100)
+
+    lease.hold(100)
+
+    assert 100 in lease.held and 100 not in lease.lost
+
+
+def test_failures_back_off_and_success_resets(db):
+    _import(db, n=1)
+    claim(db, "w", now=NOW)
+    assert fail(db, "w", 100, "timeout", now=NOW) == NOW + RETRY_BASE
+    assert claim(db, "w", now=NOW + RETRY_BASE - timedelta(seconds=1)) == []
+
+    t = NOW + RETRY_BASE
+    claim(db, "w", now=t)
+    assert fail(db, "w", 100, "timeout", now=t) == t + 2 * RETRY_BASE
+    assert fail(db, "w", 100, "not mine any more", now=t) is None
+
+    t += 2 * RETRY_BASE
+    claim(db, "w", now=t)
+    assert complete(db, "w", 100, t + timedelta(hours=4), now=t)
+    item = db.get(models.IngestWorkItem, 100)
+    db.refresh(item)
+    assert (item.attempts, item.last_error, item.lease_owner) == (0, None, None)
+    assert queue_status(db, now=t)["due"] == 0
@@ -1,15 +1,27 @@
-import subprocess
-import sys
+import traceback
 
+from fetch_steam_data import main as fetch_steam_data
+from compute_scores import compute_all_scores
+from export_static import main as export_static
+from app import instrumentation
 
-def run(cmd: list[str]):
-    print(f"\n=== Running: {' '.join(cmd)} ===")
-    result = subprocess.run([sys.executable] + cmd, check=False)
-    if result.returncode != 0:
-        print(f"[ERROR] Command failed with code {result.returncode}")
+
+def run(name: str, fn):
+    print(f"\n=== Running: {name} ===")
+    try:
+        with instrumentation.stage(f"job.{name}"):
+            fn()
+    except Exception:
+        traceback.print_exc()
+        print(f"[ERROR] {name} failed")
 
 
 if __name__ == "__main__":
-    run(["fetch_steam_data.py"])
-    run(["compute_scores.py"])
+    # One-shot, in-process refresh of every tracked game.
+    # For continuous, velocity-driven refreshes run refresh_daemon.py instead.
+    instrumentation.start_run("update_all")
+    run("fetch_steam_data", fetch_steam_data)
+    run("compute_scores", compute_all_scores)
+    run("export_static", export_static)
+    instrumentation.finish_run()
     print("\n[DONE] Full update finished.")